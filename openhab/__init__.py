@@ -1,5 +1,6 @@
 """Module entry point."""
 
 from .client import openHAB, OpenHAB
+from .async_client import AsyncOpenHAB
 
-__all__ = ['openHAB', 'OpenHAB']
+__all__ = ['openHAB', 'OpenHAB', 'AsyncOpenHAB']
@@ -0,0 +1,436 @@
+# -*- coding: utf-8 -*-
+"""asyncio based python library for accessing the openHAB REST API."""
+
+#
+# Alexey Grubauer (c) 2021 <alexey@ingenious-minds.at>
+#
+# python-openhab is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# python-openhab is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with python-openhab.  If not, see <http://www.gnu.org/licenses/>.
+#
+
+# pylint: disable=bad-indentation
+from __future__ import annotations
+import asyncio
+import json
+import time
+import typing
+from datetime import datetime, timedelta
+
+import aiohttp
+import requests
+from aiohttp_sse_client import client as sse_client
+from requests.auth import HTTPBasicAuth
+
+import openhab.audio
+import openhab.client
+import openhab.items
+import openhab.types
+
+
+def _blocking_only(name: str, alternative: str) -> typing.Callable[..., typing.NoReturn]:
+  """returns a method replacing the blocking method name of openhab.client.OpenHAB, which can not work with the coroutines of AsyncOpenHAB."""
+  def not_supported(self, *args, **kwargs) -> typing.NoReturn:
+    raise TypeError("{} is not available on a AsyncOpenHAB as it sends blocking requests. {}".format(name, alternative))
+  not_supported.__name__ = name
+  not_supported.__doc__ = "not available on a AsyncOpenHAB. {}".format(alternative)
+  return not_supported
+
+
+class AsyncOpenHAB(openhab.client.OpenHAB):
+  """openHAB REST API client based on asyncio and aiohttp.
+
+  All REST calls are coroutines sharing one aiohttp connection pool. The event stream runs as a task
+  on the same event loop and feeds the same item and listener machinery as openhab.client.OpenHAB.
+  Items fetched through this client are changed with `await item.async_command(value)` and
+  `await item.async_update(value)`. The blocking methods of openhab.client.OpenHAB and its items,
+  e.g. get_items or Item.command, raise TypeError.
+
+  Use it as an async context manager::
+
+    async with AsyncOpenHAB(base_url, auto_update=True) as oh:
+      item = await oh.get_item("MyItem")
+      await item.async_command("ON")
+  """
+  is_async = True
+
+  def __init__(self, base_url: str,
+               username: typing.Optional[str] = None,
+               password: typing.Optional[str] = None,
+               http_auth: typing.Optional[typing.Union[aiohttp.BasicAuth, HTTPBasicAuth]] = None,
+               timeout: typing.Optional[float] = None,
+               auto_update: typing.Optional[bool] = False,
+               openhab_version: typing.Optional[openhab.client.OpenHAB.Version] = openhab.client.OpenHAB.Version.OH2,
+               http_headers_for_autoupdate: typing.Optional[typing.Dict[str, str]] = None,
+               max_echo_to_openhab_ms: typing.Optional[int] = 800,
+               min_time_between_slotted_changes_ms: typing.Optional[float] = 0,
+               connection_limit: int = 100) -> None:
+    """Class Constructor.
+
+    Args:
+      base_url (str): The openHAB REST URL, e.g. http://example.com/rest
+      username (str, optional): A optional username, used in conjunction with a optional
+                      provided password, in case openHAB requires authentication.
+      password (str, optional): A optional password, used in conjunction with a optional
+                      provided username, in case openHAB requires authentication.
+      http_auth (aiohttp.BasicAuth or requests.auth.HTTPBasicAuth, optional): An alternative to username/password pair.
+      timeout (float, optional): An optional timeout for REST transactions
+      auto_update (bool, optional): True: receive Openhab Item Events to actively get informed about changes. The event stream is started when the client is opened.
+      max_echo_to_openhab_ms (int, optional): see openhab.client.OpenHAB
+      min_time_between_slotted_changes_ms: see openhab.client.OpenHAB
+      connection_limit (int, optional): the maximum number of simultaneous connections of the shared connection pool (including the event stream).
+    Returns:
+      AsyncOpenHAB: openHAB class instance.
+    """
+    super().__init__(base_url=base_url,
+                     timeout=timeout,
+                     auto_update=False,
+                     openhab_version=openhab_version,
+                     http_headers_for_autoupdate=http_headers_for_autoupdate,
+                     max_echo_to_openhab_ms=max_echo_to_openhab_ms,
+                     min_time_between_slotted_changes_ms=min_time_between_slotted_changes_ms,
+                     response_cache_size=0,
+                     coalesce_gets=False)
+    # requests are sent through the aiohttp session and slotted sends wait in wait_for_sending_slot,
+    # so the requests session and the scheduler of openhab.client.OpenHAB are not needed
+    self.session.close()
+    self.connection_pool = None
+    self.slotted_scheduler = None
+    self.autoUpdate = auto_update
+    self.connection_limit = connection_limit
+    # the aiohttp session can only be created inside a running event loop, see open()
+    self.session: typing.Optional[aiohttp.ClientSession] = None
+    if isinstance(http_auth, HTTPBasicAuth):
+      http_auth = aiohttp.BasicAuth(http_auth.username, http_auth.password)
+    elif http_auth is None and not (username is None or password is None):
+      http_auth = aiohttp.BasicAuth(username, password)
+    elif http_auth is not None and not isinstance(http_auth, aiohttp.BasicAuth):
+      raise ValueError("AsyncOpenHAB only supports basic authentication")
+    self.http_auth = http_auth
+    self._event_task: typing.Optional[asyncio.Task] = None
+    self._async_slotted_modification_lock: typing.Optional[asyncio.Lock] = None
+
+  async def open(self) -> None:
+    """creates the shared connection pool and, if auto_update is turned on, starts the event stream."""
+    if self.session is None or self.session.closed:
+      self.session = aiohttp.ClientSession(connector=aiohttp.TCPConnector(limit=self.connection_limit),
+                                           auth=self.http_auth,
+                                           headers={'accept': 'application/json'})
+    if self.autoUpdate:
+      await self.start_receiving_events()
+
+  async def close(self) -> None:
+    """stops the event stream and closes the shared connection pool."""
+    await self.stop_receiving_events()
+    if self.session is not None:
+      await self.session.close()
+      self.session = None
+
+  async def __aenter__(self) -> AsyncOpenHAB:
+    await self.open()
+    return self
+
+  async def __aexit__(self, exc_type, exc_val, exc_tb) -> None:
+    await self.close()
+
+  async def _get_session(self) -> aiohttp.ClientSession:
+    if self.session is None or self.session.closed:
+      await self.open()
+    return self.session
+
+  async def _check_req_return(self, req: aiohttp.ClientResponse) -> None:
+    """Internal method for checking the return value of a REST HTTP request.
+
+    Args:
+      req (aiohttp.ClientResponse): A aiohttp response object.
+
+    Raises:
+      aiohttp.ClientResponseError: in case of a non-successful REST request.
+    """
+    if not 200 <= req.status < 300:
+      content = await req.read()
+      self.logger.error("HTTP error: {} caused by request '{}' with content '{}' ".format(req.status, req.url, content))
+      req.raise_for_status()
+
+  def _client_timeout(self) -> aiohttp.ClientTimeout:
+    return aiohttp.ClientTimeout(total=self.timeout)
+
+  async def _request(self, method: str, uri_path: str, decode_json: bool = False, **kwargs) -> typing.Any:
+    session = await self._get_session()
+    async with session.request(method, self.base_url + uri_path, timeout=self._client_timeout(), **kwargs) as r:
+      await self._check_req_return(r)
+      if decode_json:
+        return await r.json(content_type=None)
+      return None
+
+  async def req_get(self, uri_path: str) -> typing.Any:
+    """Helper method for initiating a HTTP GET request.
+
+    Args:
+      uri_path (str): The path to be used in the GET request.
+
+    Returns:
+      dict: Returns a dict containing the data returned by the OpenHAB REST server.
+    """
+    return await self._request('GET', uri_path, decode_json=True)
+
+  async def req_post(self, uri_path: str, data: typing.Optional[dict] = None, headers: typing.Optional[dict] = None) -> None:
+    """Helper method for initiating a HTTP POST request.
+
+    Args:
+      uri_path (str): The path to be used in the POST request.
+      data (dict, optional): A optional dict with data to be submitted as part of the POST request.
+    """
+    if headers is None:
+      headers = {'Content-Type': 'text/plain'}
+    await self._request('POST', uri_path, data=data, headers=headers)
+
+  async def req_json_put(self, uri_path: str, json_data: str = None, headers: typing.Optional[dict] = None) -> None:
+    """Helper method for initiating a HTTP PUT request with json data.
+
+    Args:
+      uri_path (str): The path to be used in the PUT request.
+      json_data (str): the request data as json
+    """
+    if headers is None:
+      headers = {'Content-Type': 'application/json', "Accept": "application/json"}
+    await self._request('PUT', uri_path, data=json_data, headers=headers)
+
+  async def req_del(self, uri_path: str, headers: typing.Optional[dict] = None) -> None:
+    """Helper method for initiating a HTTP DELETE request.
+
+    Args:
+      uri_path (str): The path to be used in the DELETE request.
+    """
+    if headers is None:
+      headers = {"Accept": "application/json"}
+    await self._request('DELETE', uri_path, headers=headers)
+
+  async def req_put(self, uri_path: str, data: typing.Optional[dict] = None, headers: typing.Optional[dict] = None) -> None:
+    """Helper method for initiating a HTTP PUT request.
+
+    Args:
+      uri_path (str): The path to be used in the PUT request.
+      data (dict, optional): A optional dict with data to be submitted as part of the PUT request.
+    """
+    if headers is None:
+      headers = {'Content-Type': 'text/plain'}
+    await self._request('PUT', uri_path, data=data, headers=headers)
+
+  # blocking methods of openhab.client.OpenHAB
+  get_items = _blocking_only("get_items", "Use await get_item(name) per item.")
+  send_many = _blocking_only("send_many", "Use asyncio.gather() with await item.async_command(value) per item.")
+  refresh_items = _blocking_only("refresh_items", "Use await get_item(name, force_request_to_openhab=True) per item.")
+  resync_registered_items = _blocking_only("resync_registered_items", "Use await get_item(name, force_request_to_openhab=True) per item.")
+  replay_offline_queue = _blocking_only("replay_offline_queue", "AsyncOpenHAB has no offline queue.")
+  warm_up_connection_pool = _blocking_only("warm_up_connection_pool", "AsyncOpenHAB opens the connections of its aiohttp session on demand.")
+  get_connection_pool_stats = _blocking_only("get_connection_pool_stats", "AsyncOpenHAB uses the connection pool of its aiohttp session, limited by connection_limit.")
+  get_slotted_sending_stats = _blocking_only("get_slotted_sending_stats", "Slotted sends of AsyncOpenHAB wait in wait_for_sending_slot.")
+  run_event_stream = _blocking_only("run_event_stream", "Use await start_receiving_events() or await receive_events().")
+  sse_client_handler = _blocking_only("sse_client_handler", "Use await start_receiving_events() or await receive_events().")
+  loop_for_events = _blocking_only("loop_for_events", "Await the task of start_receiving_events instead.")
+
+  async def wait_for_sending_slot(self) -> None:
+    """waits without blocking the event loop until the next slot for slotted sending is available."""
+    if self._async_slotted_modification_lock is None:
+      self._async_slotted_modification_lock = asyncio.Lock()
+    async with self._async_slotted_modification_lock:
+      now = datetime.utcnow()
+      wait_until = self._last_slotted_modification_sent + timedelta(milliseconds=self.min_time_between_slotted_changes_ms)
+      if wait_until > now:
+        await asyncio.sleep((wait_until - now).total_seconds())
+      self._last_slotted_modification_sent = datetime.utcnow()
+
+  # items
+  async def fetch_all_items(self) -> typing.Dict[str, openhab.items.Item]:
+    """Returns all items defined in openHAB.
+
+    Returns:
+      dict: Returns a dict with item names as key and item class instances as value.
+    """
+    items = {}  # type: dict
+    res = await self.req_get('/items/')
+
+    for i in res:
+      if not i['name'] in items:
+        items[i['name']] = self.json_to_item(i)
+
+    return items
+
+  async def register_all_items(self) -> None:
+    """fetches all items from openhab and caches them in all_items."""
+    self.all_items = await self.fetch_all_items()
+    for item in self.all_items.values():
+      self.register_item(item)
+
+  async def get_item_raw(self, name: str) -> typing.Any:
+    """fetches the json configuration of an item.
+
+    Args:
+      name (str): The item name to be fetched.
+
+    Returns:
+      dict: A JSON decoded dict.
+    """
+    return await self.req_get('/items/{}'.format(name))
+
+  async def get_item(self, name: str, force_request_to_openhab: typing.Optional[bool] = False, auto_update: typing.Optional[bool] = True, maxEchoToOpenhabMS=None, use_slotted_sending: bool = False) -> openhab.items.Item:
+    """Returns an item with its state and data_type as fetched from openHAB.
+
+    see openhab.client.OpenHAB.get_item for a description of the parameters.
+    Keep auto_update turned on for items of this client, as reading Item.state of an item without auto_update would require a blocking request.
+
+    Returns:
+      Item: A corresponding Item class instance with the state of the requested item.
+    """
+    if name in self.all_items and not force_request_to_openhab:
+      item = self.all_items[name]
+    else:
+      json_data = await self.get_item_raw(name)
+      item = self.json_to_item(json_data)
+    item.autoUpdate = auto_update
+    if maxEchoToOpenhabMS is not None:
+      item.maxEchoToOpenhabMS = maxEchoToOpenhabMS
+    item.use_slotted_sending = use_slotted_sending
+    return item
+
+  # audio
+  async def get_audio_defaultsink(self) -> openhab.audio.Audiosink:
+    """returns openhabs default audio sink"""
+    return openhab.audio.Audiosink.json_to_audiosink(await self._get_audio_defaultsink_raw(), self)
+
+  async def _get_audio_defaultsink_raw(self) -> typing.Dict:
+    return await self.req_get('/audio/defaultsink')
+
+  async def get_all_audiosinks(self) -> typing.List[openhab.audio.Audiosink]:
+    """returns openhabs audio sinks"""
+    return [openhab.audio.Audiosink.json_to_audiosink(sink, self) for sink in await self._get_all_audiosinks_raw()]
+
+  async def _get_all_audiosinks_raw(self) -> typing.Any:
+    return await self.req_get('/audio/sinks')
+
+  # voices
+  async def get_audio_defaultvoice(self) -> openhab.audio.Voice:
+    """returns openhabs default voice"""
+    return openhab.audio.Voice.json_to_voice(await self._get_audio_defaultvoice_raw(), self)
+
+  async def _get_audio_defaultvoice_raw(self) -> typing.Dict:
+    return await self.req_get('/voice/defaultvoice')
+
+  async def get_all_voices(self) -> typing.List[openhab.audio.Voice]:
+    """returns openhabs voices"""
+    return [openhab.audio.Voice.json_to_voice(voice, self) for voice in await self._get_all_voices_raw()]
+
+  async def _get_all_voices_raw(self) -> typing.Dict:
+    return await self.req_get('/voice/voices')
+
+  # voiceinterpreters
+  async def get_voicesinterpreter(self, id: str) -> openhab.audio.Voiceinterpreter:
+    """returns a openhab voiceinterpreter
+    Args:
+      id (str): The id of the voiceinterpreter to be fetched.
+    """
+    return openhab.audio.Voiceinterpreter.json_to_voiceinterpreter(await self._get_voicesinterpreter_raw(id), self)
+
+  async def _get_voicesinterpreter_raw(self, id: str) -> typing.Dict:
+    return await self.req_get('/voice/interpreters/{}'.format(id))
+
+  async def get_all_voicesinterpreters(self) -> typing.List[openhab.audio.Voiceinterpreter]:
+    """returns openhabs voiceinterpreters"""
+    return [openhab.audio.Voiceinterpreter.json_to_voiceinterpreter(vi, self) for vi in await self._get_all_voiceinterpreters_raw()]
+
+  async def _get_all_voiceinterpreters_raw(self) -> typing.Dict:
+    return await self.req_get('/voice/interpreters')
+
+  async def say(self, text: str, audiosinkid: str, voiceid: str) -> None:
+    self.logger.info("sending say command to OH for voiceid:'{}', audiosinkid:'{}'".format(voiceid, audiosinkid))
+    url = "/voice/say/?voiceid={voiceid}&sinkid={sinkid}".format(voiceid=requests.utils.quote(voiceid), sinkid=requests.utils.quote(audiosinkid))
+    await self._request('POST', url, data=text, headers={'Accept': 'application/json'})
+
+  async def interpret(self, text: str, voiceinterpreterid: str) -> None:
+    url = "/voice/interpreters/{interpreterid}".format(interpreterid=requests.utils.quote(voiceinterpreterid))
+    await self._request('POST', url, data=text, headers={'Accept': 'application/json'})
+
+  # UI
+  async def _get_all_widgets_raw(self):
+    return await self.req_get("/ui/components/ui%3Awidget")
+
+  async def _get_widget_raw(self, component_UID: str):
+    return await self.req_get("/ui/components/ui%3Awidget/{componentUID}".format(componentUID=component_UID))
+
+  # events
+  async def receive_events(self) -> None:
+    """receives Events from openhab on the current event loop until stop_receiving_events is called.
+
+    Events are dispatched directly on the event loop, so item and client listeners must not block.
+    Unlike openhab.client.OpenHAB.run_event_stream it always reads all item events from events_url: the state event transport,
+    server side event filters, the resync of item states after a reconnect and the liveness watchdog are not supported.
+    """
+    self.logger.info("about to connect to Openhab Events-Stream.")
+    # the stream must not be limited by the REST timeout
+    sse_timeout = aiohttp.ClientTimeout(total=None, sock_read=None)
+    attempt = 0
+    while self.__keep_event_daemon_running__:
+      connected_at = time.monotonic()
+      try:
+        session = await self._get_session()
+        async with sse_client.EventSource(self.events_url, session=session, max_connect_retry=0, **openhab.client._event_stream_callbacks(),
+                                          headers=self.sse_headers, timeout=sse_timeout, read_bufsize=self.http_buffersize) as event_source:
+          self.logger.info("starting Openhab - Event Daemon")
+          async for event in event_source:
+            if not self.__keep_event_daemon_running__:
+              return
+            self.logger.debug("dispatching Event: {}...".format(event.data[:300]))
+            item_name, event_type = self._peek_event(event.data)
+            if not self._is_event_wanted(item_name, event_type):
+              self.skipped_events += 1
+              continue
+            try:
+              self._parse_event(json.loads(event.data))
+            except openhab.types.TypeNotImplementedError as e:
+              self.logger.warning("received unknown datatye '{}' for item '{}'".format(e.datatype, e.itemname))
+            except Exception as e:
+              self.logger.warning("problem dispatching event: '{}' ".format(e))
+      except asyncio.CancelledError:
+        raise
+      except asyncio.TimeoutError:
+        self.logger.info("reconnecting after timeout")
+      except openhab.client._EventStreamEndedError:
+        self.logger.info("Openhab closed the Events-Stream.")
+      except ConnectionRefusedError as e:
+        self.logger.error("Openhab refused the Events-Stream, check the credentials: '{}'".format(e))
+      except (ConnectionError, aiohttp.ClientConnectionError) as e:
+        self.logger.warning("could not connect to the Events-Stream: '{}'".format(e))
+      except Exception as e:
+        self.logger.warning("problem receiving event: '{}' ".format(e))
+      if time.monotonic() - connected_at > self.sse_reconnect_max_delay:
+        attempt = 0
+      self.sse_reconnects += 1
+      await asyncio.sleep(self._reconnect_delay(attempt))
+      attempt += 1
+
+  async def start_receiving_events(self) -> None:
+    """start to receive events from openhab as a task on the running event loop."""
+    self.__keep_event_daemon_running__ = True
+    if self._event_task is None or self._event_task.done():
+      self._event_task = asyncio.ensure_future(self.receive_events())
+
+  async def stop_receiving_events(self) -> None:
+    """stop to receive events from openhab."""
+    self.__keep_event_daemon_running__ = False
+    if self._event_task is not None:
+      self._event_task.cancel()
+      try:
+        await self._event_task
+      except (asyncio.CancelledError, Exception):
+        pass
+      self._event_task = None
@@ -39,7 +39,7 @@ class Audiosink:
     self.label = label
 
   def say(self,text: str, voice:Voice):
-    self.openhab.say(text=text,audiosinkid=self.id, voiceid=voice.id)
+    return self.openhab.say(text=text,audiosinkid=self.id, voiceid=voice.id)
 
   def __str__(self):
     return "id:'{}', label:'{}'".format(self.id,self.label)
@@ -58,7 +58,7 @@ class Voice:
     self.locale = locale
 
   def say(self,text: str, audiosink:Audiosink):
-    audiosink.say(text=text,voice=self)
+    return audiosink.say(text=text,voice=self)
 
   def __str__(self):
     return "id:'{}', label:'{}', locale:'{}'".format(self.id, self.label,self.locale)
@@ -82,7 +82,7 @@ class Voiceinterpreter:
     self.locales = locales
 
   def interpret(self, text:str):
-    self.openhab.interpret(text=text,voiceinterpreterid=self.id)
+    return self.openhab.interpret(text=text,voiceinterpreterid=self.id)
 
   def __str__(self):
     return "id:'{}', label:'{}', locales:'{}'".format(self.id, self.label,self.locales)
\ No newline at end of file
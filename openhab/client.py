@@ -27,35 +27,95 @@ import warnings
 
 from aiohttp_sse_client import client as sse_client
 import asyncio
+import concurrent.futures
+import functools
 import threading
 import requests
 import weakref
 import json
+import random
+import time
+import zlib
 from datetime import datetime,timedelta,timezone
 from enum import Enum
 
 
 from requests.auth import HTTPBasicAuth
 from aiohttp.helpers import BasicAuth
-from aiohttp import ClientSession
+from aiohttp import ClientConnectionError, ClientSession, ClientTimeout
 
 
 import openhab.items
 import openhab.events
 import openhab.types
 import openhab.audio
+import openhab.event_queue
+import openhab.response_cache
+import openhab.scheduling
+import openhab.offline_queue
+import openhab.resilience
+import openhab.connection_pool
 
 
 __author__ = 'Georges Toth <georges@trypill.org>'
 __license__ = 'AGPLv3+'
 
+# used to look at the topic and type of a received event without decoding the whole event.
+# quotes inside the (string encoded) payload are escaped, so these only match the top level keys.
+_EVENT_TOPIC_REGEX = re.compile(r'"topic"\s*:\s*"([^"]*)"')
+_EVENT_TYPE_REGEX = re.compile(r'"type"\s*:\s*"([^"]*)"')
+
+
+class _EventStreamEndedError(Exception):
+  """raised when openHAB closed the event stream. run_event_stream then reconnects with backoff."""
+
+
+class _EventStreamStalledError(Exception):
+  """raised by the liveness watchdog when the event stream stopped delivering events. run_event_stream then reconnects."""
+
+
+def _event_stream_callbacks() -> typing.Dict[str, typing.Callable[[], None]]:
+  """returns the on_open and on_error callbacks for one sse_client.EventSource.
+
+  Once the stream is open, on_error raises _EventStreamEndedError, as sse_client.EventSource would otherwise reconnect on its own
+  with ever growing delays and the old url. A failed connect is left to sse_client.EventSource, which then raises the reason,
+  e.g. ConnectionRefusedError for a 401 answer.
+  """
+  opened = []
+
+  def on_open() -> None:
+    opened.append(True)
+
+  def on_error() -> None:
+    if opened:
+      raise _EventStreamEndedError("the event stream was closed by openHAB")
+
+  return {"on_open": on_open, "on_error": on_error}
+
+
+# the event types carrying values of items
+ITEM_VALUE_EVENT_TYPES = frozenset(["ItemCommandEvent", "ItemStateEvent", "ItemStateChangedEvent"])
+# events about added, removed or changed item definitions. They keep OpenHAB.all_items up to date.
+ITEM_REGISTRY_EVENT_TYPES = frozenset(["ItemAddedEvent", "ItemRemovedEvent", "ItemUpdatedEvent"])
+# key of the events created by resync_registered_items. It holds the item name and the number of live state events received before the states were fetched.
+_RESYNC_SNAPSHOT_KEY = "resyncSnapshot"
+# commands (POST /items/<name>) and updates (PUT /items/<name>/state) are kept in the offline queue while openHAB can not be reached
+_OFFLINE_QUEUEABLE_PATH_REGEX = re.compile(r'^/items/[^/?]+(/state)?$')
+
 
 class OpenHAB:
   """openHAB REST API client."""
+  # True for clients whose requests are coroutines, see openhab.async_client.AsyncOpenHAB
+  is_async = False
+
   class Version(Enum):
     OH2 = 2
     OH3 = 3
 
+  class EventTransport(Enum):
+    EVENTS = "events"  # /events: all item events (commands, updates, changes)
+    STATES = "states"  # /events/states (openHAB 3 only): state changes of subscribed items in a compact format
+
   def __init__(self, base_url: str,
                username: typing.Optional[str] = None,
                password: typing.Optional[str] = None,
@@ -65,7 +125,47 @@ class OpenHAB:
                openhab_version:typing.Optional[Version] = Version.OH2,
                http_headers_for_autoupdate: typing.Optional[typing.Dict[str,str]] = None,
                max_echo_to_openhab_ms: typing.Optional[int] = 800,
-               min_time_between_slotted_changes_ms: typing.Optional[float]=0) -> None:
+               min_time_between_slotted_changes_ms: typing.Optional[float]=0,
+               event_queue_capacity: int = 10000,
+               event_queue_overflow_policy: openhab.event_queue.OverflowPolicy = openhab.event_queue.OverflowPolicy.BLOCK,
+               compact_item_state_events: bool = False,
+               event_dispatcher_workers: int = 1,
+               event_dispatcher_executor: typing.Optional[concurrent.futures.Executor] = None,
+               server_side_event_filter: bool = False,
+               max_event_topic_filters: int = 50,
+               event_transport: EventTransport = EventTransport.EVENTS,
+               sse_reconnect_min_delay: float = 0.5,
+               sse_reconnect_max_delay: float = 60,
+               resync_after_reconnect: bool = True,
+               sse_idle_timeout: typing.Optional[float] = None,
+               sse_liveness_probe: bool = True,
+               response_cache_size: int = 256,
+               response_cache_ttl: float = 0,
+               response_cache_endpoint_ttls: typing.Optional[typing.Dict[str, float]] = None,
+               coalesce_gets: bool = True,
+               get_coalescing_window: float = 0,
+               item_read_ttl: float = 0,
+               bulk_fetch_threshold: int = 20,
+               max_concurrent_requests: int = 8,
+               adaptive_slotted_sending: bool = False,
+               slotted_spacing_bounds_ms: typing.Tuple[float, float] = (0, 5000),
+               echo_rtt_target_ms: float = 500,
+               pacing_lanes: openhab.scheduling.PacingLanes = openhab.scheduling.PacingLanes.GLOBAL,
+               offline_queue: bool = False,
+               offline_queue_path: typing.Optional[str] = None,
+               offline_queue_max_age: typing.Optional[float] = None,
+               offline_queue_compaction: bool = False,
+               offline_queue_retry_interval: float = 5,
+               max_retries: int = 2,
+               retry_backoff: float = 0.2,
+               retry_max_backoff: float = 5,
+               circuit_breaker_threshold: int = 5,
+               circuit_breaker_reset_timeout: float = 10,
+               pool_maxsize: int = 32,
+               pool_block: bool = False,
+               tcp_keep_alive: bool = True,
+               method_timeouts: typing.Optional[typing.Dict[str, typing.Union[float, typing.Tuple[float, float]]]] = None,
+               warm_up_connections: int = 0) -> None:
     """Class Constructor.
 
     Args:
@@ -81,6 +181,68 @@ class OpenHAB:
       max_echo_to_openhab_ms (int, optional): interpret Events from openHAB which hold a state-value equal to items current state-value
                                               which are coming in within maxEchoToOpenhabMS milliseconds since our update/command as echos of our own update//command
       min_time_between_slotted_changes_ms: the minimum time between 2 changes of items.Item which have turned on use_slotted_sending. (see description of items.Item)
+      event_queue_capacity (int, optional): the maximum number of received events waiting to be dispatched.
+      event_queue_overflow_policy (openhab.event_queue.OverflowPolicy, optional): what to do with received events while the event queue is full.
+                                              BLOCK stops reading the event stream, DROP_OLDEST discards the oldest event, COMPACT replaces queued state events of the same item.
+      compact_item_state_events (bool, optional): True: while the dispatcher is behind, queued ItemStateEvents and ItemStateChangedEvents of an item are collapsed into the newest one.
+                                              Command events are kept and the order of events per item is preserved. A collapsed ItemStateChangedEvent reports the oldest old value.
+      event_dispatcher_workers (int, optional): the number of event dispatchers. Events are sharded by item name, so the events of one item are dispatched in order
+                                              while listeners of different items run in parallel. Each shard has its own queue of event_queue_capacity events.
+                                              Listeners registered with add_event_listener may then be called from several threads at the same time.
+      event_dispatcher_executor (concurrent.futures.Executor, optional): dispatch the shards on this executor instead of dedicated threads.
+                                              At most one task per shard is running at any time.
+      server_side_event_filter (bool, optional): True: only subscribe to the events of registered items instead of all events. The subscription is renewed
+                                              (by reconnecting the event stream) when items get registered which are not covered yet.
+                                              With resync_after_reconnect the states missed while reconnecting are fetched afterwards.
+                                              As long as listeners are registered with add_event_listener all item events are subscribed.
+      max_event_topic_filters (int, optional): the maximum number of topic filters sent to openHAB. Beyond that item names are grouped by common prefixes into wildcard filters.
+      event_transport (EventTransport, optional): EVENTS receives all item events. STATES (openHAB 3 only) subscribes to the state stream for the registered items.
+                                              It only delivers state changes (as ItemStateEvent followed by ItemStateChangedEvent) with much smaller payloads, no commands.
+                                              The subscription follows the registered items automatically.
+      sse_reconnect_min_delay (float, optional): seconds to wait before the first reconnect of a lost event stream. The delay doubles (with random jitter) with every failed attempt.
+      sse_reconnect_max_delay (float, optional): the upper bound in seconds for the reconnect delay.
+      resync_after_reconnect (bool, optional): True: after the event stream was reconnected, fetch the states of all registered items in one request
+                                              and dispatch ItemStateChangedEvents for the items whose state changed during the gap.
+      sse_idle_timeout (float, optional): seconds without any event after which the event stream is suspected to be stalled, e.g. by a half-open TCP connection.
+                                          None disables the watchdog.
+      sse_liveness_probe (bool, optional): True: when the idle timeout elapsed, compare the states of the registered items with openHAB first and
+                                           only reconnect if changes were missed or openHAB can not be reached. False: always reconnect.
+      response_cache_size (int, optional): the number of GET responses kept for revalidation with ETag / Last-Modified. 0 disables the cache.
+      response_cache_ttl (float, optional): seconds a cached GET response is used without asking openHAB. 0 revalidates every time.
+      response_cache_endpoint_ttls (dict, optional): ttls for paths starting with a prefix, e.g. {"/audio/": 300, "/items": 0}.
+      coalesce_gets (bool, optional): True: concurrent identical GET requests share one request to openHAB and its result.
+      get_coalescing_window (float, optional): seconds the result of a finished GET request is also handed out to identical requests made after it.
+      item_read_ttl (float, optional): seconds the state of a item without auto_update is used before it is fetched again. 0 fetches it on every read.
+                                       Can be overridden per item with Item.read_ttl.
+      bulk_fetch_threshold (int, optional): get_items fetches this many or more items with one request for all items instead of one request per item.
+      max_concurrent_requests (int, optional): the maximum number of requests get_items and send_many run in parallel.
+      adaptive_slotted_sending (bool, optional): True: adapt the spacing of slotted sends to the time openHAB needs to echo them (see openhab.scheduling.AdaptiveSpacing)
+                                                 instead of using min_time_between_slotted_changes_ms, which is only the initial spacing then.
+      slotted_spacing_bounds_ms (tuple, optional): the lower and upper bound of the adaptive spacing in milliseconds.
+      echo_rtt_target_ms (float, optional): echoes arriving later than this many milliseconds after sending make the adaptive spacing grow.
+      pacing_lanes (PacingLanes, optional): slotted sends of different lanes do not wait for each other, a slow send only delays the later sends of its own lane. Lanes can be per group or per tag. An item can also choose its lane with Item.pacing_lane.
+      offline_queue (bool, optional): True: commands and updates of items which can not be sent because openHAB is not reachable (or answers 503 while starting)
+                                      are queued instead of raising, and replayed in order once openHAB is reachable again. While commands are queued,
+                                      new ones are queued behind them. See openhab.offline_queue.OfflineCommandQueue.
+      offline_queue_path (str, optional): persist the offline queue to this append-only file, so queued commands survive a restart. Commands found in it are replayed.
+      offline_queue_max_age (float, optional): seconds after which a queued command is dropped instead of being replayed. None keeps them forever.
+      offline_queue_compaction (bool, optional): True: only the latest queued command and the latest queued update of a item are kept.
+                                                 Only suited for absolute values (ON, 42, ...): relative commands like INCREASE, NEXT or TOGGLE
+                                                 replaced by a later one are lost. Defaults to False, which replays every queued request.
+      offline_queue_retry_interval (float, optional): seconds between attempts to replay the offline queue. A reconnect of the event stream triggers an attempt right away.
+      max_retries (int, optional): how often idempotent requests (GET, PUT, DELETE) are retried after a connection error, a timeout or a HTTP 502/503/504.
+                                   Commands (POST) are never retried. 0 disables retries.
+      retry_backoff (float, optional): seconds before the first retry. The delay doubles (with random jitter) with every retry.
+      retry_max_backoff (float, optional): the upper bound in seconds for the retry delay, also for a Retry-After header sent by openHAB.
+      circuit_breaker_threshold (int, optional): after this many consecutive failed requests openHAB is considered down and requests fail fast with
+                                                 openhab.resilience.CircuitOpenError (a requests ConnectionError) instead of being sent. 0 disables the circuit breaker.
+      circuit_breaker_reset_timeout (float, optional): seconds after which a open circuit breaker lets one request through to probe whether openHAB is back.
+      pool_maxsize (int, optional): the number of connections to openHAB kept open for reuse. Size it to the number of threads sending requests at the same time,
+                                    connections beyond it are closed after their request.
+      pool_block (bool, optional): True: requests wait for a free connection when pool_maxsize connections are busy instead of opening a additional one.
+      tcp_keep_alive (bool, optional): True: enable TCP keep-alive on the connections, so idle connections to a vanished openHAB are detected.
+      method_timeouts (dict, optional): timeouts per HTTP method overriding timeout, e.g. {"GET": 5, "POST": (3, 10)}. A tuple holds the connect and the read timeout.
+      warm_up_connections (int, optional): open this many connections in the background right away, so the first requests do not pay for connecting.
     Returns:
       OpenHAB: openHAB class instance.
     """
@@ -88,15 +250,35 @@ class OpenHAB:
     self.openhab_version = openhab_version
     if self.openhab_version == OpenHAB.Version.OH2:
       self.events_url = "{}/events?topics=smarthome/items".format(base_url.strip('/'))
+      self.item_topic_prefix = "smarthome/items"
     elif self.openhab_version == OpenHAB.Version.OH3:
       self.events_url = "{}/events".format(base_url.strip('/'))
+      self.item_topic_prefix = "openhab/items"
     else:
       raise ValueError("Unknown Openhab Version specified")
+    if event_transport == OpenHAB.EventTransport.STATES and self.openhab_version != OpenHAB.Version.OH3:
+      raise ValueError("the state event transport requires openHAB 3")
+    self.event_transport = event_transport
+    self.server_side_event_filter = server_side_event_filter
+    self.max_event_topic_filters = max_event_topic_filters
+    self._subscribed_item_filter: typing.Optional[typing.Pattern] = None  # None: all items are subscribed
+    self._event_filter_outdated_since: typing.Optional[float] = None
     self.autoUpdate = auto_update
     self.session = requests.Session()
     self.session.headers['accept'] = 'application/json'
+    self.pool_maxsize = pool_maxsize
+    self.connection_pool = openhab.connection_pool.PooledHTTPAdapter(pool_maxsize=pool_maxsize, pool_block=pool_block, tcp_keep_alive=tcp_keep_alive)
+    self.session.mount("http://", self.connection_pool)
+    self.session.mount("https://", self.connection_pool)
+    self.response_cache: typing.Optional[openhab.response_cache.ResponseCache] = None
+    if response_cache_size > 0:
+      self.response_cache = openhab.response_cache.ResponseCache(max_entries=response_cache_size, default_ttl=response_cache_ttl, endpoint_ttls=response_cache_endpoint_ttls)
+    self._single_flight: typing.Optional[openhab.response_cache.SingleFlight] = None
+    if coalesce_gets:
+      self._single_flight = openhab.response_cache.SingleFlight(window=get_coalescing_window)
     self.registered_items = weakref.WeakValueDictionary()
     self.all_items:typing.Dict[str,openhab.items.Item] = {}
+    self._maintain_all_items = False
     self.http_buffersize = 4*1024*1024
     self.http_auth=http_auth
     if http_headers_for_autoupdate is None:
@@ -109,11 +291,39 @@ class OpenHAB:
       self.session.auth = HTTPBasicAuth(username, password)
 
     self.timeout = timeout
+    self.method_timeouts = {method.upper(): method_timeout for method, method_timeout in (method_timeouts or {}).items()}
+    self.retry_policy = openhab.resilience.RetryPolicy(max_retries=max_retries, backoff=retry_backoff, max_backoff=retry_max_backoff)
+    self.circuit_breaker = openhab.resilience.CircuitBreaker(failure_threshold=circuit_breaker_threshold, reset_timeout=circuit_breaker_reset_timeout)
+    self.request_retries = 0
+    self.requests_failed_after_retries = 0
+    self.item_read_ttl = item_read_ttl
+    self.bulk_fetch_threshold = bulk_fetch_threshold
+    self.max_concurrent_requests = max_concurrent_requests
     self.maxEchoToOpenhabMS = max_echo_to_openhab_ms
 
     self.logger = logging.getLogger(__name__)
     self.sseDaemon = None
     self.sse_event_dispatcher_daemon = None
+    self.sse_reconnect_min_delay = sse_reconnect_min_delay
+    self.sse_reconnect_max_delay = sse_reconnect_max_delay
+    self.sse_reconnects = 0
+    self._event_stream_loop: typing.Optional[asyncio.AbstractEventLoop] = None
+    self._event_stream_task: typing.Optional[asyncio.Task] = None
+    self.resync_after_reconnect = resync_after_reconnect
+    self._event_stream_lost_at: typing.Optional[float] = None
+    self.resyncs = 0
+    self.last_resync_gap_seconds: typing.Optional[float] = None
+    self.last_resync_changed_items: typing.Optional[int] = None
+    self.resync_events_superseded = 0
+    # live state events received from the event stream, in total and the number at the last one per item
+    self._live_state_events_received = 0
+    self._live_state_event_numbers: typing.Dict[str, int] = {}
+    self.sse_idle_timeout = sse_idle_timeout
+    self.sse_liveness_probe = sse_liveness_probe
+    self.sse_stalls_detected = 0
+    self.sse_stall_false_positives = 0
+    self.last_stall_detection_latency: typing.Optional[float] = None
+    self._verify_stall_on_resync = False
     self.__keep_event_daemon_running__ = False
     self.__wait_while_looping = threading.Event()
     #self.sse_session = ClientSession()
@@ -121,11 +331,43 @@ class OpenHAB:
     self._last_slotted_modification_sent = datetime.fromtimestamp(0)
     self._slotted_modification_lock = threading.RLock()
     self.min_time_between_slotted_changes_ms = min_time_between_slotted_changes_ms
-    self.incoming_events = []
-    self.incoming_events_rlock = threading.RLock()
+    self.adaptive_slotted_sending = adaptive_slotted_sending
+    self.slotted_spacing_bounds_ms = slotted_spacing_bounds_ms
+    self.echo_rtt_target_ms = echo_rtt_target_ms
+    self.pacing_lanes = pacing_lanes
+    self._adaptive_spacings: typing.Dict[typing.Optional[str], openhab.scheduling.AdaptiveSpacing] = {}
+    self._adaptive_spacings_lock = threading.Lock()
+    self.slotted_scheduler = openhab.scheduling.SlottedScheduler(self._slotted_spacing)
+    self.offline_queue: typing.Optional[openhab.offline_queue.OfflineCommandQueue] = None
+    self.offline_queue_retry_interval = offline_queue_retry_interval
+    self._offline_replay_wakeup = threading.Event()
+    self._offline_replay_lock = threading.Lock()
+    self._offline_replay_daemon: typing.Optional[threading.Thread] = None
+    if offline_queue:
+      self.offline_queue = openhab.offline_queue.OfflineCommandQueue(path=offline_queue_path, max_age=offline_queue_max_age, compact=offline_queue_compaction)
+      if len(self.offline_queue) > 0:
+        self.logger.info("replaying {} commands queued while openHAB was offline".format(len(self.offline_queue)))
+        self._offline_replay_wakeup.set()
+        self._start_offline_replay()
+    if event_dispatcher_workers < 1:
+      raise ValueError("event_dispatcher_workers must be at least 1")
+    self.event_shards: typing.List[openhab.event_queue.EventQueue] = [openhab.event_queue.EventQueue(capacity=event_queue_capacity,
+                                                                                                      overflow_policy=event_queue_overflow_policy,
+                                                                                                      compact_state_events=compact_item_state_events,
+                                                                                                      merge_compacted=self._merge_compacted_events)
+                                                                      for _ in range(event_dispatcher_workers)]
+    self.incoming_events = self.event_shards[0]
+    self.event_dispatcher_executor = event_dispatcher_executor
+    self.sse_event_dispatcher_daemons: typing.List[threading.Thread] = []
+    self._shard_scheduled = [False] * event_dispatcher_workers
+    self._shard_schedule_lock = threading.Lock()
+    # registry events of different items are dispatched by different shards, but change the same all_items and group members
+    self._item_registry_lock = threading.Lock()
     self.__keep_event_dispatcher_running__ = False
     self.__dispatcher_is_running = False
-    self.__sse_event_received = threading.Event()
+    self.skipped_events = 0
+    if warm_up_connections > 0:
+      threading.Thread(target=self.warm_up_connection_pool, args=(warm_up_connections,), name="openhab-connection-warm-up", daemon=True).start()
     if self.autoUpdate:
       self.__installSSEClient__()
 
@@ -170,26 +412,117 @@ class OpenHAB:
       event_reason = event_data["type"]
 
 
-      if event_reason in ["ItemCommandEvent", "ItemStateEvent", "ItemStateChangedEvent"]:
+      if event_reason in ITEM_VALUE_EVENT_TYPES:
         item_name = event_data["topic"].split("/")[-2]
-        event_data = json.loads(event_data["payload"])
+        item = self.registered_items.get(item_name)
+        if item is None and not self.eventListeners:
+          # nobody is interested in this event, so don´t even decode the payload
+          self.skipped_events += 1
+          self.logger.debug("item '{}' not registered. ignoring the arrived event.".format(item_name))
+          return
+        event_data = event_data["payload"]
+        if isinstance(event_data, str):
+          event_data = json.loads(event_data)
 
         raw_event = openhab.events.RawItemEvent(item_name=item_name, event_type=event_reason, content=event_data)
         log.debug("about to inform listeners")
         self._inform_event_listeners(raw_event)
 
-        if item_name in self.registered_items:
-          item = self.registered_items[item_name]
-          if item is None:
-            self.logger.warning("item '{}' was removed in all scopes. Ignoring the events coming in for it.".format(item_name))
-          else:
-            item._process_external_event(raw_event)
+        if item is not None:
+          item._process_external_event(raw_event)
         else:
           self.logger.debug("item '{}' not registered. ignoring the arrived event.".format(item_name))
 
+      elif event_reason in ITEM_REGISTRY_EVENT_TYPES and self._maintain_all_items:
+        payload = event_data["payload"]
+        if isinstance(payload, str):
+          payload = json.loads(payload)
+        self._apply_item_registry_event(event_reason, event_data["topic"].split("/")[-2], payload)
+
     else:
       log.debug("received unknown Event-data_type in Openhab Event stream: {}".format(event_data))
 
+  def _apply_item_registry_event(self, event_type: str, item_name: str, payload: typing.Any) -> None:
+    """updates all_items after an item was added, removed or changed in openHAB.
+
+    Args:
+      event_type (str): ItemAddedEvent, ItemRemovedEvent or ItemUpdatedEvent.
+      item_name (str): the name of the item.
+      payload: the decoded payload. For ItemUpdatedEvent it holds the new and the old definition.
+    """
+    with self._item_registry_lock:
+      old_item = self.all_items.get(item_name)
+      if old_item is not None:
+        for group_name in old_item.groupNames or ():
+          group = self.all_items.get(group_name)
+          if group is not None:
+            group.members.pop(item_name, None)
+
+      if event_type == "ItemRemovedEvent":
+        self.logger.debug("item '{}' was removed".format(item_name))
+        self.all_items.pop(item_name, None)
+        return
+
+      item_json = payload[0] if event_type == "ItemUpdatedEvent" else payload
+      is_group = item_json["type"] == "Group"
+      new_type = item_json.get("groupType") if is_group else item_json["type"]
+      if old_item is not None and old_item.type_ == new_type and old_item.group == is_group:
+        # same kind of item, so keep the instance and its state
+        old_item.groupNames = ""
+        old_item.init_from_json(item_json)
+        item = old_item
+      else:
+        item = self.json_to_item(item_json)
+        # a changed item type needs a new instance, which replaces the old one for the events and keeps its listeners
+        replaced_item = self.registered_items.get(item_name)
+        if replaced_item is not None and replaced_item is not item:
+          item._take_over_from(replaced_item)
+        self.registered_items[item_name] = item
+      self.logger.debug("item '{}' was {}".format(item_name, "added" if old_item is None else "updated"))
+      self.all_items[item_name] = item
+
+      for group_name in item.groupNames or ():
+        group = self.all_items.get(group_name)
+        if group is not None:
+          group.members[item_name] = item
+      if item.group:
+        item.members.clear()
+        for member in self.all_items.values():
+          if item_name in (member.groupNames or ()):
+            item.members[member.name] = member
+
+  @staticmethod
+  def _peek_event(raw_event_data: str) -> typing.Tuple[typing.Optional[str], typing.Optional[str]]:
+    """extracts the item name and the event type of a received event without decoding it.
+
+    Args:
+      raw_event_data (str): the event as received from the event stream
+
+    Returns:
+      tuple: item name (None if the event does not belong to an item) and event type
+    """
+    item_name = None
+    event_type = None
+    m = _EVENT_TOPIC_REGEX.search(raw_event_data)
+    if m:
+      topic = m.group(1)
+      if "/items/" in topic:
+        item_name = topic.split("/")[-2]
+    m = _EVENT_TYPE_REGEX.search(raw_event_data)
+    if m:
+      event_type = m.group(1)
+    return item_name, event_type
+
+  def _is_event_wanted(self, item_name: typing.Optional[str], event_type: typing.Optional[str]) -> bool:
+    """checks if anybody will consume an event with the given item name and event type."""
+    if event_type in ITEM_REGISTRY_EVENT_TYPES:
+      return self._maintain_all_items
+    if event_type not in ITEM_VALUE_EVENT_TYPES:
+      return False
+    if self.eventListeners:
+      return True
+    return item_name in self.registered_items
+
   def _inform_event_listeners(self, event: openhab.events.RawItemEvent):
     """internal method to send itemevents to listeners.
           Args:
@@ -207,6 +540,9 @@ class OpenHAB:
               listener:typing.Callable[[openhab.events.ItemEvent] a method with one parameter of data_type openhab.events.ItemEvent which will be called for every event
         """
     self.eventListeners.append(listener)
+    if self._subscribed_item_filter is not None:
+      # the listener wants the events of all items
+      self._mark_event_filter_outdated()
 
   def remove_event_listener(self, listener: typing.Optional[typing.Callable[[openhab.events.RawItemEvent], None]] = None):
     """method to unregister a callback function to stop getting informed about all Item-Events received from openhab.
@@ -218,85 +554,543 @@ class OpenHAB:
     elif listener in self.eventListeners:
       self.eventListeners.remove(listener)
 
-  def event_dispatcher_thread(self):
+  def _shard_for(self, item_name: typing.Optional[str]) -> int:
+    """returns the index of the event shard responsible for the given item. Events not belonging to an item go to the first shard."""
+    if item_name is None or len(self.event_shards) == 1:
+      return 0
+    return zlib.crc32(item_name.encode("utf-8")) % len(self.event_shards)
+
+  def _dispatch_event_data(self, event_data: typing.Union[str, typing.Dict]) -> None:
+    try:
+      self.logger.debug("dispatching Event: {}...".format(str(event_data)[:300]))
+      if isinstance(event_data, str):
+        event_data = json.loads(event_data)
+      if _RESYNC_SNAPSHOT_KEY in event_data:
+        event_data = dict(event_data)
+        snapshot = event_data.pop(_RESYNC_SNAPSHOT_KEY)
+        if self._live_state_event_numbers.get(snapshot["item"], 0) > snapshot["received"]:
+          # the state was fetched before a live event which is already dispatched or waiting in the queue
+          self.resync_events_superseded += 1
+          return
+      self._parse_event(event_data)
+    except Exception as e:
+      self.logger.warning("problem dispatching event: '{}' ".format(e))
+
+  def _enqueue_event(self, event_data: typing.Union[str, typing.Dict], item_name: typing.Optional[str], event_type: typing.Optional[str]) -> None:
+    """hands over a received event (raw or decoded) to the dispatcher of the responsible shard."""
+    shard_index = self._shard_for(item_name)
+    if not self.event_shards[shard_index].put(event_data, item_name=item_name, event_type=event_type):
+      self.logger.warning("event queue is full. dropped event for item '{}'".format(item_name))
+      return
+    self._schedule_shard(shard_index)
+
+  async def _enqueue_event_async(self, event_data: typing.Union[str, typing.Dict], item_name: typing.Optional[str], event_type: typing.Optional[str]) -> None:
+    """like _enqueue_event, for the readers running on the asyncio loop.
+    While a shard with OverflowPolicy.BLOCK is full, the reader waits for room in the default executor instead of blocking the loop."""
+    if item_name is not None and event_type in openhab.event_queue.COMPACTABLE_EVENT_TYPES:
+      self._live_state_events_received += 1
+      self._live_state_event_numbers[item_name] = self._live_state_events_received
+    shard_index = self._shard_for(item_name)
+    shard = self.event_shards[shard_index]
+    if not shard.put_nowait(event_data, item_name=item_name, event_type=event_type):
+      put = functools.partial(shard.put, event_data, item_name=item_name, event_type=event_type)
+      if not await asyncio.get_event_loop().run_in_executor(None, put):
+        self.logger.warning("event queue is full. dropped event for item '{}'".format(item_name))
+        return
+    self._schedule_shard(shard_index)
+
+  def _schedule_shard(self, shard_index: int) -> None:
+    """submits the draining of a shard to the event_dispatcher_executor unless it is already scheduled."""
+    if self.event_dispatcher_executor is not None:
+      with self._shard_schedule_lock:
+        if self._shard_scheduled[shard_index]:
+          return
+        self._shard_scheduled[shard_index] = True
+      self._submit_drain_shard(shard_index)
+
+  def _submit_drain_shard(self, shard_index: int, max_batch: int = 100) -> None:
+    try:
+      self.event_dispatcher_executor.submit(self._drain_shard, shard_index, max_batch)
+    except Exception as e:
+      # e.g. the executor was shut down. The next event schedules the shard again.
+      with self._shard_schedule_lock:
+        self._shard_scheduled[shard_index] = False
+      self.logger.warning("could not schedule the dispatching of events: '{}' ".format(e))
+
+  def _drain_shard(self, shard_index: int, max_batch: int = 100) -> None:
+    """dispatches queued events of a shard on the event_dispatcher_executor.
+    After max_batch events the task resubmits itself to give other shards a chance on a small executor.
+    """
+    shard = self.event_shards[shard_index]
+    for _ in range(max_batch):
+      event_data = shard.get(timeout=0)
+      if event_data is None:
+        with self._shard_schedule_lock:
+          if len(shard) == 0:
+            self._shard_scheduled[shard_index] = False
+            return
+        continue
+      self._dispatch_event_data(event_data)
+    self._submit_drain_shard(shard_index, max_batch)
+
+  def event_dispatcher_thread(self, shard_index: int = 0):
     ct = threading.currentThread()
-    ct.name = "sse_event_dispatcher (started at {})".format(datetime.now())
+    ct.name = "sse_event_dispatcher {} (started at {})".format(shard_index, datetime.now())
     self.__dispatcher_is_running = True
+    shard = self.event_shards[shard_index]
     while True:
       if not self.__keep_event_dispatcher_running__:
         self.__dispatcher_is_running = False
         return
-      event_data = None
-      try:
-        self.incoming_events_rlock.acquire()
-        try:
-          if len(self.incoming_events) > 0:
-            event_data = self.incoming_events.pop(0)
-        finally:
-          self.incoming_events_rlock.release()
-        if event_data is None:
-          #no data available in Q, so we wait 10seconds for a wakeup event
-          self.__sse_event_received.wait(10)
-          self.__sse_event_received.clear()
+      # wait at most 10 seconds for new data to recheck if we shall keep running
+      event_data = shard.get(timeout=10)
+      if event_data is not None:
+        self._dispatch_event_data(event_data)
+
+  @staticmethod
+  def _merge_compacted_events(queued_event_data: typing.Union[str, typing.Dict], newer_event_data: typing.Union[str, typing.Dict]) -> typing.Union[str, typing.Dict]:
+    """merges two queued events of the same item and type. The newer state wins, but a ItemStateChangedEvent keeps the old state of the queued one.
+
+    Args:
+      queued_event_data (str or dict): the raw or decoded event data waiting in the queue
+      newer_event_data (str or dict): the raw or decoded event data that just arrived
+
+    Returns:
+      the event data to dispatch instead of both.
+    """
+    newer = json.loads(newer_event_data) if isinstance(newer_event_data, str) else newer_event_data
+    if newer.get("type") != "ItemStateChangedEvent":
+      return newer_event_data
+    queued = json.loads(queued_event_data) if isinstance(queued_event_data, str) else queued_event_data
+    queued_payload = json.loads(queued["payload"]) if isinstance(queued["payload"], str) else queued["payload"]
+    newer_payload = json.loads(newer["payload"]) if isinstance(newer["payload"], str) else dict(newer["payload"])
+    newer_payload["oldType"] = queued_payload.get("oldType")
+    newer_payload["oldValue"] = queued_payload.get("oldValue")
+    merged_event_data = dict(newer)
+    merged_event_data["payload"] = newer_payload
+    return merged_event_data
+
+  def get_event_queue_stats(self) -> typing.Dict[str, int]:
+    """returns the counters of the queues between the event stream reader and the event dispatchers summed up over all shards.
+
+    Returns:
+      dict: depth, high_water_mark (of the fullest shard), received, dropped and compacted events and the number of events
+            skipped without decoding as no registered item or listener wanted them.
+    """
+    result = {"depth": 0, "high_water_mark": 0, "received": 0, "dropped": 0, "compacted": 0}
+    for shard_stats in self.get_event_shard_stats():
+      for key in result:
+        if key == "high_water_mark":
+          result[key] = max(result[key], shard_stats[key])
         else:
-          self.logger.debug("dispatching Event: {}...".format(str(event_data)[:300]))
-          self._parse_event(event_data)
-      except Exception as e:
-        self.logger.warning("problem dispatching event: '{}' ".format(e))
+          result[key] += shard_stats[key]
+    result["skipped"] = self.skipped_events
+    return result
 
+  def get_event_shard_stats(self) -> typing.List[typing.Dict[str, int]]:
+    """returns the counters of the event queue of every dispatcher shard.
 
-  def sse_client_handler(self):
-    """the actual handler to receive Events from openhab
-            """
-    self.logger.info("about to connect to Openhab Events-Stream.")
-    ct = threading.currentThread()
-    ct.name = "sse_client_handler started at {}".format(datetime.now())
-    # this curls works:
-    # iobroker @ iobrokerserver: ~$ curl - X
-    # GET
-    # "http://10.10.20.85:8080/rest/events" - H
-    # "accept: */*" - H
-    # "Authorization: oh.ingenioushome.vFACRDQPY0Pf7JwgXZcqUz9rjrJYt0IZaeVobkrkLNfVx3mzhiWAdTqApWt3B2hL21z82eFj1VFbHqOMAAhQ"
+    Returns:
+      list: one dict per shard as returned by openhab.event_queue.EventQueue.get_stats
+    """
+    return [shard.get_stats() for shard in self.event_shards]
 
-    async def run_loop():
+  @staticmethod
+  def _group_item_name_filters(names: typing.Iterable[str], max_filters: int) -> typing.List[str]:
+    """builds at most max_filters item name filters covering all given names.
 
+    Names are used as they are while they fit. Otherwise they are grouped by the longest common prefix length that
+    still fits, e.g. "Light*" for Light_Kitchen and Light_Bath.
 
+    Args:
+      names: the item names to cover.
+      max_filters (int): the maximum number of filters.
 
+    Returns:
+      list: the filters, an empty list if the names can not be grouped into max_filters filters.
+    """
+    names = sorted(set(names))
+    if len(names) <= max_filters:
+      return names
+    best: typing.List[str] = []
+    for length in range(1, max(len(name) for name in names) + 1):
+      prefixes = sorted({name[:length] for name in names})
+      if len(prefixes) > max_filters:
+        break
+      best = ["{}*".format(prefix) for prefix in prefixes]
+    return best
+
+  def _get_events_url(self) -> str:
+    """returns the url of the event stream and remembers which items it covers."""
+    self._event_filter_outdated_since = None
+    if not self.server_side_event_filter or self.eventListeners or len(self.registered_items) == 0:
+      self._subscribed_item_filter = None
+      return self.events_url
+    name_filters = self._group_item_name_filters(list(self.registered_items.keys()), self.max_event_topic_filters)
+    if not name_filters:
+      self._subscribed_item_filter = None
+      return self.events_url
+    self._subscribed_item_filter = re.compile("^(?:{})$".format("|".join(re.escape(name_filter).replace("\\*", ".*") for name_filter in name_filters)))
+    topics = ",".join("{}/{}/*".format(self.item_topic_prefix, name_filter) for name_filter in name_filters)
+    if self._maintain_all_items:
+      topics += "".join(",{}/*/{}".format(self.item_topic_prefix, action) for action in ("added", "removed", "updated"))
+    return "{}/events?topics={}".format(self.base_url.strip('/'), topics)
+
+  def _mark_event_filter_outdated(self) -> None:
+    if self.server_side_event_filter and self._event_filter_outdated_since is None:
+      self._event_filter_outdated_since = time.monotonic()
+
+  async def _wait_for_outdated_event_filter(self, debounce_seconds: float = 1.0) -> None:
+    """returns once the subscribed topics do not cover the registered items anymore.
+    Waits for debounce_seconds after the first change, so registering many items causes one reconnect only."""
+    while True:
+      await asyncio.sleep(debounce_seconds / 2)
+      outdated_since = self._event_filter_outdated_since
+      if outdated_since is not None and time.monotonic() - outdated_since >= debounce_seconds:
+        self.logger.info("registered items changed. renewing the event subscription.")
+        return
 
-      async with sse_client.EventSource(self.events_url, headers=self.sse_headers, read_bufsize=self.http_buffersize) as event_source:
+  @staticmethod
+  def _state_type_name_for(item: typing.Optional[openhab.items.Item], raw_state: str) -> str:
+    """guesses the openHAB state type name of a raw state for cases where openHAB does not send it."""
+    if raw_state in openhab.types.CommandType.UNDEFINED_STATES:
+      return openhab.types.UndefType.TYPENAME
+    if item is not None and item.state_types:
+      return item.state_types[0].TYPENAME
+    return openhab.types.StringType.TYPENAME
+
+  def _post_state_subscription(self, connection_id: str, item_names: typing.List[str]) -> None:
+    self.logger.debug("subscribing to the states of {} items".format(len(item_names)))
+    self.req_post('/events/states/{}'.format(connection_id), data=json.dumps(item_names), headers={'Content-Type': 'application/json'})
+
+  async def _keep_state_subscription_updated(self, connection_id: str, check_interval_seconds: float = 1.0) -> None:
+    """posts the names of the registered items to the state stream whenever they change.
+    A failed post is retried after check_interval_seconds."""
+    subscribed: typing.Optional[typing.Set[str]] = None
+    loop = asyncio.get_event_loop()
+    while True:
+      item_names = set(self.registered_items.keys())
+      if item_names != subscribed:
         try:
+          await loop.run_in_executor(None, self._post_state_subscription, connection_id, sorted(item_names))
+          subscribed = item_names
+        except Exception as e:
+          self.logger.warning("problem updating the items of the state stream: '{}' ".format(e))
+      await asyncio.sleep(check_interval_seconds)
+
+  async def _enqueue_item_states(self, states_data: str, last_states: typing.Dict[str, typing.Tuple[str, str]]) -> None:
+    """converts a message of the state stream into ItemStateEvents and ItemStateChangedEvents and queues them for dispatching.
 
-          self.logger.info("starting Openhab - Event Daemon")
-          async for event in event_source:
-            if not self.__keep_event_daemon_running__:
-              self.sseDaemon = None
-              return
-            event_data = json.loads(event.data)
-            self.logger.debug("received Event: {}...".format(str(event_data)[:300]))
-            self.incoming_events_rlock.acquire()
-            try:
-              self.incoming_events.append(event_data)
-            finally:
-              self.incoming_events_rlock.release()
-            self.__sse_event_received.set() # inform dispatcher thread about the new event
-            #self._parse_event(event_data)
-
-        except ConnectionError as exception:
-          self.logger.error("connection error")
-          self.logger.exception(exception)
-    while self.__keep_event_daemon_running__:
-      # keep restarting the handler after timeouts or connection issues
+    Args:
+      states_data (str): the received message. A json object mapping item names to states.
+      last_states (dict): the last (type, state) received per item on this connection.
+    """
+    for item_name, state_dto in json.loads(states_data).items():
+      if not self._is_event_wanted(item_name, "ItemStateEvent"):
+        self.skipped_events += 1
+        continue
+      raw_state = state_dto.get("state")
+      state_type = state_dto.get("type") or self._state_type_name_for(self.registered_items.get(item_name), raw_state)
+      topic = "{}/{}/state".format(self.item_topic_prefix, item_name)
+      await self._enqueue_event_async({"topic": topic, "type": "ItemStateEvent", "payload": {"type": state_type, "value": raw_state}}, item_name=item_name, event_type="ItemStateEvent")
+      last = last_states.get(item_name)
+      if last is not None and last != (state_type, raw_state):
+        payload = {"type": state_type, "value": raw_state, "oldType": last[0], "oldValue": last[1]}
+        topic = "{}/{}/statechanged".format(self.item_topic_prefix, item_name)
+        await self._enqueue_event_async({"topic": topic, "type": "ItemStateChangedEvent", "payload": payload}, item_name=item_name, event_type="ItemStateChangedEvent")
+      last_states[item_name] = (state_type, raw_state)
+
+  async def _read_item_states(self, session: ClientSession) -> None:
+    """receives the openHAB 3 state stream. The first message carries the connection id used to subscribe items."""
+    states_url = "{}/events/states".format(self.base_url.strip('/'))
+    subscription_updater = None
+    last_states: typing.Dict[str, typing.Tuple[str, str]] = {}
+    try:
+      async with sse_client.EventSource(states_url, session=session, max_connect_retry=0, **_event_stream_callbacks(), headers=self.sse_headers, read_bufsize=self.http_buffersize) as event_source:
+        self.logger.info("starting Openhab - State Event Daemon")
+        async for event in self._watch_event_stream(event_source):
+          if not self.__keep_event_daemon_running__:
+            return
+          if subscription_updater is None:
+            subscription_updater = asyncio.ensure_future(self._keep_state_subscription_updated(event.data.strip()))
+            self._event_stream_connected()
+            continue
+          self.logger.debug("received states: {}...".format(event.data[:300]))
+          await self._enqueue_item_states(event.data, last_states)
+    finally:
+      if subscription_updater is not None:
+        subscription_updater.cancel()
+
+  async def _read_events(self, session: ClientSession) -> None:
+    """receives the openHAB event stream until it ends or fails."""
+    async with sse_client.EventSource(self._get_events_url(), session=session, max_connect_retry=0, **_event_stream_callbacks(), headers=self.sse_headers, read_bufsize=self.http_buffersize) as event_source:
       try:
-        asyncio.run(run_loop())
-      except asyncio.TimeoutError:
-        self.logger.info("reconnecting after timeout")
-      except openhab.types.TypeNotImplementedError as e:
-        self.logger.warning("received unknown datatye '{}' for item '{}'".format(e.datatype,e.itemname))
+
+        self.logger.info("starting Openhab - Event Daemon")
+        self._event_stream_connected()
+        async for event in self._watch_event_stream(event_source):
+          if not self.__keep_event_daemon_running__:
+            return
+          self.logger.debug("received Event: {}...".format(event.data[:300]))
+          item_name, event_type = self._peek_event(event.data)
+          if not self._is_event_wanted(item_name, event_type):
+            self.skipped_events += 1
+            continue
+          # the event is decoded by the dispatcher
+          await self._enqueue_event_async(event.data, item_name=item_name, event_type=event_type)
+
+      except ConnectionError as exception:
+        self.logger.error("connection error")
+        self.logger.exception(exception)
+
+  async def _watch_event_stream(self, event_source: sse_client.EventSource) -> typing.AsyncIterator[sse_client.MessageEvent]:
+    """yields the events of event_source. If sse_idle_timeout is set, the stream is checked for liveness whenever
+    no event arrived for that many seconds and _EventStreamStalledError is raised if it is stalled.
+    """
+    events = event_source.__aiter__()
+    last_event_at = time.monotonic()
+    pending = None
+    try:
+      while True:
+        if pending is None:
+          # the read is never cancelled by the watchdog, so no partially received event gets lost
+          pending = asyncio.ensure_future(events.__anext__())
+        done, _ = await asyncio.wait([pending], timeout=self.sse_idle_timeout)
+        if not done:
+          await self._check_event_stream_liveness(last_event_at)
+          continue
+        try:
+          event = pending.result()
+        except StopAsyncIteration:
+          return
+        finally:
+          if pending.done():
+            pending = None
+        last_event_at = time.monotonic()
+        yield event
+    finally:
+      if pending is not None:
+        pending.cancel()
+
+  async def _check_event_stream_liveness(self, last_event_at: float) -> None:
+    """called when the event stream was idle for sse_idle_timeout seconds. Raises _EventStreamStalledError if it is stalled."""
+    reason = "no event for {:.1f} seconds".format(time.monotonic() - last_event_at)
+    if self.sse_liveness_probe:
+      try:
+        missed_changes = await asyncio.get_event_loop().run_in_executor(None, self._count_missed_state_changes)
       except Exception as e:
-        self.logger.warning("problem receiving event: '{}' ".format(e))
+        missed_changes = None
+        reason = "{} and openHAB did not answer: '{}'".format(reason, e)
+      if missed_changes == 0:
+        self.sse_stall_false_positives += 1
+        self.logger.debug("event stream was idle, but no state changes were missed")
+        return
+      if missed_changes is not None:
+        reason = "{} while {} items changed their state".format(reason, missed_changes)
+    else:
+      # whether the stream really was stalled is only known after the resync
+      self._verify_stall_on_resync = True
+    self.sse_stalls_detected += 1
+    self.last_stall_detection_latency = time.monotonic() - last_event_at
+    raise _EventStreamStalledError(reason)
 
+  async def _run_event_connection(self, session: ClientSession) -> bool:
+    """runs one connection of the configured event transport.
 
-    self.sseDaemon = None
+    Returns:
+      bool: True if the connection was closed on purpose to renew the server side event filter.
+    """
+    if self.event_transport == OpenHAB.EventTransport.STATES:
+      await self._read_item_states(session)
+      return False
+    if not self.server_side_event_filter:
+      await self._read_events(session)
+      return False
+    reader = asyncio.ensure_future(self._read_events(session))
+    filter_watcher = asyncio.ensure_future(self._wait_for_outdated_event_filter())
+    try:
+      done, _ = await asyncio.wait([reader, filter_watcher], return_when=asyncio.FIRST_COMPLETED)
+    finally:
+      for task in (reader, filter_watcher):
+        task.cancel()
+    if reader in done and reader.exception() is not None:
+      raise reader.exception()
+    return filter_watcher in done
+
+  def _event_stream_connected(self) -> None:
+    """called whenever the event stream is (re)connected. Starts the resynchronisation of item states after a reconnect."""
+    lost_at = self._event_stream_lost_at
+    self._event_stream_lost_at = None
+    # openHAB is reachable again, so do not wait for the next retry of the offline queue
+    self._offline_replay_wakeup.set()
+    if lost_at is None or not self.resync_after_reconnect:
+      return
+    gap_seconds = time.monotonic() - lost_at
+    self.logger.info("event stream was interrupted for {:.1f} seconds. resynchronising item states.".format(gap_seconds))
+    resync = asyncio.get_event_loop().run_in_executor(None, self._resync_after_gap, gap_seconds)
+    resync.add_done_callback(lambda future: future.cancelled() or future.exception() is None or self.logger.warning("resynchronising item states failed: '{}' ".format(future.exception())))
+
+  def _resync_after_gap(self, gap_seconds: float) -> None:
+    changed_items = self.resync_registered_items()
+    if self._verify_stall_on_resync:
+      self._verify_stall_on_resync = False
+      if changed_items == 0:
+        self.sse_stall_false_positives += 1
+    self.resyncs += 1
+    self.last_resync_gap_seconds = gap_seconds
+    self.last_resync_changed_items = changed_items
+
+  def resync_registered_items(self) -> int:
+    """fetches the states of all items in one request and dispatches a ItemStateChangedEvent for every registered item
+    whose cached state differs. Use it after events might have been lost.
+    Such a event is dropped if a live state event of the item was received after the states were fetched.
+
+    Returns:
+      int: the number of registered items whose state changed.
+    """
+    changed_items = 0
+    live_state_events_received = self._live_state_events_received
+    for item, raw_state in self._changed_registered_item_states():
+      changed_items += 1
+      old_raw_state = "NULL" if item._state is None else item._rest_format(item._state)
+      if isinstance(old_raw_state, bytes):
+        old_raw_state = old_raw_state.decode("utf-8")
+      payload = {"type": self._state_type_name_for(item, raw_state),
+                 "value": raw_state,
+                 "oldType": self._state_type_name_for(item, old_raw_state),
+                 "oldValue": old_raw_state}
+      topic = "{}/{}/statechanged".format(self.item_topic_prefix, item.name)
+      event_data = {"topic": topic, "type": "ItemStateChangedEvent", "payload": payload,
+                    _RESYNC_SNAPSHOT_KEY: {"item": item.name, "received": live_state_events_received}}
+      # queued without a compactable event type, so it neither absorbs nor replaces a live state event
+      self._enqueue_event(event_data, item_name=item.name, event_type=None)
+    return changed_items
+
+  def _changed_registered_item_states(self) -> typing.Iterator[typing.Tuple[openhab.items.Item, str]]:
+    """fetches the states of all items in one request and yields the registered items whose cached state differs, together with the new raw state."""
+    for item_json in self.req_get('/items?recursive=false&fields=name,state,type'):
+      item = self.registered_items.get(item_json.get("name"))
+      if item is None or "state" not in item_json:
+        continue
+      raw_state = item_json["state"]
+      if item.is_undefined(raw_state):
+        new_state = None
+      else:
+        try:
+          new_state, _ = item._parse_rest(raw_state)
+        except ValueError:
+          continue
+      if new_state != item._state:
+        yield item, raw_state
+
+  def _count_missed_state_changes(self) -> int:
+    return sum(1 for _ in self._changed_registered_item_states())
+
+  def get_event_stream_stats(self) -> typing.Dict[str, typing.Any]:
+    """returns statistics about the connection to the event stream.
+
+    Returns:
+      dict: reconnects, resyncs, the duration of the last gap in seconds and the number of items that changed during it,
+            the number of resync events dropped for a newer live state event (resync_events_superseded),
+            the number of stalls detected by the liveness watchdog, idle periods that turned out not to be stalls
+            and the seconds between the last event and the detection of the last stall.
+    """
+    return {"reconnects": self.sse_reconnects,
+            "resyncs": self.resyncs,
+            "last_resync_gap_seconds": self.last_resync_gap_seconds,
+            "last_resync_changed_items": self.last_resync_changed_items,
+            "resync_events_superseded": self.resync_events_superseded,
+            "stalls_detected": self.sse_stalls_detected,
+            "stall_false_positives": self.sse_stall_false_positives,
+            "last_stall_detection_latency": self.last_stall_detection_latency}
+
+  def _reconnect_delay(self, attempt: int) -> float:
+    """returns the seconds to wait before reconnect attempt number attempt (starting with 0): exponential backoff with jitter."""
+    capped_delay = min(self.sse_reconnect_max_delay, self.sse_reconnect_min_delay * (2 ** min(attempt, 32)))
+    return capped_delay / 2 + random.uniform(0, capped_delay / 2)
+
+  async def run_event_stream(self) -> None:
+    """receives events from openhab and hands them over to the event dispatchers until stop_receiving_events is called.
+
+    The coroutine keeps one aiohttp session for all reconnects and waits with exponential backoff between them.
+    It normally runs on the event loop of the sse_client_handler thread, but it can be run on any event loop, see start_receiving_events.
+    """
+    self._event_stream_loop = asyncio.get_event_loop()
+    self._event_stream_task = asyncio.current_task()
+    attempt = 0
+    # the stream stays open for a long time, so it must not be limited by a total timeout
+    async with ClientSession(timeout=ClientTimeout(total=None, sock_connect=self.timeout)) as session:
+      while self.__keep_event_daemon_running__:
+        connected_at = time.monotonic()
+        try:
+          if await self._run_event_connection(session):
+            # closed on purpose to subscribe to the new topics, so reconnect at once.
+            # events sent in between are missed, so the new connection resynchronises the item states like after a lost connection
+            if self._event_stream_lost_at is None:
+              self._event_stream_lost_at = time.monotonic()
+            attempt = 0
+            continue
+        except asyncio.CancelledError:
+          raise
+        except asyncio.TimeoutError:
+          self.logger.info("reconnecting after timeout")
+        except _EventStreamEndedError:
+          self.logger.info("Openhab closed the Events-Stream.")
+        except ConnectionRefusedError as e:
+          self.logger.error("Openhab refused the Events-Stream, check the credentials: '{}'".format(e))
+        except (ConnectionError, ClientConnectionError) as e:
+          self.logger.warning("could not connect to the Events-Stream: '{}'".format(e))
+        except _EventStreamStalledError as e:
+          self.logger.warning("the Events-Stream seems to be stalled ({}). reconnecting.".format(e))
+          # a stalled connection is not a server problem, so reconnect with the shortest delay
+          attempt = 0
+        except openhab.types.TypeNotImplementedError as e:
+          self.logger.warning("received unknown datatye '{}' for item '{}'".format(e.datatype, e.itemname))
+        except Exception as e:
+          self.logger.warning("problem receiving event: '{}' ".format(e))
+        if self._event_stream_lost_at is None:
+          self._event_stream_lost_at = time.monotonic()
+        if not self.__keep_event_daemon_running__:
+          break
+        if time.monotonic() - connected_at > self.sse_reconnect_max_delay:
+          # the connection was up for a while, so start over with short delays
+          attempt = 0
+        delay = self._reconnect_delay(attempt)
+        attempt += 1
+        self.sse_reconnects += 1
+        self.logger.info("reconnecting to Openhab Events-Stream in {:.1f} seconds.".format(delay))
+        await asyncio.sleep(delay)
+
+  def sse_client_handler(self):
+    """the actual handler to receive Events from openhab. It runs run_event_stream on a event loop living as long as the thread.
+            """
+    self.logger.info("about to connect to Openhab Events-Stream.")
+    ct = threading.currentThread()
+    ct.name = "sse_client_handler started at {}".format(datetime.now())
+    loop = asyncio.new_event_loop()
+    asyncio.set_event_loop(loop)
+    self._event_stream_loop = loop
+    try:
+      loop.run_until_complete(self.run_event_stream())
+    except asyncio.CancelledError:
+      pass
+    finally:
+      self._event_stream_task = None
+      self._event_stream_loop = None
+      loop.run_until_complete(loop.shutdown_asyncgens())
+      loop.close()
+      self.sseDaemon = None
+
+  @property
+  def event_loop(self) -> typing.Optional[asyncio.AbstractEventLoop]:
+    """the event loop the event stream is running on or None if no event stream is running.
+    Use asyncio.run_coroutine_threadsafe(coroutine, openhab.event_loop) to run own coroutines on it."""
+    return self._event_stream_loop
+
+  def _check_blocking_request(self, operation: str, alternative: str) -> None:
+    """raises TypeError if this client can not send blocking requests, i.e. it is a openhab.async_client.AsyncOpenHAB."""
+    if self.is_async:
+      raise TypeError("{} is not available on a AsyncOpenHAB as it sends blocking requests. {}".format(operation, alternative))
 
   def get_registered_items(self) -> weakref.WeakValueDictionary:
     """get a Dict of weak references to registered items.
@@ -308,9 +1102,13 @@ class OpenHAB:
   def register_all_items(self) -> None:
     """fetches all items from openhab and caches them in all_items.
       subsequent calls to get_item will use this cache.
+      while events are received, the cache follows items added, removed or changed in openhab.
       subsequent calls to register_all_items will rebuld the chache
     """
     self.all_items = self.fetch_all_items()
+    self._maintain_all_items = True
+    if self._subscribed_item_filter is not None:
+      self._mark_event_filter_outdated()
     for item in self.all_items.values():
       self.register_item(item)
 
@@ -324,6 +1122,8 @@ class OpenHAB:
       if item.name not in self.registered_items:
         self.logger.debug("registered item:{}".format(item.name))
         self.registered_items[item.name] = item
+        if self._subscribed_item_filter is not None and not self._subscribed_item_filter.match(item.name):
+          self._mark_event_filter_outdated()
 
   def unregister_item(self,name):
     if name in self.all_items:
@@ -333,30 +1133,42 @@ class OpenHAB:
     """stop to receive events from openhab.
         """
     self.__keep_event_daemon_running__ = False
+    task = self._event_stream_task
+    loop = self._event_stream_loop
+    if task is not None and loop is not None and not loop.is_closed():
+      loop.call_soon_threadsafe(task.cancel)
 
-  def start_receiving_events(self):
+  def start_receiving_events(self, loop: typing.Optional[asyncio.AbstractEventLoop] = None):
     """start to receive events from openhab.
-        """
-    if not self.__keep_event_daemon_running__:
-      if self.sseDaemon is not None:
-        if self.sseDaemon.is_alive():
-          # we are running already and did not stop yet.
-          # so we simply keep running
-          self.__keep_event_daemon_running__ = True
-          return
-    self.__installSSEClient__()
 
-  def __installSSEClient__(self) -> None:
+    Args:
+      loop (asyncio.AbstractEventLoop, optional): run the event stream on this (running) event loop instead of a own thread.
+        """
+    if self.__keep_event_daemon_running__ and self._event_stream_task is not None and not self._event_stream_task.done():
+      # we are running already
+      return
+    if self.sseDaemon is not None and self.sseDaemon.is_alive() and self.sseDaemon is not threading.current_thread():
+      # wait for a previous stream to finish its shutdown
+      self.sseDaemon.join(10)
+    self.__installSSEClient__(loop)
+
+  def __installSSEClient__(self, loop: typing.Optional[asyncio.AbstractEventLoop] = None) -> None:
     """ installs an event Stream to receive all Item events"""
     self.__keep_event_dispatcher_running__ = True
     self.__keep_event_daemon_running__ = True
     self.keep_running = True
-    self.sse_event_dispatcher_daemon = threading.Thread(target=self.event_dispatcher_thread, args=(), daemon=True)
-    self.sseDaemon = threading.Thread(target=self.sse_client_handler, args=(), daemon=True)
+    if self.event_dispatcher_executor is None and not any(dispatcher_daemon.is_alive() for dispatcher_daemon in self.sse_event_dispatcher_daemons):
+      self.sse_event_dispatcher_daemons = [threading.Thread(target=self.event_dispatcher_thread, args=(shard_index,), daemon=True) for shard_index in range(len(self.event_shards))]
+      self.sse_event_dispatcher_daemon = self.sse_event_dispatcher_daemons[0]
+      for dispatcher_daemon in self.sse_event_dispatcher_daemons:
+        dispatcher_daemon.start()
 
     self.logger.info("about to connect to Openhab Events-Stream.")
-    self.sse_event_dispatcher_daemon.start()
-    self.sseDaemon.start()
+    if loop is None:
+      self.sseDaemon = threading.Thread(target=self.sse_client_handler, args=(), daemon=True)
+      self.sseDaemon.start()
+    else:
+      asyncio.run_coroutine_threadsafe(self.run_event_stream(), loop)
     self.logger.info("connected to Openhab Events-Stream.")
 
   def stop_looping(self):
@@ -379,12 +1191,283 @@ class OpenHAB:
     Args:
       uri_path (str): The path to be used in the GET request.
 
+    Responses are cached in response_cache and revalidated with ETag / Last-Modified, and concurrent identical requests
+    share one request. Both keep the undecoded body, so every caller gets its own decoded data and may modify it.
+
     Returns:
       dict: Returns a dict containing the data returned by the OpenHAB REST server.
     """
-    r = self.session.get(self.base_url + uri_path, timeout=self.timeout)
+    if self._single_flight is None:
+      return json.loads(self._req_get_cached(uri_path))
+    return json.loads(self._single_flight.do(uri_path, lambda: self._req_get_cached(uri_path)))
+
+  def _req_get_cached(self, uri_path: str) -> str:
+    """returns the undecoded body of the answer to a GET request, from response_cache if possible."""
+    cache = self.response_cache
+    if cache is None:
+      r = self._send_request("GET", uri_path)
+      self._check_req_return(r)
+      return r.text
+
+    entry = cache.lookup(uri_path)
+    if entry is not None and entry.is_fresh():
+      cache.record_hit()
+      return entry.data
+    headers = None if entry is None else entry.conditional_headers()
+    r = self._send_request("GET", uri_path, headers=headers)
+    if r.status_code == 304 and entry is not None:
+      return cache.revalidated(uri_path, entry, etag=r.headers.get("ETag"), last_modified=r.headers.get("Last-Modified"))
     self._check_req_return(r)
-    return r.json()
+    body = r.text
+    cache.store(uri_path, body, etag=r.headers.get("ETag"), last_modified=r.headers.get("Last-Modified"))
+    return body
+
+  def get_response_cache_stats(self) -> typing.Dict[str, int]:
+    """returns the counters of the GET response cache.
+
+    Returns:
+      dict: size, hits, revalidations, misses and evictions. Empty if the cache is disabled.
+    """
+    if self.response_cache is None:
+      return {}
+    return self.response_cache.get_stats()
+
+  def get_slotted_sending_stats(self) -> typing.Dict[str, typing.Any]:
+    """returns the queue depth and scheduling delays of slotted sending, overall and per SendPriority, see openhab.scheduling.SlottedScheduler.get_stats.
+    With adaptive_slotted_sending "lane_spacings" holds the current spacing in milliseconds and the last echo round trip time of every lane."""
+    stats = self.slotted_scheduler.get_stats()
+    if self.adaptive_slotted_sending:
+      with self._adaptive_spacings_lock:
+        stats["lane_spacings"] = {lane: {"spacing_ms": spacing.spacing * 1000,
+                                         "last_rtt_ms": None if spacing.last_rtt is None else spacing.last_rtt * 1000,
+                                         "increases": spacing.increases,
+                                         "decreases": spacing.decreases}
+                                  for lane, spacing in self._adaptive_spacings.items()}
+    return stats
+
+  def pacing_lane_for(self, item: openhab.items.Item) -> typing.Optional[str]:
+    """returns the pacing lane of the slotted sends of item."""
+    if item.pacing_lane is not None:
+      return item.pacing_lane
+    if self.pacing_lanes == openhab.scheduling.PacingLanes.GROUP and item.groupNames:
+      return "group:{}".format(item.groupNames[0])
+    if self.pacing_lanes == openhab.scheduling.PacingLanes.TAG and item.tags:
+      return "tag:{}".format(item.tags[0])
+    return None
+
+  def _adaptive_spacing(self, lane: typing.Optional[str]) -> openhab.scheduling.AdaptiveSpacing:
+    with self._adaptive_spacings_lock:
+      spacing = self._adaptive_spacings.get(lane)
+      if spacing is None:
+        min_spacing_ms, max_spacing_ms = self.slotted_spacing_bounds_ms
+        spacing = self._adaptive_spacings[lane] = openhab.scheduling.AdaptiveSpacing(min_spacing=min_spacing_ms / 1000,
+                                                                                     max_spacing=max_spacing_ms / 1000,
+                                                                                     target_rtt=self.echo_rtt_target_ms / 1000,
+                                                                                     initial_spacing=(self.min_time_between_slotted_changes_ms or 0) / 1000)
+      return spacing
+
+  def _slotted_spacing(self, lane: typing.Optional[str]) -> float:
+    """the seconds between two slotted sends of lane."""
+    if self.adaptive_slotted_sending:
+      return self._adaptive_spacing(lane).spacing
+    return (self.min_time_between_slotted_changes_ms or 0) / 1000
+
+  def _report_echo_rtt(self, lane: typing.Optional[str], rtt: typing.Optional[float]) -> None:
+    """called by items with the round trip time in seconds from sending a slotted value to receiving its echo. None if the echo never arrived."""
+    if self.adaptive_slotted_sending:
+      spacing = self._adaptive_spacing(lane)
+      with self._adaptive_spacings_lock:
+        spacing.on_echo(rtt)
+
+  def get_request_coalescing_stats(self) -> typing.Dict[str, int]:
+    """returns how many GET requests were executed and how many calls shared the result of another one.
+
+    Returns:
+      dict: executed, shared and in_flight. Empty if coalescing is disabled.
+    """
+    if self._single_flight is None:
+      return {}
+    return self._single_flight.get_stats()
+
+  def _invalidate_cached_responses(self, uri_path: str) -> None:
+    if self.response_cache is not None:
+      self.response_cache.invalidate(uri_path)
+    if self._single_flight is not None:
+      # a read after a write must not get a result fetched before it
+      self._single_flight.forget()
+
+  def _send_request(self, method: str, uri_path: str, **kwargs) -> requests.Response:
+    """sends a request through the circuit breaker. Idempotent requests failing with a connection error, a timeout or a HTTP 502/503/504
+    are retried with jittered exponential backoff, see max_retries.
+
+    Returns:
+      requests.Response: the response of the last attempt. The status code is not checked apart from the retryable ones.
+
+    Raises:
+      openhab.resilience.CircuitOpenError: openHAB is considered down, the request was not sent.
+      requests.exceptions.RequestException: the last attempt failed.
+    """
+    max_retries = self.retry_policy.max_retries if method in openhab.resilience.IDEMPOTENT_METHODS else 0
+    retry = 0
+    while True:
+      self.circuit_breaker.before_call()
+      retry_after = None
+      try:
+        r = self.session.request(method, self.base_url + uri_path, timeout=self.timeout_for(method), **kwargs)
+      except (requests.exceptions.ConnectionError, requests.exceptions.Timeout) as e:
+        self.circuit_breaker.record_failure()
+        if retry >= max_retries:
+          if max_retries:
+            self.requests_failed_after_retries += 1
+          raise
+        self.logger.debug("{} {} failed: '{}'. retrying.".format(method, uri_path, e))
+      else:
+        if r.status_code not in openhab.resilience.RETRYABLE_STATUS_CODES:
+          self.circuit_breaker.record_success()
+          return r
+        self.circuit_breaker.record_failure()
+        if retry >= max_retries:
+          if max_retries:
+            self.requests_failed_after_retries += 1
+          return r
+        retry_after = r.headers.get("Retry-After")
+        self.logger.debug("{} {} answered HTTP {}. retrying.".format(method, uri_path, r.status_code))
+      time.sleep(self.retry_policy.delay(retry, retry_after))
+      retry += 1
+      self.request_retries += 1
+
+  def timeout_for(self, method: str) -> typing.Union[None, float, typing.Tuple[float, float]]:
+    """returns the timeout for requests with the HTTP method method: its entry in method_timeouts or timeout."""
+    return self.method_timeouts.get(method, self.timeout)
+
+  def warm_up_connection_pool(self, connections: int) -> int:
+    """opens up to connections connections to openHAB by sending that many requests for the REST root at the same time.
+    They stay in the connection pool (up to pool_maxsize) for the following requests.
+
+    Returns:
+      int: the number of successful requests.
+    """
+    def warm_up(_) -> bool:
+      try:
+        self.session.get(self.base_url + "/", timeout=self.timeout_for("GET")).close()
+        return True
+      except requests.exceptions.RequestException as e:
+        self.logger.debug("could not open a connection to openHAB: '{}' ".format(e))
+        return False
+
+    connections = min(connections, self.pool_maxsize)
+    with concurrent.futures.ThreadPoolExecutor(max_workers=connections, thread_name_prefix="openhab-warm-up") as executor:
+      opened = sum(executor.map(warm_up, range(connections)))
+    self.logger.debug("warmed up {} connections to openHAB".format(opened))
+    return opened
+
+  def get_connection_pool_stats(self) -> typing.Dict[str, typing.Any]:
+    """returns live counts of the connections to openHAB, see openhab.connection_pool.PooledHTTPAdapter.get_stats.
+
+    Returns:
+      dict: pools, active and idle connections, requests, connections_opened, reuse_ratio and pool_maxsize.
+    """
+    return self.connection_pool.get_stats()
+
+  def get_resilience_stats(self) -> typing.Dict[str, typing.Any]:
+    """returns the state of the circuit breaker and the retry counters.
+
+    Returns:
+      dict: "circuit_breaker" (see openhab.resilience.CircuitBreaker.get_stats), "retries" (requests sent again)
+            and "failed_after_retries" (idempotent requests which failed although they were retried).
+    """
+    return {"circuit_breaker": self.circuit_breaker.get_stats(),
+            "retries": self.request_retries,
+            "failed_after_retries": self.requests_failed_after_retries}
+
+  def _send_or_queue(self, method: str, uri_path: str, data: typing.Any, headers: typing.Dict[str, str]) -> typing.Optional[requests.Response]:
+    """sends a POST or PUT request. With the offline queue, commands and updates of items are queued instead while openHAB can not be reached.
+
+    Returns:
+      requests.Response: the response, or None if the request was queued.
+    """
+    queueable = self.offline_queue is not None and _OFFLINE_QUEUEABLE_PATH_REGEX.match(uri_path) is not None
+    if queueable and len(self.offline_queue) > 0:
+      # nothing may overtake the commands queued before
+      self._queue_offline(method, uri_path, data, headers, "earlier commands are still queued")
+      return None
+    try:
+      r = self._send_request(method, uri_path, data=data, headers=headers)
+    except requests.exceptions.ConnectionError as e:
+      if not queueable:
+        raise
+      self._queue_offline(method, uri_path, data, headers, e)
+      return None
+    if queueable and r.status_code == 503:
+      # openHAB is starting up
+      self._queue_offline(method, uri_path, data, headers, "HTTP 503")
+      return None
+    return r
+
+  def _queue_offline(self, method: str, uri_path: str, data: typing.Any, headers: typing.Dict[str, str], reason: typing.Any) -> None:
+    self.logger.info("queueing {} {} until openHAB is reachable: '{}' ".format(method, uri_path, reason))
+    self.offline_queue.put(method, uri_path, data, headers)
+    self._start_offline_replay()
+
+  def _start_offline_replay(self) -> None:
+    with self._offline_replay_lock:
+      if self._offline_replay_daemon is None:
+        self._offline_replay_daemon = threading.Thread(target=self._offline_replay_thread, name="openhab-offline-replay", daemon=True)
+        self._offline_replay_daemon.start()
+
+  def _offline_replay_thread(self) -> None:
+    """replays the offline queue every offline_queue_retry_interval seconds (or when woken up) until it is empty."""
+    while True:
+      self._offline_replay_wakeup.wait(self.offline_queue_retry_interval)
+      self._offline_replay_wakeup.clear()
+      try:
+        self.replay_offline_queue()
+      except Exception as e:
+        self.logger.debug("openHAB is still not reachable: '{}' ".format(e))
+      with self._offline_replay_lock:
+        if len(self.offline_queue) == 0:
+          self._offline_replay_daemon = None
+          return
+
+  def replay_offline_queue(self) -> int:
+    """sends the commands and updates queued while openHAB was not reachable, in the order they were issued.
+    This happens automatically in the background, use it to replay right away.
+    Commands rejected by openHAB (e.g. for a item which does not exist any more) are logged and dropped.
+
+    Returns:
+      int: the number of delivered commands and updates.
+
+    Raises:
+      requests.exceptions.RequestException: openHAB is still not reachable. The remaining commands stay queued.
+    """
+    if self.offline_queue is None:
+      return 0
+
+    def send(request: openhab.offline_queue.QueuedRequest) -> bool:
+      r = self._send_request(request.method, request.uri_path, data=request.data, headers=request.headers)
+      self._invalidate_cached_responses(request.uri_path)
+      if r.status_code >= 500:
+        # openHAB is not ready yet, stop the replay and retry later
+        r.raise_for_status()
+      if not 200 <= r.status_code < 300:
+        self.logger.warning("openHAB rejected queued {} {} with HTTP {}. dropping it.".format(request.method, request.uri_path, r.status_code))
+        return False
+      return True
+
+    delivered = self.offline_queue.replay(send)
+    if delivered:
+      self.logger.info("replayed {} commands queued while openHAB was offline".format(delivered))
+    return delivered
+
+  def get_offline_queue_stats(self) -> typing.Dict[str, int]:
+    """returns the depth and counters of the offline queue, see openhab.offline_queue.OfflineCommandQueue.get_stats.
+
+    Returns:
+      dict: the counters. Empty if the offline queue is disabled.
+    """
+    if self.offline_queue is None:
+      return {}
+    return self.offline_queue.get_stats()
 
   def req_post(self, uri_path: str, data: typing.Optional[dict] = None, headers: typing.Optional[dict]=None) -> None:
     """Helper method for initiating a HTTP POST request.
@@ -401,7 +1484,10 @@ class OpenHAB:
     """
     if headers is None:
       headers = {'Content-Type': 'text/plain'}
-    r = self.session.post(self.base_url + uri_path, data=data, headers=headers, timeout=self.timeout)
+    r = self._send_or_queue("POST", uri_path, data, headers)
+    if r is None:
+      return
+    self._invalidate_cached_responses(uri_path)
     self._check_req_return(r)
 
   def req_json_put(self, uri_path: str, json_data: str = None, headers: typing.Optional[dict]=None) -> None:
@@ -420,7 +1506,8 @@ class OpenHAB:
         """
     if headers is None:
       headers = {'Content-Type': 'application/json', "Accept": "application/json"}
-    r = self.session.put(self.base_url + uri_path, data=json_data, headers=headers, timeout=self.timeout)
+    r = self._send_request("PUT", uri_path, data=json_data, headers=headers)
+    self._invalidate_cached_responses(uri_path)
     self._check_req_return(r)
 
   def req_del(self,  uri_path: str, headers: typing.Optional[dict]=None) -> None:
@@ -438,7 +1525,8 @@ class OpenHAB:
         """
     if headers is None:
       headers = {"Accept": "application/json"}
-    r = self.session.delete(self.base_url + uri_path, headers=headers)
+    r = self._send_request("DELETE", uri_path, headers=headers)
+    self._invalidate_cached_responses(uri_path)
     self._check_req_return(r)
 
   def req_put(self, uri_path: str, data: typing.Optional[dict] = None, headers: typing.Optional[dict]=None) -> None:
@@ -456,7 +1544,10 @@ class OpenHAB:
     """
     if headers is None:
       headers = {'Content-Type': 'text/plain'}
-    r = self.session.put(self.base_url + uri_path, data=data, headers=headers, timeout=self.timeout)
+    r = self._send_or_queue("PUT", uri_path, data, headers)
+    if r is None:
+      return
+    self._invalidate_cached_responses(uri_path)
     self._check_req_return(r)
 
   # fetch all items
@@ -501,6 +1592,164 @@ class OpenHAB:
     return item
 
 
+  def get_items(self, names: typing.Iterable[str], force_request_to_openhab: typing.Optional[bool] = False, auto_update: typing.Optional[bool] = True, maxEchoToOpenhabMS=None, use_slotted_sending: bool = False) -> typing.Dict[str, openhab.items.Item]:
+    """Returns many items at once. See get_item for the arguments.
+
+    Items cached in all_items are taken from there. If at least bulk_fetch_threshold items are missing, they are
+    selected from one request for all items, otherwise they are fetched with up to max_concurrent_requests parallel requests.
+
+    Args:
+      names: the names of the items to fetch from openHAB.
+
+    Returns:
+      dict: item names as key and item class instances as value. Items unknown to openHAB are missing.
+    """
+    names = list(dict.fromkeys(names))
+    items = {}  # type: typing.Dict[str, openhab.items.Item]
+    missing_names = []
+    for name in names:
+      if name in self.all_items and not force_request_to_openhab:
+        items[name] = self.all_items[name]
+      else:
+        missing_names.append(name)
+
+    if len(missing_names) >= self.bulk_fetch_threshold:
+      fetched_items = self._fetch_items_in_bulk(missing_names)
+    else:
+      fetched_items = self._fetch_items_concurrently(missing_names)
+    if self._maintain_all_items:
+      self.all_items.update(fetched_items)
+    items.update(fetched_items)
+
+    for item in items.values():
+      item.autoUpdate = auto_update
+      if maxEchoToOpenhabMS is not None:
+        item.maxEchoToOpenhabMS = maxEchoToOpenhabMS
+      item.use_slotted_sending = use_slotted_sending
+    return {name: items[name] for name in names if name in items}
+
+  def _item_from_json(self, json_data: dict) -> openhab.items.Item:
+    """like json_to_item, but refreshes and returns the registered instance of the item if it has the same type."""
+    item = self.registered_items.get(json_data['name'])
+    is_group = json_data['type'] == 'Group'
+    if item is not None and item.group == is_group and item.type_ == (json_data.get('groupType') if is_group else json_data['type']):
+      item.init_from_json(json_data)
+      return item
+    return self.json_to_item(json_data)
+
+  def _fetch_items_in_bulk(self, names: typing.List[str]) -> typing.Dict[str, openhab.items.Item]:
+    items_json = self.req_get('/items?recursive=false')
+    wanted_names = set(names)
+    items = {item_json['name']: self._item_from_json(item_json) for item_json in items_json if item_json['name'] in wanted_names}
+
+    # the listing does not contain members, so collect them from the group names of all items
+    groups = {name: item for name, item in items.items() if item.group}
+    if groups:
+      for item_json in items_json:
+        member_of = [groups[group_name] for group_name in item_json.get('groupNames', ()) if group_name in groups]
+        if not member_of:
+          continue
+        member = items.get(item_json['name'])
+        if member is None:
+          member = self._item_from_json(item_json)
+        for group in member_of:
+          group.members[member.name] = member
+    return items
+
+  def _fetch_items_concurrently(self, names: typing.List[str]) -> typing.Dict[str, openhab.items.Item]:
+    items_json = self._fetch_items_json_concurrently(names)
+    # items are instantiated here, so they get registered by this thread in a defined order
+    return {item_json['name']: self._item_from_json(item_json) for item_json in items_json if item_json is not None}
+
+  def _fetch_items_json_concurrently(self, names: typing.List[str]) -> typing.List[typing.Optional[dict]]:
+    """fetches the JSON of the items with up to max_concurrent_requests parallel requests, None for items unknown to openHAB."""
+    def fetch(name: str) -> typing.Optional[dict]:
+      try:
+        return self.get_item_raw(name)
+      except requests.exceptions.HTTPError as e:
+        if e.response is not None and e.response.status_code == 404:
+          return None
+        raise
+
+    if len(names) <= 1:
+      items_json = [fetch(name) for name in names]
+    else:
+      with concurrent.futures.ThreadPoolExecutor(max_workers=min(len(names), self.max_concurrent_requests), thread_name_prefix="openhab-get-items") as executor:
+        items_json = list(executor.map(fetch, names))
+    return items_json
+
+  def send_many(self, values: typing.Dict[str, typing.Any], command: bool = True) -> typing.Dict[str, typing.Optional[Exception]]:
+    """sends values to many items in parallel, using up to max_concurrent_requests requests at a time.
+    Items with use_slotted_sending still wait for their sending slot.
+
+    Args:
+      values (dict): item names as key and the value to send as value.
+      command (bool): True: send the values as commands. False: send them as state updates.
+
+    Returns:
+      dict: item names as key and None if the value was sent or the exception raised while sending it.
+    """
+    results = {}  # type: typing.Dict[str, typing.Optional[Exception]]
+    items = {name: self.registered_items.get(name) for name in values}
+    missing_names = [name for name, item in items.items() if item is None]
+    if missing_names:
+      items.update(self.get_items(missing_names))
+    sends = []
+    for name, value in values.items():
+      item = items.get(name)
+      if item is None:
+        results[name] = KeyError("item '{}' does not exist".format(name))
+      else:
+        sends.append((item, value))
+    results.update(self._send_to_items(sends, command))
+    return results
+
+  def _send_to_items(self, sends: typing.List[typing.Tuple[openhab.items.Item, typing.Any]], command: bool) -> typing.Dict[str, typing.Optional[Exception]]:
+    def send(item: openhab.items.Item, value: typing.Any) -> typing.Optional[Exception]:
+      try:
+        if command:
+          scheduled_send = item.command(value)
+        else:
+          scheduled_send = item.update(value)
+        if scheduled_send is not None:
+          # slotted sends are only queued, so wait for their outcome
+          scheduled_send.result()
+      except Exception as e:
+        self.logger.warning("sending '{}' to item '{}' failed: '{}'".format(value, item.name, e))
+        return e
+      return None
+
+    if len(sends) <= 1:
+      return {item.name: send(item, value) for item, value in sends}
+    with concurrent.futures.ThreadPoolExecutor(max_workers=min(len(sends), self.max_concurrent_requests), thread_name_prefix="openhab-send-many") as executor:
+      futures = {item.name: executor.submit(send, item, value) for item, value in sends}
+    return {name: future.result() for name, future in futures.items()}
+
+  def refresh_items(self, items: typing.Iterable[openhab.items.Item]) -> None:
+    """fetches the current definition and state of many items at once, including the members of groups.
+
+    Like get_items, bulk_fetch_threshold or more items are refreshed from one request for all items,
+    fewer items are fetched with up to max_concurrent_requests parallel requests.
+
+    Args:
+      items: the items to refresh.
+    """
+    items = list(items)
+    if not items:
+      return
+    if len(items) < self.bulk_fetch_threshold:
+      # the answer for a single group contains its members
+      for item, item_json in zip(items, self._fetch_items_json_concurrently([item.name for item in items])):
+        if item_json is not None:
+          item.init_from_json(item_json)
+      return
+    items_json = {item_json["name"]: item_json for item_json in self.req_get('/items?recursive=false')}
+    for item in items:
+      for target in [item] + list(item.members.values()):
+        item_json = items_json.get(target.name)
+        if item_json is not None:
+          target.init_from_json(item_json)
+
   def json_to_item(self, json_data: dict) -> openhab.items.Item:
     """This method takes as argument the RAW (JSON decoded) response for an openHAB item.
 
@@ -530,11 +1779,12 @@ class OpenHAB:
       return openhab.items.ContactItem(self, json_data)
 
     if _type.startswith('Number'):
-      if _type.startswith('Number:'):
+      if _type.startswith('Number:') and 'state' in json_data:
         m = re.match(r'''^([^\s]+)''', json_data['state'])
 
         if m:
-          json_data['state'] = m.group(1)
+          # json_data may be shared through the response cache, so do not modify it
+          json_data = dict(json_data, state=m.group(1))
 
       return openhab.items.NumberItem(self, json_data)
 
@@ -654,13 +1904,13 @@ class OpenHAB:
 
   def say(self, text: str, audiosinkid: str, voiceid: str):
     self.logger.info("sending say command to OH for voiceid:'{}', audiosinkid:'{}'".format(voiceid,audiosinkid))
-    url=self.base_url + "/voice/say/?voiceid={voiceid}&sinkid={sinkid}".format(voiceid=requests.utils.quote(voiceid), sinkid=requests.utils.quote(audiosinkid))
-    r = self.session.post(url, data=text, headers={'Accept': 'application/json'}, timeout=self.timeout)
+    uri_path = "/voice/say/?voiceid={voiceid}&sinkid={sinkid}".format(voiceid=requests.utils.quote(voiceid), sinkid=requests.utils.quote(audiosinkid))
+    r = self._send_request("POST", uri_path, data=text, headers={'Accept': 'application/json'})
     self._check_req_return(r)
 
   def interpret(self, text: str, voiceinterpreterid: str):
-    url=self.base_url + "/voice/interpreters/{interpreterid}".format(interpreterid=requests.utils.quote(voiceinterpreterid))
-    r = self.session.post(url, data=text, headers={'Accept': 'application/json'}, timeout=self.timeout)
+    uri_path = "/voice/interpreters/{interpreterid}".format(interpreterid=requests.utils.quote(voiceinterpreterid))
+    r = self._send_request("POST", uri_path, data=text, headers={'Accept': 'application/json'})
     self._check_req_return(r)
 
 # UI
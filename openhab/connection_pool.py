@@ -0,0 +1,114 @@
+# -*- coding: utf-8 -*-
+"""HTTP adapter for the requests session of the client, with a sized connection pool, TCP keep-alive and pool statistics."""
+
+#
+# Alexey Grubauer (c) 2021 <alexey@ingenious-minds.at>
+#
+# python-openhab is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# python-openhab is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with python-openhab.  If not, see <http://www.gnu.org/licenses/>.
+#
+
+# pylint: disable=bad-indentation
+from __future__ import annotations
+import socket
+import threading
+import typing
+
+import requests.adapters
+from urllib3.connection import HTTPConnection
+
+
+def keep_alive_socket_options(idle_seconds: int = 60, interval_seconds: int = 10, probes: int = 3) -> typing.List[typing.Tuple[int, int, int]]:
+  """returns the default socket options of urllib3 plus TCP keep-alive, so idle pooled connections to a vanished openHAB are detected by the OS.
+  The timing options are only added on platforms supporting them."""
+  options = list(HTTPConnection.default_socket_options) + [(socket.SOL_SOCKET, socket.SO_KEEPALIVE, 1)]
+  for name, value in (("TCP_KEEPIDLE", idle_seconds), ("TCP_KEEPINTVL", interval_seconds), ("TCP_KEEPCNT", probes)):
+    if hasattr(socket, name):
+      options.append((socket.IPPROTO_TCP, getattr(socket, name), value))
+  return options
+
+
+class PooledHTTPAdapter(requests.adapters.HTTPAdapter):
+  """A HTTPAdapter keeping up to pool_maxsize connections per host open, optionally with TCP keep-alive, which counts its requests in flight.
+
+  With pool_block=False more concurrent requests than pool_maxsize still work, but their connections are closed afterwards instead of being reused.
+  Size the pool to the number of threads sending requests at the same time.
+  """
+
+  __attrs__ = requests.adapters.HTTPAdapter.__attrs__ + ["tcp_keep_alive"]
+
+  def __init__(self, pool_connections: int = 10, pool_maxsize: int = 10, pool_block: bool = False, tcp_keep_alive: bool = True, **kwargs) -> None:
+    """Constructor.
+
+    Args:
+      pool_connections (int): the number of hosts a pool is kept for.
+      pool_maxsize (int): the maximum number of connections kept open per host.
+      pool_block (bool): True: requests wait for a free connection instead of opening a additional one.
+      tcp_keep_alive (bool): True: enable TCP keep-alive on the connections.
+    """
+    self.tcp_keep_alive = tcp_keep_alive
+    self._active = 0
+    self._active_lock = threading.Lock()
+    super().__init__(pool_connections=pool_connections, pool_maxsize=pool_maxsize, pool_block=pool_block, **kwargs)
+
+  def init_poolmanager(self, connections, maxsize, block=False, **pool_kwargs):
+    if self.tcp_keep_alive:
+      pool_kwargs.setdefault("socket_options", keep_alive_socket_options())
+    super().init_poolmanager(connections, maxsize, block=block, **pool_kwargs)
+
+  def __setstate__(self, state):
+    # the counters are not pickled
+    self._active = 0
+    self._active_lock = threading.Lock()
+    super().__setstate__(state)
+
+  def send(self, request, **kwargs):
+    with self._active_lock:
+      self._active += 1
+    try:
+      return super().send(request, **kwargs)
+    finally:
+      with self._active_lock:
+        self._active -= 1
+
+  def get_stats(self) -> typing.Dict[str, typing.Any]:
+    """returns live counts of the connection pools of this adapter.
+
+    Returns:
+      dict: pools (hosts), active (requests in flight), idle (open connections waiting in the pools), requests sent,
+            connections opened and reuse_ratio, the share of requests which were sent over an already open connection (None before the first request).
+    """
+    pools = self.poolmanager.pools
+    idle = 0
+    requests_sent = 0
+    connections_opened = 0
+    pool_count = 0
+    for key in list(pools.keys()):
+      pool = pools.get(key)
+      if pool is None:
+        continue
+      pool_count += 1
+      requests_sent += pool.num_requests
+      connections_opened += pool.num_connections
+      if pool.pool is not None:
+        # unused slots of the pool hold None
+        idle += sum(1 for connection in list(pool.pool.queue) if connection is not None)
+    with self._active_lock:
+      active = self._active
+    return {"pools": pool_count,
+            "active": active,
+            "idle": idle,
+            "requests": requests_sent,
+            "connections_opened": connections_opened,
+            "reuse_ratio": max(0.0, 1 - connections_opened / requests_sent) if requests_sent else None,
+            "pool_maxsize": self._pool_maxsize}
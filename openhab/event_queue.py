@@ -0,0 +1,210 @@
+# -*- coding: utf-8 -*-
+"""bounded queue handing over events from the openHAB event stream to the event dispatcher."""
+
+#
+# Alexey Grubauer (c) 2021 <alexey@ingenious-minds.at>
+#
+# python-openhab is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# python-openhab is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with python-openhab.  If not, see <http://www.gnu.org/licenses/>.
+#
+
+# pylint: disable=bad-indentation
+from __future__ import annotations
+import collections
+import threading
+import typing
+from enum import Enum
+
+
+class OverflowPolicy(Enum):
+  """what an EventQueue does when a new event arrives while it is full."""
+  BLOCK = "block"  # the reader waits until the dispatcher made room. This pushes back to openHAB through TCP.
+  DROP_OLDEST = "drop_oldest"  # the oldest queued event is discarded.
+  COMPACT = "compact"  # the new event replaces a queued state event of the same item. If there is none, the oldest event is discarded.
+
+
+COMPACTABLE_EVENT_TYPES = frozenset(["ItemStateEvent", "ItemStateChangedEvent"])
+
+
+class _QueueEntry(object):
+  __slots__ = ("item_name", "event_type", "data")
+
+  def __init__(self, item_name: typing.Optional[str], event_type: typing.Optional[str], data: typing.Any):
+    self.item_name = item_name
+    self.event_type = event_type
+    self.data = data
+
+
+class EventQueue(object):
+  """A bounded FIFO with O(1) put and get.
+
+  Besides the plain event data every entry knows the item name and event type it belongs to. This allows to
+  replace queued state events of an item by newer ones without changing the order of events of that item:
+  only the latest state event of an item which has no command queued after it can be replaced.
+  """
+
+  def __init__(self, capacity: int = 10000, overflow_policy: OverflowPolicy = OverflowPolicy.BLOCK,
+               compact_state_events: bool = False,
+               merge_compacted: typing.Optional[typing.Callable[[typing.Any, typing.Any], typing.Any]] = None) -> None:
+    """Constructor.
+
+    Args:
+      capacity (int): the maximum number of queued events.
+      overflow_policy (OverflowPolicy): what to do with new events while the queue is full.
+      compact_state_events (bool): always replace queued state events of an item by newer ones of the same type, not only on overflow.
+                                   A backlog then holds at most one state event per item and type between two commands of that item.
+      merge_compacted (Callable, optional): called with the data of the queued and the newer event when compacting. Returns the data to keep.
+                                            By default the newer data replaces the queued one.
+    """
+    if capacity < 1:
+      raise ValueError("capacity must be at least 1")
+    self.capacity = capacity
+    self.overflow_policy = overflow_policy
+    self.compact_state_events = compact_state_events
+    self.merge_compacted = merge_compacted
+    self._entries: typing.Deque[_QueueEntry] = collections.deque()
+    self._compactable: typing.Dict[typing.Tuple[str, str], _QueueEntry] = {}
+    self._lock = threading.Lock()
+    self._not_empty = threading.Condition(self._lock)
+    self._not_full = threading.Condition(self._lock)
+    self.high_water_mark = 0
+    self.dropped = 0
+    self.compacted = 0
+    self.received = 0
+
+  def __len__(self) -> int:
+    return len(self._entries)
+
+  @property
+  def depth(self) -> int:
+    """the number of currently queued events."""
+    return len(self._entries)
+
+  def _forget(self, entry: _QueueEntry) -> None:
+    key = (entry.item_name, entry.event_type)
+    if self._compactable.get(key) is entry:
+      del self._compactable[key]
+
+  def _compact(self, entry: _QueueEntry) -> bool:
+    """replaces the data of a queued state event of the same item and type. Returns True on success."""
+    queued = self._compactable.get((entry.item_name, entry.event_type))
+    if queued is None:
+      return False
+    if self.merge_compacted is None:
+      queued.data = entry.data
+    else:
+      queued.data = self.merge_compacted(queued.data, entry.data)
+    self.compacted += 1
+    return True
+
+  def _append(self, entry: _QueueEntry) -> None:
+    self._entries.append(entry)
+    if entry.item_name is not None:
+      if entry.event_type in COMPACTABLE_EVENT_TYPES:
+        self._compactable[(entry.item_name, entry.event_type)] = entry
+      else:
+        # nothing queued before a command may be replaced by a state event arriving after it.
+        for event_type in COMPACTABLE_EVENT_TYPES:
+          self._compactable.pop((entry.item_name, event_type), None)
+    if len(self._entries) > self.high_water_mark:
+      self.high_water_mark = len(self._entries)
+    self._not_empty.notify()
+
+  def _drop_oldest(self) -> None:
+    self._forget(self._entries.popleft())
+    self.dropped += 1
+
+  def put(self, data: typing.Any, item_name: typing.Optional[str] = None, event_type: typing.Optional[str] = None, timeout: typing.Optional[float] = None) -> bool:
+    """adds an event to the queue.
+
+    Args:
+      data: the event data.
+      item_name (str, optional): the name of the item the event belongs to.
+      event_type (str, optional): the openHAB event type, e.g. ItemStateEvent.
+      timeout (float, optional): only for OverflowPolicy.BLOCK: the maximum number of seconds to wait for room. None waits forever.
+
+    Returns:
+      bool: False if the event was discarded.
+    """
+    return self._put(_QueueEntry(item_name, event_type, data), True, timeout)
+
+  def put_nowait(self, data: typing.Any, item_name: typing.Optional[str] = None, event_type: typing.Optional[str] = None) -> bool:
+    """adds an event to the queue like put, but never waits for room.
+
+    Returns:
+      bool: False if the queue is full with OverflowPolicy.BLOCK. The event was neither queued nor counted, put it again with put.
+    """
+    return self._put(_QueueEntry(item_name, event_type, data), False, None)
+
+  def _put(self, entry: _QueueEntry, wait: bool, timeout: typing.Optional[float]) -> bool:
+    with self._lock:
+      if not wait and self.overflow_policy == OverflowPolicy.BLOCK and len(self._entries) >= self.capacity and \
+          not (self.compact_state_events and (entry.item_name, entry.event_type) in self._compactable):
+        return False
+      self.received += 1
+      if self.compact_state_events and entry.event_type in COMPACTABLE_EVENT_TYPES and self._compact(entry):
+        return True
+      if len(self._entries) >= self.capacity:
+        if self.overflow_policy == OverflowPolicy.BLOCK:
+          if not self._not_full.wait_for(lambda: len(self._entries) < self.capacity, timeout):
+            self.dropped += 1
+            return False
+        elif self.overflow_policy == OverflowPolicy.COMPACT and entry.event_type in COMPACTABLE_EVENT_TYPES and self._compact(entry):
+          return True
+        else:
+          self._drop_oldest()
+      self._append(entry)
+      return True
+
+  def get_entry(self, timeout: typing.Optional[float] = None) -> typing.Optional[_QueueEntry]:
+    """removes and returns the oldest queued entry.
+
+    Args:
+      timeout (float, optional): the maximum number of seconds to wait for an event. None waits forever.
+
+    Returns:
+      the entry or None if the queue stayed empty.
+    """
+    with self._lock:
+      if not self._not_empty.wait_for(lambda: len(self._entries) > 0, timeout):
+        return None
+      entry = self._entries.popleft()
+      self._forget(entry)
+      self._not_full.notify()
+      return entry
+
+  def get(self, timeout: typing.Optional[float] = None) -> typing.Any:
+    """removes and returns the data of the oldest queued event or None if the queue stayed empty for timeout seconds."""
+    entry = self.get_entry(timeout)
+    if entry is None:
+      return None
+    return entry.data
+
+  def clear(self) -> None:
+    with self._lock:
+      self._entries.clear()
+      self._compactable.clear()
+      self._not_full.notify_all()
+
+  def get_stats(self) -> typing.Dict[str, int]:
+    """returns the counters of this queue.
+
+    Returns:
+      dict: depth, high_water_mark, received, dropped and compacted events.
+    """
+    with self._lock:
+      return {"depth": len(self._entries),
+              "high_water_mark": self.high_water_mark,
+              "received": self.received,
+              "dropped": self.dropped,
+              "compacted": self.compacted}
@@ -7,74 +7,114 @@
 
 # pylint: disable=bad-indentation
 from __future__ import annotations
-from typing import TYPE_CHECKING, List, Set, Dict, Tuple, Union, Any, Optional, NewType, Callable, Generic, TypeVar
+from typing import TYPE_CHECKING, List, Set, Dict, Tuple, Union, Any, Optional, NewType, Callable, Generic, TypeVar, Deque, Hashable
 from datetime import datetime, timedelta
+import collections
+import time
 
 
 T = TypeVar("T")
 
 
+class _HistoryEntry(object):
+    __slots__ = ("stamp", "when", "item", "alive")
+
+    def __init__(self, stamp: float, when: datetime, item: Any):
+        self.stamp = stamp  # time.monotonic() based, used for expiry
+        self.when = when  # wall clock time as handed out by get()
+        self.item = item
+        self.alive = True
+
+
 class History(Generic[T]):
+    """a time ordered buffer of recently seen values.
+
+    Entries are kept in a deque in the order they were added and an index maps every value to its live entries.
+    add, expiry, contains and remove(item) are therefore amortized O(1). Expiry uses time.monotonic(), so
+    changes of the wall clock do not keep entries alive or drop them early.
+    """
     def __init__(self, seconds_of_history: float) -> None:
-        self.entries: List[Tuple[datetime, T]] = []
+        self.entries: Deque[_HistoryEntry] = collections.deque()
+        self._index: Dict[Hashable, Deque[_HistoryEntry]] = {}
         self.history_lenght = timedelta(seconds=seconds_of_history)
+        self._seconds_of_history = seconds_of_history
+
+    @staticmethod
+    def _key(item: Any) -> Hashable:
+        try:
+            hash(item)
+            return item
+        except TypeError:
+            # unhashable values like lists are indexed by their representation
+            return ("__unhashable__", repr(item))
 
     def add(self, item: T, when: datetime = None) -> None:
+        now = time.monotonic()
         if when is None:
             when = datetime.now()
-        self.__clean_history__()
-        self.entries.append((when, item))
-
-    def __clean_history__(self) -> None:
-        now = datetime.now()
-        valid_until = now - self.history_lenght
-        remove_from_idx = 0
-
-        for entry in self.entries:
-           if entry[0] < valid_until:
-               remove_from_idx += 1
-           else:
-               break
-
-        self.entries = self.entries[remove_from_idx:]
+            stamp = now
+        else:
+            stamp = now - (datetime.now() - when).total_seconds()
+        self.__clean_history__(now)
+        entry = _HistoryEntry(stamp, when, item)
+        self.entries.append(entry)
+        self._index.setdefault(self._key(item), collections.deque()).append(entry)
+
+    def __clean_history__(self, now: Optional[float] = None) -> None:
+        if now is None:
+            now = time.monotonic()
+        valid_until = now - self._seconds_of_history
+        entries = self.entries
+        while entries and entries[0].stamp < valid_until:
+            entry = entries.popleft()
+            if entry.alive:
+                self.__unindex__(entry)
+
+    def __unindex__(self, entry: _HistoryEntry) -> None:
+        key = self._key(entry.item)
+        indexed = self._index.get(key)
+        if indexed is None:
+            return
+        if indexed[0] is entry:
+            indexed.popleft()
+        else:
+            indexed.remove(entry)
+        if not indexed:
+            del self._index[key]
 
     def __contains__(self, item: T) -> bool:
-      time,entry = self.get(item)
-      if time is None:
-        return False
-      else:
-        return True
+      self.__clean_history__()
+      return self._key(item) in self._index
 
+    def __len__(self) -> int:
+      self.__clean_history__()
+      return sum(len(indexed) for indexed in self._index.values())
 
     def clear(self):
         self.entries.clear()
+        self._index.clear()
 
     def get(self, item:T) -> (datetime,T):
       self.__clean_history__()
-      for entry in reversed(self.entries):
-        if entry[1] == item:
-          return entry
+      indexed = self._index.get(self._key(item))
+      if indexed:
+        entry = indexed[-1]
+        return entry.when, entry.item
       return None,None
 
-
-
     def get_entries(self) -> List[T]:
       self.__clean_history__()
-      return [entry[1] for entry in self.entries]
+      return [entry.item for entry in self.entries if entry.alive]
 
     def remove(self, item: T = None, when: datetime = None) -> None:
       if item is None and when is None:
           return
-      to_remove = []
-      for entry in self.entries:
-          if when is not None:
-              if entry[0] == when:
-                  to_remove.append(entry)
-          if item is not None:
-              if entry[1] == item:
-                  to_remove.append(entry)
-      for to_remove_entry in to_remove:
-          try:
-              self.entries.remove(to_remove_entry)
-          except:
-              pass
+      if item is not None:
+          for entry in self._index.pop(self._key(item), ()):
+              entry.alive = False
+      if when is not None:
+          # removing by time is rare, so a scan is acceptable here
+          for entry in self.entries:
+              if entry.alive and entry.when == when:
+                  entry.alive = False
+                  self.__unindex__(entry)
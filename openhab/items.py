@@ -26,12 +26,16 @@ import inspect
 import re
 import typing
 import json
+import collections
+import concurrent.futures
+import threading
 import time
 import dateutil.parser
 
 import openhab.types
 import openhab.events
 import openhab.history
+import openhab.scheduling
 from datetime import datetime, timedelta
 
 __author__ = 'Georges Toth <georges@trypill.org>'
@@ -69,7 +73,7 @@ class ItemFactory:
     if there is an item with 'name' already in openhab, the item gets updated with the infos provided. be aware that not provided fields will be deleted in openhab.
     consider to get the existing item via 'getItem' and then read out existing fields to populate the parameters here.
 
-    This function blocks until the item is created.
+    This function blocks until the item is created. It is not available for a openhab.async_client.AsyncOpenHAB.
 
 
         Args:
@@ -93,7 +97,7 @@ class ItemFactory:
         Returns:
           the created Item
         """
-
+    self.openHABClient._check_blocking_request("create_or_update_item", "Use await AsyncOpenHAB.req_json_put() and await AsyncOpenHAB.get_item().")
     self.create_or_update_item_async(name=name,
                                      type=data_type,
                                      quantity_type=quantity_type,
@@ -158,6 +162,7 @@ class ItemFactory:
 
 
           """
+    self.openHABClient._check_blocking_request("create_or_update_item_async", "Use await AsyncOpenHAB.req_json_put().")
     paramdict: typing.Dict[str, typing.Union[str, typing.List[str], typing.Dict[str, typing.Union[str, typing.List]]]] = {}
     itemtypename = type
     if inspect.isclass(type):
@@ -209,6 +214,15 @@ class ItemFactory:
     item = self.openHABClient.get_item(name=itemname,force_request_to_openhab=force_request_to_openhab,auto_update=auto_update,maxEchoToOpenhabMS=maxEchoToOpenhabMS,use_slotted_sending=use_slotted_sending)
     return item
 
+  def get_items(self, itemnames: typing.Iterable[str], force_request_to_openhab: typing.Optional[bool] = False, auto_update: typing.Optional[bool] = True, maxEchoToOpenhabMS=None, use_slotted_sending: bool = False) -> typing.Dict[str, Item]:
+    """get many existing openhab items at once, using as few requests as possible. See get_item for the arguments.
+          Args:
+              itemnames: the unique names of the items
+          Returns:
+            dict: item names as key and the Items as value. Items unknown to openhab are missing.
+    """
+    return self.openHABClient.get_items(names=itemnames, force_request_to_openhab=force_request_to_openhab, auto_update=auto_update, maxEchoToOpenhabMS=maxEchoToOpenhabMS, use_slotted_sending=use_slotted_sending)
+
   def fetch_all_items(self) -> typing.Dict[str, openhab.items.Item]:
     """Returns all items defined in openHAB.
 
@@ -217,6 +231,19 @@ class ItemFactory:
       """
     return self.openHABClient.fetch_all_items()
 
+
+def _copy_future_outcome(source: concurrent.futures.Future, target: concurrent.futures.Future) -> None:
+  if source.cancelled():
+    target.cancel()
+    return
+  if not target.set_running_or_notify_cancel():
+    return
+  if source.exception() is not None:
+    target.set_exception(source.exception())
+  else:
+    target.set_result(source.result())
+
+
 class Item:
   """Base item class."""
 
@@ -228,6 +255,20 @@ class Item:
 
   TYPENAME = "unknown"
 
+  def __init_subclass__(cls, **kwargs: typing.Any) -> None:
+    super().__init_subclass__(**kwargs)
+    cls._build_type_sets()
+
+  @classmethod
+  def _build_type_sets(cls) -> None:
+    """precomputes frozensets of the type lists of an item class, so incoming events need only O(1) lookups.
+    Call it again if you modify the type lists of a class at runtime."""
+    cls._state_type_set = frozenset(cls.state_types)
+    cls._command_event_type_set = frozenset(cls.command_event_types)
+    cls._state_event_type_set = frozenset(cls.state_event_types) | {openhab.types.UndefType}
+    cls._state_changed_event_type_set = frozenset(cls.state_changed_event_types)
+    cls._value_event_type_set = frozenset(cls.state_changed_event_types) | frozenset(cls.state_event_types)
+
   def __init__(self, openhab_conn: 'openhab.client.OpenHAB', json_data: dict, auto_update: typing.Optional[bool] = True, maxEchoToOpenhabMS = None, use_slotted_sending:bool = False) -> None:
     """Constructor.
 
@@ -257,6 +298,19 @@ class Item:
     self._raw_state = None  # type: typing.Optional[typing.Any]  # raw state as returned by the server
     self._raw_state_event = None  # type: str  # raw state as received from Serverevent
     self._members = {}  # type: typing.Dict[str, typing.Any] #  group members (key = item name), for none-group items it's empty
+    self._state_fetched_at = None  # type: typing.Optional[float]  # time.monotonic() of the last state received from the REST api
+    self.read_ttl = None  # type: typing.Optional[float]  # seconds a fetched state is used without auto_update. None: use the read ttl of the client
+    self.coalesce_sending = False  # True: while a value is being sent, only the newest of the values sent meanwhile is transmitted afterwards
+    self.coalesced_sends = 0  # number of values dropped because a newer one replaced them before they were transmitted
+    self._pending_send = None  # type: typing.Optional[typing.Tuple[bool, typing.Any]]  # (is_command, rest formatted value) waiting to be transmitted
+    self._coalesced_sending_active = False
+    self._pending_future = None  # type: typing.Optional[concurrent.futures.Future]  # outcome of the pending value of coalesced sending without slots
+    self._scheduled_send = None  # type: typing.Optional[concurrent.futures.Future]
+    self.pacing_lane = None  # type: typing.Optional[str]  # the lane of slotted sends. None: chosen by the pacing_lanes of the client
+    self.send_priority = openhab.scheduling.SendPriority.NORMAL  # priority of slotted sends, can be overridden per command or update
+    self._scheduled_priority = None  # type: typing.Optional[openhab.scheduling.SendPriority]
+    self._awaiting_echo = collections.deque(maxlen=64)  # type: typing.Deque[typing.Tuple[bool, float]]  # (is_command, time.monotonic()) of slotted sends without echo yet
+    self._coalesce_lock = threading.Lock()
 
     self.logger = logging.getLogger(__name__)
 
@@ -282,9 +336,20 @@ class Item:
       self.group = True
       if 'groupType' in json_data:
         self.type_ = json_data['groupType']
-      # init members
-      for i in json_data['members']:
-        self.members[i['name']] = self.openhab.json_to_item(i)
+      # init members. item definitions received through events do not contain them.
+      if 'members' in json_data:
+        member_names = set()
+        for i in json_data['members']:
+          member_names.add(i['name'])
+          member = self.members.get(i['name'])
+          member_type = i.get('groupType') if i['type'] == 'Group' else i['type']
+          if member is not None and member.type_ == member_type and member.group == (i['type'] == 'Group'):
+            # refresh the known member instead of creating a new one
+            member.init_from_json(i)
+          else:
+            self.members[i['name']] = self.openhab.json_to_item(i)
+        for name in [name for name in self.members if name not in member_names]:
+          del self.members[name]
 
     else:
       self.type_ = json_data['type']
@@ -304,7 +369,11 @@ class Item:
     if "groupNames" in json_data:
       self.groupNames = json_data['groupNames']
 
+    if 'state' not in json_data:
+      # item definitions received through events do not contain the state, so keep the current one
+      return
     self._raw_state = json_data['state']
+    self._state_fetched_at = time.monotonic()
 
     if self.is_undefined(self._raw_state):
       self._state = None
@@ -318,19 +387,52 @@ class Item:
       fetch_from_openhab (bool) : override auto_update setting and refresh the state now.
 
     The state is automatically refreshed from openHAB through incoming events if auto_update is turned on.
-    If auto_update is not turned on, the state gets refreshed now.
+    If auto_update is not turned on, the state gets refreshed now, unless it was fetched within read_ttl seconds
+    (see openhab.client.OpenHAB item_read_ttl).
     Updating the value via this property sends an update to the event bus.
     """
-    if not self.autoUpdate or fetch_from_openhab:
-      json_data = self.openhab.get_item_raw(self.name)
-      self.init_from_json(json_data)
+    if fetch_from_openhab or (not self.autoUpdate and not self._is_state_fresh()):
+      self.refresh()
+
+    return self._state
+
+  def _is_state_fresh(self) -> bool:
+    read_ttl = self.read_ttl
+    if read_ttl is None:
+      read_ttl = self.openhab.item_read_ttl
+    return read_ttl > 0 and self._state_fetched_at is not None and time.monotonic() - self._state_fetched_at < read_ttl
 
+  def refresh(self) -> typing.Any:
+    """fetches the item from openHAB now, regardless of auto_update and read_ttl.
+
+    Returns:
+      the new state of the item.
+    """
+    self._check_blocking_request("refresh", "Turn on auto_update or use await AsyncOpenHAB.get_item(name, force_request_to_openhab=True).")
+    json_data = self.openhab.get_item_raw(self.name)
+    self.init_from_json(json_data)
     return self._state
 
   @state.setter
   def state(self, value: typing.Any) -> None:
     self.update(value)
 
+  def _take_over_from(self, replaced_item: Item) -> None:
+    """takes over the event listeners and the settings of replaced_item, the instance of this item before its type changed in openHAB."""
+    self.event_listeners = replaced_item.event_listeners
+    self.autoUpdate = replaced_item.autoUpdate
+    self.maxEchoToOpenhabMS = replaced_item.maxEchoToOpenhabMS
+    self.change_sent_history = replaced_item.change_sent_history
+    self.use_slotted_sending = replaced_item.use_slotted_sending
+    self.coalesce_sending = replaced_item.coalesce_sending
+    self.read_ttl = replaced_item.read_ttl
+    self.pacing_lane = replaced_item.pacing_lane
+    self.send_priority = replaced_item.send_priority
+
+  def _check_blocking_request(self, operation: str, alternative: str) -> None:
+    """raises TypeError if this item belongs to a openhab.async_client.AsyncOpenHAB, whose requests can not be sent blocking."""
+    self.openhab._check_blocking_request("{} of item '{}'".format(operation, self.name), alternative)
+
   @property
   def members(self) -> typing.Dict[str, typing.Any]:
     """If item is a type of Group, it will return all member items for this group.
@@ -393,6 +495,8 @@ class Item:
       else:
         time_sent,item = self.change_sent_history.get(event.value)
         result = time_sent is not None
+        if result and self._awaiting_echo:
+          self._measure_echo_rtt(event)
       return result
     finally:
       self.logger.debug("check if it is my own echo result:{result} for item:{itemname}, event.source:{source}, event.data_type{datatype}, self._state:{state}, event.new_value:{value}, time sent:{time_sent}, now:{now}".format(
@@ -405,15 +509,50 @@ class Item:
           time_sent=time_sent,
           now=now))
 
+  def _measure_echo_rtt(self, event: openhab.events.ItemEvent) -> None:
+    """reports the time from sending a slotted value to receiving its echo to the client, which adapts the spacing of slotted sends.
+    Commands are matched with command events and updates with state events, oldest first."""
+    if event.type == openhab.events.ItemCommandEventType:
+      is_command = True
+    elif event.type == openhab.events.ItemStateEventType:
+      is_command = False
+    else:
+      return
+    now = time.monotonic()
+    lost = 0
+    rtt = None
+    with self._coalesce_lock:
+      while self._awaiting_echo and now - self._awaiting_echo[0][1] > self.maxEchoToOpenhabMS / 1000:
+        self._awaiting_echo.popleft()
+        lost += 1
+      for index, (sent_as_command, sent_at) in enumerate(self._awaiting_echo):
+        if sent_as_command == is_command:
+          del self._awaiting_echo[index]
+          rtt = now - sent_at
+          break
+    lane = self.openhab.pacing_lane_for(self)
+    for _ in range(lost):
+      self.openhab._report_echo_rtt(lane, None)
+    if rtt is not None:
+      self.openhab._report_echo_rtt(lane, rtt)
+
   def delete(self):
     """deletes the item from openhab """
+    self._check_blocking_request("delete", "Use await item.async_delete().")
     self.openhab.req_del('/items/{}'.format(self.name))
     self.openhab.unregister_item(self.name)
     self._state = None
     self.remove_all_event_listeners()
 
-  def __extract_value_and_unitofmeasure(self, value: str) -> typing.Tuple[str, str]:
-    """Private method to extract value and unit of measue
+  async def async_delete(self) -> None:
+    """Awaitable variant of delete for items fetched through openhab.async_client.AsyncOpenHAB."""
+    await self.openhab.req_del('/items/{}'.format(self.name))
+    self.openhab.unregister_item(self.name)
+    self._state = None
+    self.remove_all_event_listeners()
+
+  def _extract_value_and_unitofmeasure(self, value: str) -> typing.Tuple[str, str]:
+    """Private method to extract value and unit of measue. Items whose values are tuples themselves override it.
 
         Args:
           value (str): the parsed value
@@ -421,7 +560,8 @@ class Item:
         Returns:
           tuple[str,str] : 2 strings containing the value and the unit of measure
         """
-    if isinstance(value, tuple):
+    if isinstance(value, tuple) and len(value) == 2 and isinstance(value[1], str):
+      # (value, unit of measure) of a DecimalType. Other tuples like HSB values are values of their own.
       value_result = value[0]
       uom = value[1]
       return value_result, uom
@@ -439,9 +579,9 @@ class Item:
               openhab.events.ItemCommandEvent : the populated event
             """
     parsed_value = command_type_class.parse(command)
-    value_result, uom = self.__extract_value_and_unitofmeasure(parsed_value)
+    value_result, uom = self._extract_value_and_unitofmeasure(parsed_value)
     is_non_value_command = False
-    if command_type_class not in self.state_changed_event_types + self.state_event_types:
+    if command_type_class not in self._value_event_type_set:
       is_non_value_command = True
     item_command_event = openhab.events.ItemCommandEvent(item_name=self.name,
                                                          source=openhab.events.EventSourceOpenhab,
@@ -452,7 +592,7 @@ class Item:
                                                          is_my_own_echo=False,
                                                          is_non_value_command=is_non_value_command)
     item_command_event.is_my_own_echo = self._is_my_own_echo(item_command_event)
-    if command_type_class in self.state_types:
+    if command_type_class in self._state_type_set:
       if not item_command_event.is_my_own_echo:
         self.__set_state(value_result)
         self._unitOfMeasure = uom
@@ -469,9 +609,9 @@ class Item:
                   openhab.events.ItemStateEvent : the populated event
                 """
     parsed_value = state_type_class.parse(value)
-    value_result, uom = self.__extract_value_and_unitofmeasure(parsed_value)
+    value_result, uom = self._extract_value_and_unitofmeasure(parsed_value)
     is_non_value_command = False
-    if state_type_class not in self.state_changed_event_types + self.state_event_types:
+    if state_type_class not in self._value_event_type_set:
       is_non_value_command = True
     item_state_event = openhab.events.ItemStateEvent(item_name=self.name,
                                                      source=openhab.events.EventSourceOpenhab,
@@ -483,7 +623,7 @@ class Item:
                                                      is_non_value_command=is_non_value_command)
 
     item_state_event.is_my_own_echo = self._is_my_own_echo(item_state_event)
-    if item_state_event in self.state_types:
+    if state_type_class in self._state_type_set:
       if not item_state_event.is_my_own_echo:
         self.__set_state(value_result)
         self._unitOfMeasure = uom
@@ -503,13 +643,13 @@ class Item:
                   openhab.events.ItemStateChangedEvent : the populated event
                 """
     parsed_value = state_type_class.parse(value)
-    value_result, uom = self.__extract_value_and_unitofmeasure(parsed_value)
+    value_result, uom = self._extract_value_and_unitofmeasure(parsed_value)
     old_value_result = old_uom = ""
     if old_state_type_class is not None:
       parsed_old_value = old_state_type_class.parse(old_value)
-      old_value_result, old_uom = self.__extract_value_and_unitofmeasure(parsed_old_value)
+      old_value_result, old_uom = self._extract_value_and_unitofmeasure(parsed_old_value)
     is_non_value_command = False
-    if state_type_class not in self.state_changed_event_types + self.state_event_types:
+    if state_type_class not in self._value_event_type_set:
       is_non_value_command = True
     item_state_changed_event = openhab.events.ItemStateChangedEvent(item_name=self.name,
                                                                     source=openhab.events.EventSourceOpenhab,
@@ -525,7 +665,7 @@ class Item:
                                                                     is_non_value_command=is_non_value_command)
 
     item_state_changed_event.is_my_own_echo = self._is_my_own_echo(item_state_changed_event)
-    if item_state_changed_event in self.state_types:
+    if state_type_class in self._state_type_set:
       if not item_state_changed_event.is_my_own_echo:
         self._state = value_result
     return item_state_changed_event
@@ -540,7 +680,7 @@ class Item:
     command_type = raw_event.content["type"]
     command_type_class = openhab.types.CommandType.get_type_for(command_type)
     command = raw_event.content["value"]
-    if command_type_class in self.command_event_types:
+    if command_type_class in self._command_event_type_set:
       item_command_event = self._digest_external_command_event(command_type_class, command)
       return item_command_event
     raise Exception("unknown command event type:'{}'".format(command_type_class))
@@ -557,7 +697,7 @@ class Item:
     if state_type_class is None:
       raise openhab.types.TypeNotImplementedError(itemname=self.name,datatype=state_type)
     value = raw_event.content["value"]
-    if state_type_class in self.state_event_types+[openhab.types.UndefType]:
+    if state_type_class in self._state_event_type_set:
       item_state_event = self.digest_external_state_event(state_type_class, value)
       return item_state_event
     raise Exception("unknown state event type:'{}'".format(state_type_class))
@@ -575,7 +715,7 @@ class Item:
     state_changed_old_type_class = openhab.types.CommandType.get_type_for(state_changed_old_type)
     value = raw_event.content["value"]
     old_value = raw_event.content["oldValue"]
-    if state_changed_type_class in self.state_changed_event_types:
+    if state_changed_type_class in self._state_changed_event_type_set:
       item_state_changed_event = self.digest_external_state_changed_event(state_type_class=state_changed_type_class, value=value, old_state_type_class=state_changed_old_type_class, old_value=old_value)
       return item_state_changed_event
     raise Exception("unknown statechanged event type:{}".format(state_changed_type_class))
@@ -739,50 +879,170 @@ class Item:
     return '<{0} - {1} : {2}>'.format(self.type_, self.name, self._state)
 
   def wait_for_sending_slot(self):
-    try:
-      self.openhab._slotted_modification_lock.acquire()
+    """blocks until the next sending slot. Commands and updates of items with use_slotted_sending are queued by the
+    slotted scheduler of the client instead, this is only for own requests."""
+    with self.openhab._slotted_modification_lock:
+      # reserve the slot and sleep after releasing the lock, so other threads can reserve the following slots meanwhile
       now = datetime.utcnow()
-      wait_until = self.openhab._last_slotted_modification_sent + timedelta(milliseconds=self.openhab.min_time_between_slotted_changes_ms)
-      if wait_until > now:
-        wait_time = wait_until - now
-        wait_time_seconds = wait_time.seconds + wait_time.microseconds / 1000000
-        self.logger.debug("waiting for {} seconds for sending slotted update to OH for item {}.".format(wait_time_seconds, self.name))
-        time.sleep(wait_time_seconds)
-      self.openhab._last_slotted_modification_sent = datetime.utcnow()
-
-    finally:
-      self.openhab._slotted_modification_lock.release()
-
-  def _update(self, value: typing.Any) -> None:
+      slot = max(now, self.openhab._last_slotted_modification_sent + timedelta(milliseconds=self.openhab.min_time_between_slotted_changes_ms))
+      self.openhab._last_slotted_modification_sent = slot
+    wait_time_seconds = (slot - now).total_seconds()
+    if wait_time_seconds > 0:
+      self.logger.debug("waiting for {} seconds for sending slotted update to OH for item {}.".format(wait_time_seconds, self.name))
+      time.sleep(wait_time_seconds)
+
+  def _update(self, value: typing.Any, priority: typing.Optional[openhab.scheduling.SendPriority] = None) -> typing.Optional[concurrent.futures.Future]:
     """Updates the state of an item, input validation is expected to be already done.
 
     Args:
       value (object): The value to update the item with. The data_type of the value depends
                       on the item data_type and is checked accordingly.
+      priority (SendPriority, optional): the priority of a slotted update. Defaults to send_priority.
     """
     # noinspection PyTypeChecker
 
+    self._check_blocking_request("update", "Use await item.async_update(value).")
     self.change_sent_history.add(value)
+    return self._send(False, value, priority)
+
+  def _send(self, is_command: bool, value: typing.Any, priority: typing.Optional[openhab.scheduling.SendPriority] = None) -> typing.Optional[concurrent.futures.Future]:
+    """Sends a rest formatted value as command or update, honouring use_slotted_sending and coalesce_sending.
 
+    Returns:
+      concurrent.futures.Future: with use_slotted_sending the future of the queued send, with coalesce_sending the future of a value
+      waiting for the running send of this item. Otherwise None.
+    """
     if self.use_slotted_sending:
-      self.wait_for_sending_slot()
-    self.logger.debug("sending update to OH for item {} with new value:{}".format(self.name, value))
-    self.openhab.req_put('/items/{}/state'.format(self.name), data=value)
+      if priority is None:
+        priority = self.send_priority
+      if self.coalesce_sending:
+        return self._schedule_coalesced(is_command, value, priority)
+      return self.openhab.slotted_scheduler.submit(lambda: self._transmit(is_command, value), lane=self.openhab.pacing_lane_for(self), priority=priority)
+    if self.coalesce_sending:
+      return self._send_coalesced(is_command, value)
+    self._transmit(is_command, value)
+    return None
+
+  def _transmit(self, is_command: bool, value: typing.Any) -> None:
+    if self.use_slotted_sending and self.openhab.adaptive_slotted_sending:
+      with self._coalesce_lock:
+        self._awaiting_echo.append((is_command, time.monotonic()))
+    if is_command:
+      self.logger.debug("sending command to OH for item {} with new value:{}".format(self.name, value))
+      self.openhab.req_post('/items/{}'.format(self.name), data=value)
+    else:
+      self.logger.debug("sending update to OH for item {} with new value:{}".format(self.name, value))
+      self.openhab.req_put('/items/{}/state'.format(self.name), data=value)
 
-  def update(self, value: typing.Any) -> None:
-    """Updates the state of an item.
+  def _send_coalesced(self, is_command: bool, value: typing.Any) -> typing.Optional[concurrent.futures.Future]:
+    """Latest value wins: if a value of this item is being sent, the new value only replaces the pending one and the call returns its future.
+    Otherwise the value is transmitted before the call returns. After the running request completed, whether it failed or not,
+    a sender thread transmits the newest pending value and resolves its future, which the callers of replaced values share.
+
+    Returns:
+      concurrent.futures.Future: the future of the pending value if a value is being sent, otherwise None.
+    """
+    with self._coalesce_lock:
+      if self._coalesced_sending_active:
+        if self._pending_send is not None:
+          self.coalesced_sends += 1
+        else:
+          self._pending_future = concurrent.futures.Future()
+        self._pending_send = (is_command, value)
+        return self._pending_future
+      self._coalesced_sending_active = True
+    try:
+      self._transmit(is_command, value)
+    finally:
+      self._send_pending_coalesced_later()
+    return None
+
+  def _send_pending_coalesced_later(self) -> None:
+    with self._coalesce_lock:
+      if self._pending_send is None:
+        self._coalesced_sending_active = False
+        return
+    threading.Thread(target=self._send_pending_coalesced, name="{}-coalesced".format(self.name), daemon=True).start()
+
+  def _send_pending_coalesced(self) -> None:
+    """transmits the pending values of coalesced sending until no value is pending anymore."""
+    while True:
+      with self._coalesce_lock:
+        if self._pending_send is None:
+          self._coalesced_sending_active = False
+          return
+        (pending_is_command, pending_value), future = self._pending_send, self._pending_future
+        self._pending_send = None
+        self._pending_future = None
+      if not future.set_running_or_notify_cancel():
+        continue
+      try:
+        self._transmit(pending_is_command, pending_value)
+      except Exception as e:
+        future.set_exception(e)
+      else:
+        future.set_result(None)
+
+  async def _async_update(self, value: typing.Any) -> None:
+    """Awaitable variant of _update, used when the item belongs to an openhab.async_client.AsyncOpenHAB.
 
     Args:
       value (object): The value to update the item with. The data_type of the value depends
                       on the item data_type and is checked accordingly.
     """
-    oldstate = self._state
-    self._validate_value(value)
+    self.change_sent_history.add(value)
 
-    v = self._rest_format(value)
-    self._state = value
-    self._update(v)
+    if self.use_slotted_sending:
+      await self.openhab.wait_for_sending_slot()
+    self.logger.debug("sending update to OH for item {} with new value:{}".format(self.name, value))
+    await self.openhab.req_put('/items/{}/state'.format(self.name), data=value)
+
+  def _schedule_coalesced(self, is_command: bool, value: typing.Any, priority: openhab.scheduling.SendPriority) -> concurrent.futures.Future:
+    """Latest value wins for slotted sending: while a send of this item waits for its slot, a new value only replaces the pending one.
+    A value of a higher priority than the queued send takes its place in the queue with the new priority.
 
+    Returns:
+      concurrent.futures.Future: the future of the queued send, which will transmit the newest value.
+    """
+    with self._coalesce_lock:
+      if self._pending_send is not None:
+        self.coalesced_sends += 1
+      self._pending_send = (is_command, value)
+      if self._scheduled_send is not None and priority <= self._scheduled_priority:
+        return self._scheduled_send
+      superseded_send = self._scheduled_send
+      this_send: typing.List[concurrent.futures.Future] = []
+      future = self.openhab.slotted_scheduler.submit(lambda: self._transmit_pending(this_send[0]), lane=self.openhab.pacing_lane_for(self), priority=priority)
+      this_send.append(future)
+      self._scheduled_send = future
+      self._scheduled_priority = priority
+      if superseded_send is not None and self.openhab.slotted_scheduler.withdraw(superseded_send):
+        # the callers of the superseded send get the outcome of the send replacing it
+        future.add_done_callback(lambda done: _copy_future_outcome(done, superseded_send))
+      return future
+
+  def _transmit_pending(self, this_send: concurrent.futures.Future) -> typing.Any:
+    with self._coalesce_lock:
+      if self._scheduled_send is this_send:
+        # a value arriving from now on needs a new slot
+        self._scheduled_send = None
+        self._scheduled_priority = None
+      if self._pending_send is None:
+        # transmitted already by the send which was running when this one got queued
+        return openhab.scheduling.SKIPPED
+      pending_is_command, pending_value = self._pending_send
+      self._pending_send = None
+    self._transmit(pending_is_command, pending_value)
+
+  def _internal_update_event(self, oldstate: typing.Any) -> openhab.events.ItemStateEvent:
+    """Private method to build the internal event describing a local update.
+
+    Args:
+      oldstate (object): the state of the item before the update.
+
+    Returns:
+      openhab.events.ItemStateEvent : a ItemStateEvent or, if the state changed, a ItemStateChangedEvent
+    """
     if oldstate == self._state:
       event = openhab.events.ItemStateEvent(item_name=self.name,
                                             source=openhab.events.EventSourceInternal,
@@ -807,40 +1067,134 @@ class Item:
                                                    is_my_own_echo=False,
                                                    is_non_value_command=False
                                                    )
-    self._process_internal_event(event)
+    return event
+
+  def update(self, value: typing.Any, priority: typing.Optional[openhab.scheduling.SendPriority] = None) -> typing.Optional[concurrent.futures.Future]:
+    """Updates the state of an item.
+
+    Args:
+      value (object): The value to update the item with. The data_type of the value depends
+                      on the item data_type and is checked accordingly.
+      priority (SendPriority, optional): with use_slotted_sending queued updates of a higher priority are sent first. Defaults to send_priority.
+
+    Returns:
+      concurrent.futures.Future: with use_slotted_sending the update is queued and the future is resolved once it was sent.
+      With coalesce_sending the future of the update waiting for the running send of this item. Otherwise None.
+    """
+    self._check_blocking_request("update", "Use await item.async_update(value).")
+    oldstate = self._state
+    self._validate_value(value)
+
+    v = self._rest_format(value)
+    self._state = value
+    scheduled_send = self._update(v, priority)
+
+    self._process_internal_event(self._internal_update_event(oldstate))
+    return scheduled_send
+
+  async def async_update(self, value: typing.Any) -> None:
+    """Awaitable variant of update for items fetched through openhab.async_client.AsyncOpenHAB.
+
+    Args:
+      value (object): The value to update the item with. The data_type of the value depends
+                      on the item data_type and is checked accordingly.
+    """
+    oldstate = self._state
+    self._validate_value(value)
+
+    v = self._rest_format(value)
+    self._state = value
+    await self._async_update(v)
+
+    self._process_internal_event(self._internal_update_event(oldstate))
+
+  def _internal_command_event(self, value: typing.Any) -> openhab.events.ItemCommandEvent:
+    """Private method to build the internal event describing a local command.
+
+    Args:
+      value (object): the value sent as command.
+
+    Returns:
+      openhab.events.ItemCommandEvent : the populated event
+    """
+    unit_of_measure = ""
+    if hasattr(self, "_unitOfMeasure"):
+      unit_of_measure = self._unitOfMeasure
+    return openhab.events.ItemCommandEvent(item_name=self.name,
+                                           source=openhab.events.EventSourceInternal,
+                                           value_datatype=self.type_,
+                                           value=value,
+                                           value_raw=None,
+                                           unit_of_measure=unit_of_measure,
+                                           is_my_own_echo=True,
+                                           is_non_value_command=False
+                                           )
 
   # noinspection PyTypeChecker
-  def command(self, value: typing.Any) -> None:
+  def command(self, value: typing.Any, priority: typing.Optional[openhab.scheduling.SendPriority] = None) -> typing.Optional[concurrent.futures.Future]:
     """Sends the given value as command to the event bus.
 
     Args:
       value (object): The value to send as command to the event bus. The data_type of the
                       value depends on the item data_type and is checked accordingly.
+      priority (SendPriority, optional): with use_slotted_sending queued commands of a higher priority are sent first. Defaults to send_priority.
+
+    Returns:
+      concurrent.futures.Future: with use_slotted_sending the command is queued and the future is resolved once it was sent.
+      With coalesce_sending the future of the command waiting for the running send of this item. Otherwise None.
     """
+    self._check_blocking_request("command", "Use await item.async_command(value).")
+    self._validate_value(value)
+    v = self._rest_format(value)
+    self._state = value
+
+    self.change_sent_history.add(value)
+    scheduled_send = self._send(True, v, priority)
+
+    self._process_internal_event(self._internal_command_event(value))
+    return scheduled_send
+
+  async def async_command(self, value: typing.Any) -> None:
+    """Awaitable variant of command for items fetched through openhab.async_client.AsyncOpenHAB.
 
+    Args:
+      value (object): The value to send as command to the event bus. The data_type of the
+                      value depends on the item data_type and is checked accordingly.
+    """
     self._validate_value(value)
     v = self._rest_format(value)
     self._state = value
 
     self.change_sent_history.add(value)
     if self.use_slotted_sending:
-      self.wait_for_sending_slot()
-    self.openhab.req_post('/items/{}'.format(self.name), data=v)
+      await self.openhab.wait_for_sending_slot()
+    await self.openhab.req_post('/items/{}'.format(self.name), data=v)
 
+    self._process_internal_event(self._internal_command_event(value))
 
-    unit_of_measure = ""
-    if hasattr(self, "_unitOfMeasure"):
-      unit_of_measure = self._unitOfMeasure
-    event = openhab.events.ItemCommandEvent(item_name=self.name,
-                                            source=openhab.events.EventSourceInternal,
-                                            value_datatype=self.type_,
-                                            value=value,
-                                            value_raw=None,
-                                            unit_of_measure=unit_of_measure,
-                                            is_my_own_echo=True,
-                                            is_non_value_command=False
-                                            )
-    self._process_internal_event(event)
+  def members_command(self, value: typing.Any) -> typing.Dict[str, typing.Optional[Exception]]:
+    """Sends the given value as command to all members of this group in parallel, see openhab.client.OpenHAB.send_many.
+
+    Args:
+      value (object): The value to send as command to the members.
+
+    Returns:
+      dict: member names as key and None if the command was sent or the exception raised while sending it.
+    """
+    self._check_blocking_request("members_command", "Use asyncio.gather() with await member.async_command(value) per member.")
+    return self.openhab._send_to_items([(member, value) for member in self.members.values()], command=True)
+
+  def members_update(self, value: typing.Any) -> typing.Dict[str, typing.Optional[Exception]]:
+    """Updates the state of all members of this group in parallel, see openhab.client.OpenHAB.send_many.
+
+    Args:
+      value (object): The value to update the members with.
+
+    Returns:
+      dict: member names as key and None if the update was sent or the exception raised while sending it.
+    """
+    self._check_blocking_request("members_update", "Use asyncio.gather() with await member.async_update(value) per member.")
+    return self.openhab._send_to_items([(member, value) for member in self.members.values()], command=False)
 
   def update_state_null(self) -> None:
     """Update the state of the item to *NULL*."""
@@ -877,6 +1231,9 @@ class Item:
     return False
 
 
+Item._build_type_sets()
+
+
 class StringItem(Item):
   """DateTime item data_type."""
 
@@ -1081,6 +1438,13 @@ class ContactItem(Item):
     """
     raise ValueError('This item ({}) only supports updates, not commands!'.format(self.__class__))
 
+  async def async_command(self, *args, **kwargs) -> None:
+    """This overrides the `Item` async_command method.
+
+    Note: Commands are not accepted for items of data_type contact.
+    """
+    raise ValueError('This item ({}) only supports updates, not commands!'.format(self.__class__))
+
   def open(self) -> None:
     """Set the state of the contact item to OPEN."""
     self.state = openhab.types.OpenCloseType.OPEN
@@ -1181,7 +1545,7 @@ class ColorItem(DimmerItem):
 
     return value
 
-  def __extract_value_and_unitofmeasure(self, value: str):
+  def _extract_value_and_unitofmeasure(self, value: str):
     return value, ""
 
 
@@ -0,0 +1,212 @@
+# -*- coding: utf-8 -*-
+"""write-ahead queue of commands and updates which could not be sent to openHAB, replayed once openHAB is reachable again."""
+
+#
+# Alexey Grubauer (c) 2021 <alexey@ingenious-minds.at>
+#
+# python-openhab is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# python-openhab is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with python-openhab.  If not, see <http://www.gnu.org/licenses/>.
+#
+
+# pylint: disable=bad-indentation
+from __future__ import annotations
+import base64
+import collections
+import json
+import logging
+import os
+import threading
+import time
+import typing
+
+
+class QueuedRequest(object):
+  """a POST or PUT request waiting in the OfflineCommandQueue."""
+  __slots__ = ("method", "uri_path", "data", "headers", "queued_at")
+
+  def __init__(self, method: str, uri_path: str, data: typing.Any, headers: typing.Optional[typing.Dict[str, str]], queued_at: typing.Optional[float] = None):
+    self.method = method
+    self.uri_path = uri_path
+    self.data = data
+    self.headers = headers
+    self.queued_at = time.time() if queued_at is None else queued_at  # wall clock, the queue may outlive the process
+
+  @property
+  def key(self) -> typing.Tuple[str, str]:
+    """requests with the same key replace each other when the queue compacts."""
+    return self.method, self.uri_path
+
+  def to_json(self) -> str:
+    record = {"method": self.method, "uri_path": self.uri_path, "headers": self.headers, "queued_at": self.queued_at}
+    if isinstance(self.data, bytes):
+      record["data_base64"] = base64.b64encode(self.data).decode("ascii")
+    else:
+      record["data"] = self.data
+    return json.dumps(record)
+
+  @classmethod
+  def from_json(cls, line: str) -> QueuedRequest:
+    record = json.loads(line)
+    data = base64.b64decode(record["data_base64"]) if "data_base64" in record else record.get("data")
+    return cls(record["method"], record["uri_path"], data, record.get("headers"), record["queued_at"])
+
+
+class OfflineCommandQueue(object):
+  """A FIFO of requests which could not be sent, optionally persisted to an append-only JSON lines file.
+
+  Every queued request is appended to the file before it is acknowledged, so the queue survives a restart of the process.
+  The file is rewritten with the remaining requests after a replay or when requests got dropped.
+  With compaction a queued request replaces the queued request with the same method and path (latest value wins),
+  and takes its place at the end of the queue. This loses relative commands like INCREASE or TOGGLE, so compaction is off by default. Requests older than max_age seconds are dropped instead of being replayed.
+  """
+
+  def __init__(self, path: typing.Optional[str] = None, max_age: typing.Optional[float] = None, compact: bool = False) -> None:
+    """Constructor.
+
+    Args:
+      path (str, optional): the file to persist the queue to. Requests already stored in it are loaded. None keeps the queue in memory only.
+      max_age (float, optional): seconds after which a queued request is dropped. None keeps requests forever.
+      compact (bool): True: keep only the latest request per method and path. Only safe if all queued requests set absolute values.
+    """
+    self.path = path
+    self.max_age = max_age
+    self.compact = compact
+    self.logger = logging.getLogger(__name__)
+    self._requests: typing.OrderedDict[typing.Any, QueuedRequest] = collections.OrderedDict()
+    self._sequence = 0
+    self._lock = threading.RLock()
+    self._replay_lock = threading.Lock()
+    self.queued = 0
+    self.compacted = 0
+    self.replayed = 0
+    self.expired = 0
+    self.rejected = 0
+    if path is not None and os.path.exists(path):
+      self._load()
+
+  def __len__(self) -> int:
+    return len(self._requests)
+
+  def _key_for(self, request: QueuedRequest) -> typing.Any:
+    if self.compact:
+      return request.key
+    self._sequence += 1
+    return self._sequence
+
+  def _load(self) -> None:
+    with open(self.path, "r", encoding="utf-8") as queue_file:
+      for line_number, line in enumerate(queue_file, start=1):
+        if not line.strip():
+          continue
+        try:
+          request = QueuedRequest.from_json(line)
+        except (ValueError, KeyError) as e:
+          # typically the last line, cut off by a crash while it was written
+          self.logger.warning("ignoring unreadable line {} of offline queue '{}': '{}' ".format(line_number, self.path, e))
+          continue
+        self._add(request)
+    self._drop_expired()
+    self._rewrite()
+
+  def _add(self, request: QueuedRequest) -> None:
+    key = self._key_for(request)
+    if self._requests.pop(key, None) is not None:
+      self.compacted += 1
+    self._requests[key] = request
+
+  def put(self, method: str, uri_path: str, data: typing.Any = None, headers: typing.Optional[typing.Dict[str, str]] = None) -> None:
+    """appends a request to the queue (and to the file)."""
+    request = QueuedRequest(method, uri_path, data, headers)
+    with self._lock:
+      if self.path is not None:
+        with open(self.path, "a", encoding="utf-8") as queue_file:
+          queue_file.write(request.to_json() + "\n")
+          queue_file.flush()
+          os.fsync(queue_file.fileno())
+      self._add(request)
+      self.queued += 1
+
+  def _drop_expired(self) -> int:
+    if self.max_age is None:
+      return 0
+    valid_after = time.time() - self.max_age
+    expired_keys = [key for key, request in self._requests.items() if request.queued_at < valid_after]
+    for key in expired_keys:
+      del self._requests[key]
+    self.expired += len(expired_keys)
+    return len(expired_keys)
+
+  def _rewrite(self) -> None:
+    if self.path is None:
+      return
+    temporary_path = self.path + ".tmp"
+    with open(temporary_path, "w", encoding="utf-8") as queue_file:
+      for request in self._requests.values():
+        queue_file.write(request.to_json() + "\n")
+      queue_file.flush()
+      os.fsync(queue_file.fileno())
+    os.replace(temporary_path, self.path)
+
+  def replay(self, send: typing.Callable[[QueuedRequest], bool]) -> int:
+    """sends the queued requests in order, dropping expired ones first.
+
+    Args:
+      send (Callable): sends one request. Returns True if it was delivered, False if it was rejected by openHAB and must be dropped.
+                       An exception stops the replay, the request and all after it stay queued.
+
+    Returns:
+      int: the number of delivered requests.
+    """
+    delivered = 0
+    with self._replay_lock:
+      try:
+        with self._lock:
+          self._drop_expired()
+        while True:
+          with self._lock:
+            if not self._requests:
+              break
+            key, request = next(iter(self._requests.items()))
+          # sent without holding the lock, so requests can be queued meanwhile. They are appended and replayed by this loop.
+          accepted = send(request)
+          with self._lock:
+            if accepted:
+              delivered += 1
+              self.replayed += 1
+            else:
+              self.rejected += 1
+            if self._requests.get(key) is request:
+              del self._requests[key]
+      finally:
+        with self._lock:
+          self._rewrite()
+    return delivered
+
+  def clear(self) -> None:
+    with self._lock:
+      self._requests.clear()
+      self._rewrite()
+
+  def get_stats(self) -> typing.Dict[str, int]:
+    """returns the counters of this queue.
+
+    Returns:
+      dict: depth, queued requests, requests replaced by a newer one (compacted), replayed, expired and rejected (dropped on a error answer) requests.
+    """
+    with self._lock:
+      return {"depth": len(self._requests),
+              "queued": self.queued,
+              "compacted": self.compacted,
+              "replayed": self.replayed,
+              "expired": self.expired,
+              "rejected": self.rejected}
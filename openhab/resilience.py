@@ -0,0 +1,158 @@
+# -*- coding: utf-8 -*-
+"""retries with jittered backoff and a circuit breaker protecting openHAB from requests while it is down or starting up."""
+
+#
+# Alexey Grubauer (c) 2021 <alexey@ingenious-minds.at>
+#
+# python-openhab is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# python-openhab is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with python-openhab.  If not, see <http://www.gnu.org/licenses/>.
+#
+
+# pylint: disable=bad-indentation
+from __future__ import annotations
+import logging
+import random
+import threading
+import time
+import typing
+from enum import Enum
+
+import requests
+
+
+# methods which can be sent again without changing the result
+IDEMPOTENT_METHODS = frozenset(["GET", "HEAD", "OPTIONS", "PUT", "DELETE"])
+# answers of a openHAB which is overloaded, starting up or behind a proxy which can not reach it
+RETRYABLE_STATUS_CODES = frozenset([502, 503, 504])
+
+
+class CircuitOpenError(requests.exceptions.ConnectionError):
+  """raised instead of sending a request while the circuit breaker is open, i.e. openHAB is considered down."""
+
+
+class CircuitState(Enum):
+  CLOSED = "closed"  # requests are sent
+  OPEN = "open"  # requests fail fast with CircuitOpenError
+  HALF_OPEN = "half_open"  # one probe request is sent to find out whether openHAB is back
+
+
+class CircuitBreaker(object):
+  """Fails requests fast while openHAB is down.
+
+  After failure_threshold consecutive failures the breaker opens and every request raises CircuitOpenError without being sent.
+  After reset_timeout seconds it lets one probe request through (half open): if it succeeds the breaker closes,
+  otherwise it opens again for another reset_timeout.
+  """
+
+  def __init__(self, failure_threshold: int = 5, reset_timeout: float = 10.0) -> None:
+    """Constructor.
+
+    Args:
+      failure_threshold (int): the number of consecutive failures opening the breaker. 0 disables the breaker.
+      reset_timeout (float): seconds the breaker stays open before a probe request is let through.
+    """
+    self.failure_threshold = failure_threshold
+    self.reset_timeout = reset_timeout
+    self.logger = logging.getLogger(__name__)
+    self._lock = threading.Lock()
+    self.state = CircuitState.CLOSED
+    self.consecutive_failures = 0
+    self._opened_at = 0.0
+    self._probe_started_at: typing.Optional[float] = None
+    self.times_opened = 0
+    self.rejected_calls = 0
+    self.probes = 0
+
+  def before_call(self) -> None:
+    """asks for permission to send a request.
+
+    Raises:
+      CircuitOpenError: the breaker is open, or half open with a probe in flight.
+    """
+    if self.failure_threshold <= 0:
+      return
+    with self._lock:
+      if self.state == CircuitState.CLOSED:
+        return
+      now = time.monotonic()
+      if self.state == CircuitState.OPEN and now - self._opened_at >= self.reset_timeout:
+        self.state = CircuitState.HALF_OPEN
+        self._probe_started_at = None
+      if self.state == CircuitState.HALF_OPEN and (self._probe_started_at is None or now - self._probe_started_at >= self.reset_timeout):
+        # the probe. A probe which never reported back (e.g. a caller killed by a exception) is replaced after reset_timeout
+        self._probe_started_at = now
+        self.probes += 1
+        return
+      self.rejected_calls += 1
+      retry_in = max(0.0, self.reset_timeout - (now - self._opened_at))
+    raise CircuitOpenError("openHAB is considered down after {} consecutive failures, next probe in {:.1f} seconds".format(self.consecutive_failures, retry_in))
+
+  def record_success(self) -> None:
+    with self._lock:
+      if self.state != CircuitState.CLOSED:
+        self.logger.info("openHAB is reachable again, closing the circuit breaker")
+      self.state = CircuitState.CLOSED
+      self.consecutive_failures = 0
+      self._probe_started_at = None
+
+  def record_failure(self) -> None:
+    if self.failure_threshold <= 0:
+      return
+    with self._lock:
+      self.consecutive_failures += 1
+      if self.state == CircuitState.HALF_OPEN or (self.state == CircuitState.CLOSED and self.consecutive_failures >= self.failure_threshold):
+        if self.state == CircuitState.CLOSED:
+          self.logger.warning("opening the circuit breaker after {} consecutive failures".format(self.consecutive_failures))
+          self.times_opened += 1
+        self.state = CircuitState.OPEN
+        self._opened_at = time.monotonic()
+        self._probe_started_at = None
+
+  def get_stats(self) -> typing.Dict[str, typing.Any]:
+    """returns the state and the counters of the breaker.
+
+    Returns:
+      dict: state (CircuitState value), consecutive_failures, times_opened, rejected_calls (failed fast) and probes.
+    """
+    with self._lock:
+      return {"state": self.state.value,
+              "consecutive_failures": self.consecutive_failures,
+              "times_opened": self.times_opened,
+              "rejected_calls": self.rejected_calls,
+              "probes": self.probes}
+
+
+class RetryPolicy(object):
+  """how often and after which delay a failed idempotent request is sent again."""
+
+  def __init__(self, max_retries: int = 2, backoff: float = 0.2, max_backoff: float = 5.0) -> None:
+    """Constructor.
+
+    Args:
+      max_retries (int): retries after the first attempt. 0 disables retries.
+      backoff (float): seconds before the first retry. The delay doubles with every retry.
+      max_backoff (float): the upper bound in seconds for the delay, also for a Retry-After header sent by openHAB.
+    """
+    self.max_retries = max_retries
+    self.backoff = backoff
+    self.max_backoff = max_backoff
+
+  def delay(self, retry: int, retry_after: typing.Optional[str] = None) -> float:
+    """returns the seconds to wait before retry number retry (starting with 0): exponential backoff with jitter."""
+    if retry_after is not None:
+      try:
+        return min(self.max_backoff, max(0.0, float(retry_after)))
+      except ValueError:
+        pass  # a http date, use the backoff instead
+    capped_delay = min(self.max_backoff, self.backoff * (2 ** min(retry, 32)))
+    return capped_delay / 2 + random.uniform(0, capped_delay / 2)
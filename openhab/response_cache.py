@@ -0,0 +1,231 @@
+# -*- coding: utf-8 -*-
+"""size bounded cache of decoded REST responses, revalidated with ETag and Last-Modified, and coalescing of identical requests."""
+
+#
+# Alexey Grubauer (c) 2021 <alexey@ingenious-minds.at>
+#
+# python-openhab is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# python-openhab is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with python-openhab.  If not, see <http://www.gnu.org/licenses/>.
+#
+
+# pylint: disable=bad-indentation
+from __future__ import annotations
+import collections
+import concurrent.futures
+import threading
+import time
+import typing
+
+
+class _CacheEntry(object):
+  __slots__ = ("data", "etag", "last_modified", "stored_at", "ttl")
+
+  def __init__(self, data: typing.Any, etag: typing.Optional[str], last_modified: typing.Optional[str], ttl: float):
+    self.data = data
+    self.etag = etag
+    self.last_modified = last_modified
+    self.stored_at = time.monotonic()
+    self.ttl = ttl
+
+  def is_fresh(self) -> bool:
+    return time.monotonic() - self.stored_at < self.ttl
+
+  def conditional_headers(self) -> typing.Dict[str, str]:
+    headers = {}
+    if self.etag is not None:
+      headers["If-None-Match"] = self.etag
+    if self.last_modified is not None:
+      headers["If-Modified-Since"] = self.last_modified
+    return headers
+
+
+class ResponseCache(object):
+  """A LRU cache of decoded GET responses keyed by the request path.
+
+  A response is served without asking openHAB while it is younger than the ttl of its endpoint. After that it is
+  revalidated with If-None-Match / If-Modified-Since, and on a 304 the already decoded object is handed out again.
+  Responses without ETag and Last-Modified are only kept if their endpoint has a ttl.
+  The cached objects are shared between callers, so they must not be modified.
+  """
+
+  def __init__(self, max_entries: int = 256, default_ttl: float = 0.0, endpoint_ttls: typing.Optional[typing.Dict[str, float]] = None) -> None:
+    """Constructor.
+
+    Args:
+      max_entries (int): the maximum number of cached responses. The least recently used one is evicted first.
+      default_ttl (float): seconds a response is used without revalidation.
+      endpoint_ttls (dict, optional): ttls for paths starting with the given prefix, e.g. {"/audio/": 300}. The longest matching prefix wins.
+    """
+    if max_entries < 1:
+      raise ValueError("max_entries must be at least 1")
+    self.max_entries = max_entries
+    self.default_ttl = default_ttl
+    self.endpoint_ttls = dict(endpoint_ttls or {})
+    self._entries: typing.OrderedDict[str, _CacheEntry] = collections.OrderedDict()
+    self._lock = threading.Lock()
+    self.hits = 0
+    self.revalidations = 0
+    self.misses = 0
+    self.evictions = 0
+
+  def __len__(self) -> int:
+    return len(self._entries)
+
+  def ttl_for(self, uri_path: str) -> float:
+    """returns the ttl of the endpoint uri_path belongs to."""
+    best_prefix = None
+    for prefix in self.endpoint_ttls:
+      if uri_path.startswith(prefix) and (best_prefix is None or len(prefix) > len(best_prefix)):
+        best_prefix = prefix
+    if best_prefix is None:
+      return self.default_ttl
+    return self.endpoint_ttls[best_prefix]
+
+  def lookup(self, uri_path: str) -> typing.Optional[_CacheEntry]:
+    """returns the cached entry for uri_path or None."""
+    with self._lock:
+      entry = self._entries.get(uri_path)
+      if entry is not None:
+        self._entries.move_to_end(uri_path)
+      return entry
+
+  def record_hit(self) -> None:
+    with self._lock:
+      self.hits += 1
+
+  def revalidated(self, uri_path: str, entry: _CacheEntry, etag: typing.Optional[str] = None, last_modified: typing.Optional[str] = None) -> typing.Any:
+    """openHAB answered 304 for entry. Restarts its ttl and returns the cached data."""
+    with self._lock:
+      self.revalidations += 1
+      entry.stored_at = time.monotonic()
+      if etag is not None:
+        entry.etag = etag
+      if last_modified is not None:
+        entry.last_modified = last_modified
+      return entry.data
+
+  def store(self, uri_path: str, data: typing.Any, etag: typing.Optional[str] = None, last_modified: typing.Optional[str] = None) -> None:
+    """caches a freshly downloaded response if it can be reused."""
+    ttl = self.ttl_for(uri_path)
+    with self._lock:
+      self.misses += 1
+      if etag is None and last_modified is None and ttl <= 0:
+        self._entries.pop(uri_path, None)
+        return
+      self._entries[uri_path] = _CacheEntry(data, etag, last_modified, ttl)
+      self._entries.move_to_end(uri_path)
+      while len(self._entries) > self.max_entries:
+        self._entries.popitem(last=False)
+        self.evictions += 1
+
+  def invalidate(self, uri_path: str) -> None:
+    """drops all responses of the endpoint uri_path belongs to, e.g. everything below /items after a change of a item."""
+    segments = uri_path.strip("/").split("/")
+    prefix = "/" + segments[0]
+    with self._lock:
+      for cached_path in [cached_path for cached_path in self._entries if cached_path == prefix or cached_path.startswith(prefix + "/") or cached_path.startswith(prefix + "?")]:
+        del self._entries[cached_path]
+
+  def clear(self) -> None:
+    with self._lock:
+      self._entries.clear()
+
+  def get_stats(self) -> typing.Dict[str, int]:
+    """returns the counters of this cache.
+
+    Returns:
+      dict: size, hits (served without request), revalidations (304 answers), misses (full downloads) and evictions.
+    """
+    with self._lock:
+      return {"size": len(self._entries),
+              "hits": self.hits,
+              "revalidations": self.revalidations,
+              "misses": self.misses,
+              "evictions": self.evictions}
+
+
+class _Flight(object):
+  __slots__ = ("future", "finished_at")
+
+  def __init__(self):
+    self.future = concurrent.futures.Future()
+    self.finished_at: typing.Optional[float] = None
+
+
+class SingleFlight(object):
+  """Lets concurrent identical requests share one execution.
+
+  The first caller for a key executes the request, all callers arriving while it is in flight wait for it and
+  receive the same result or exception. With a coalescing window, callers arriving shortly after it finished
+  get that result as well.
+  """
+
+  def __init__(self, window: float = 0.0) -> None:
+    """Constructor.
+
+    Args:
+      window (float): seconds a finished result is handed out to new callers. 0 shares in flight requests only.
+    """
+    self.window = window
+    self._flights: typing.Dict[typing.Hashable, _Flight] = {}
+    self._lock = threading.Lock()
+    self.executed = 0
+    self.shared = 0
+
+  def do(self, key: typing.Hashable, function: typing.Callable[[], typing.Any]) -> typing.Any:
+    """returns the result of function(), or of the execution already in flight for key."""
+    with self._lock:
+      flight = self._flights.get(key)
+      if flight is not None and (flight.finished_at is None or time.monotonic() - flight.finished_at < self.window):
+        self.shared += 1
+        leader = False
+      else:
+        flight = _Flight()
+        self._flights[key] = flight
+        self.executed += 1
+        leader = True
+    if not leader:
+      return flight.future.result()
+
+    try:
+      result = function()
+    except BaseException as e:
+      flight.future.set_exception(e)
+      self._land(key, flight, keep=False)
+      raise
+    flight.future.set_result(result)
+    self._land(key, flight, keep=self.window > 0)
+    return result
+
+  def _land(self, key: typing.Hashable, flight: _Flight, keep: bool) -> None:
+    with self._lock:
+      flight.finished_at = time.monotonic()
+      if not keep and self._flights.get(key) is flight:
+        del self._flights[key]
+
+  def forget(self) -> None:
+    """makes later callers execute their request again instead of joining a request in flight or reusing a result.
+    Callers already waiting still get the result of their request."""
+    with self._lock:
+      self._flights.clear()
+
+  def get_stats(self) -> typing.Dict[str, int]:
+    """returns the counters of this instance.
+
+    Returns:
+      dict: executed requests, calls which shared the result of another call and the requests currently in flight.
+    """
+    with self._lock:
+      return {"executed": self.executed,
+              "shared": self.shared,
+              "in_flight": sum(1 for flight in self._flights.values() if flight.finished_at is None)}
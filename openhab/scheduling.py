@@ -0,0 +1,315 @@
+# -*- coding: utf-8 -*-
+"""scheduler starting slotted commands and updates to openHAB with a minimum spacing per pacing lane."""
+
+#
+# Alexey Grubauer (c) 2021 <alexey@ingenious-minds.at>
+#
+# python-openhab is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# python-openhab is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with python-openhab.  If not, see <http://www.gnu.org/licenses/>.
+#
+
+# pylint: disable=bad-indentation
+from __future__ import annotations
+import concurrent.futures
+import heapq
+import itertools
+import logging
+import threading
+import time
+import typing
+from enum import Enum, IntEnum
+
+
+# returned by a submitted function which found nothing to send. The send does not use up the slot of its lane.
+SKIPPED = object()
+
+
+class SendPriority(IntEnum):
+  """priority of a slotted send. Queued sends of a higher priority are sent before those of a lower one."""
+  LOW = 0
+  NORMAL = 1
+  HIGH = 2
+  CRITICAL = 3
+
+
+class PacingLanes(Enum):
+  """how slotted sends are grouped into lanes. Every lane has its own spacing and runs its sends one after another.
+  Lanes do not wait for each other, also not for a slow send of another lane."""
+  GLOBAL = "global"  # one lane for all items
+  GROUP = "group"  # one lane per group. An item belongs to the lane of its first group.
+  TAG = "tag"  # one lane per tag. An item belongs to the lane of its first tag.
+
+
+class AdaptiveSpacing(object):
+  """AIMD controller for the spacing of a lane, driven by the round trip time from sending a value to receiving its echo.
+
+  If the round trip time exceeds the target (or an echo got lost) the spacing is multiplied by increase_factor,
+  otherwise it shrinks by decrease_step. The spacing stays within min_spacing and max_spacing.
+  """
+
+  def __init__(self, min_spacing: float, max_spacing: float, target_rtt: float, initial_spacing: typing.Optional[float] = None,
+               increase_factor: float = 2.0, decrease_step: float = 0.01) -> None:
+    """Constructor.
+
+    Args:
+      min_spacing (float): the lower bound in seconds.
+      max_spacing (float): the upper bound in seconds.
+      target_rtt (float): round trip times in seconds above this count as congestion.
+      initial_spacing (float, optional): the spacing to start with. Defaults to min_spacing.
+      increase_factor (float): the factor the spacing grows by on congestion.
+      decrease_step (float): the seconds the spacing shrinks by for every echo within target_rtt.
+    """
+    if min_spacing > max_spacing:
+      raise ValueError("min_spacing must not be greater than max_spacing")
+    self.min_spacing = min_spacing
+    self.max_spacing = max_spacing
+    self.target_rtt = target_rtt
+    self.increase_factor = increase_factor
+    self.decrease_step = decrease_step
+    self.spacing = min(max_spacing, max(min_spacing, min_spacing if initial_spacing is None else initial_spacing))
+    self.last_rtt: typing.Optional[float] = None
+    self.increases = 0
+    self.decreases = 0
+
+  def on_echo(self, rtt: typing.Optional[float]) -> None:
+    """feeds the round trip time of an echo in seconds, or None for a value whose echo never arrived."""
+    self.last_rtt = rtt
+    if rtt is None or rtt > self.target_rtt:
+      self.spacing = min(self.max_spacing, max(self.spacing * self.increase_factor, self.spacing + self.decrease_step))
+      self.increases += 1
+    else:
+      self.spacing = max(self.min_spacing, self.spacing - self.decrease_step)
+      self.decreases += 1
+
+
+class _ScheduledSend(object):
+  __slots__ = ("function", "future", "queued_at", "priority", "sequence")
+
+  def __init__(self, function: typing.Callable[[], typing.Any], priority: SendPriority, sequence: int):
+    self.function = function
+    self.future = concurrent.futures.Future()
+    self.queued_at = time.monotonic()
+    self.priority = priority
+    self.sequence = sequence
+
+  def __lt__(self, other: _ScheduledSend) -> bool:
+    # higher priority first, FIFO within a priority
+    return (-self.priority, self.sequence) < (-other.priority, other.sequence)
+
+
+class _Lane(object):
+  __slots__ = ("queue", "next_slot", "busy")
+
+  def __init__(self):
+    self.queue: typing.List[_ScheduledSend] = []  # heap, queue[0] is the next send
+    self.next_slot = 0.0
+    self.busy = False  # a send of this lane is running. Sends of a lane run one after another, so they reach openHAB in order.
+
+
+class _PriorityStats(object):
+  __slots__ = ("dispatched", "total_delay", "max_delay")
+
+  def __init__(self):
+    self.dispatched = 0
+    self.total_delay = 0.0
+    self.max_delay = 0.0
+
+
+class SlottedScheduler(object):
+  """Priority queues of sends, started in their slots by a dedicated scheduler thread.
+
+  Sends are queued into pacing lanes. Two sends of the same lane are started at least spacing(lane) seconds apart,
+  and one after another: a send starts only after the previous send of its lane returned.
+  Every send runs on a thread of its own, so a slow send only delays the sends of its lane.
+  Within a lane, and between lanes whose slot is open, sends of a higher SendPriority go first,
+  sends of the same priority in the order they were submitted.
+  Callers do not wait for their slot: submit returns a future which is resolved once the send was executed.
+  A function returning SKIPPED did not send anything, the next send of its lane may start right away.
+  """
+
+  def __init__(self, spacing: typing.Callable[[typing.Optional[str]], float], name: str = "openhab-slotted-sender") -> None:
+    """Constructor.
+
+    Args:
+      spacing (Callable): returns the minimum number of seconds between the start of two sends of a lane. It is asked before every send, so it may change at any time.
+      name (str): the name of the scheduler thread and the prefix of the names of the send threads.
+    """
+    self.spacing = spacing
+    self.name = name
+    self.logger = logging.getLogger(__name__)
+    self._lanes: typing.Dict[typing.Optional[str], _Lane] = {}
+    self._depth = 0
+    self._condition = threading.Condition()
+    self._thread: typing.Optional[threading.Thread] = None
+    self.submitted = 0
+    self.dispatched = 0
+    self.max_depth = 0
+    self.total_scheduling_delay = 0.0
+    self.max_scheduling_delay = 0.0
+    self.last_scheduling_delay: typing.Optional[float] = None
+    self.skipped = 0
+    self.withdrawn = 0
+    self._priority_stats: typing.Dict[SendPriority, _PriorityStats] = {priority: _PriorityStats() for priority in SendPriority}
+    self._sequence = itertools.count()
+
+  def __len__(self) -> int:
+    return self._depth
+
+  def submit(self, function: typing.Callable[[], typing.Any], lane: typing.Optional[str] = None, priority: SendPriority = SendPriority.NORMAL) -> concurrent.futures.Future:
+    """queues function for execution in the next free slot of lane.
+
+    Returns:
+      concurrent.futures.Future: resolved with the result or the exception of function.
+    """
+    with self._condition:
+      send = _ScheduledSend(function, SendPriority(priority), next(self._sequence))
+      scheduled_lane = self._lanes.get(lane)
+      if scheduled_lane is None:
+        scheduled_lane = self._lanes[lane] = _Lane()
+      heapq.heappush(scheduled_lane.queue, send)
+      self._depth += 1
+      self.submitted += 1
+      if self._depth > self.max_depth:
+        self.max_depth = self._depth
+      if self._thread is None or not self._thread.is_alive():
+        self._thread = threading.Thread(target=self._run, name=self.name, daemon=True)
+        self._thread.start()
+      self._condition.notify()
+    return send.future
+
+  def withdraw(self, future: concurrent.futures.Future) -> bool:
+    """removes a send which is still queued. Its future is left unresolved.
+
+    Returns:
+      bool: True if the send was removed, False if it is running or done already.
+    """
+    with self._condition:
+      for scheduled_lane in self._lanes.values():
+        for index, send in enumerate(scheduled_lane.queue):
+          if send.future is future:
+            scheduled_lane.queue[index] = scheduled_lane.queue[-1]
+            scheduled_lane.queue.pop()
+            heapq.heapify(scheduled_lane.queue)
+            self._depth -= 1
+            self.withdrawn += 1
+            return True
+    return False
+
+  def _next_send(self) -> typing.Tuple[typing.Optional[str], _ScheduledSend]:
+    """waits until the slot of a idle lane with queued sends opened, removes the first send of those lanes and marks its lane busy."""
+    with self._condition:
+      while True:
+        now = time.monotonic()
+        next_slot = None
+        ready = None  # (lane, _Lane) with the first send of all lanes whose slot is open
+        for lane, scheduled_lane in self._lanes.items():
+          if not scheduled_lane.queue or scheduled_lane.busy:
+            continue
+          if scheduled_lane.next_slot <= now:
+            if ready is None or scheduled_lane.queue[0] < ready[1].queue[0]:
+              ready = (lane, scheduled_lane)
+          elif next_slot is None or scheduled_lane.next_slot < next_slot:
+            next_slot = scheduled_lane.next_slot
+        if ready is not None:
+          self._depth -= 1
+          ready[1].busy = True
+          return ready[0], heapq.heappop(ready[1].queue)
+        self._condition.wait(None if next_slot is None else next_slot - now)
+
+  def _run(self) -> None:
+    while True:
+      lane, send = self._next_send()
+      started_at = time.monotonic()
+      if not send.future.set_running_or_notify_cancel():
+        self._release_lane(lane, None)
+        continue
+      self._record_dispatch(send.priority, started_at - send.queued_at)
+      # the slot is taken when the send starts. The lane stays busy until the send returned.
+      previous_slot = self._take_slot(lane, started_at)
+      threading.Thread(target=self._execute, args=(lane, send, previous_slot), name="{}-{}".format(self.name, lane), daemon=True).start()
+
+  def _execute(self, lane: typing.Optional[str], send: _ScheduledSend, previous_slot: float) -> None:
+    try:
+      result = send.function()
+    except BaseException as e:
+      self.logger.warning("slotted send failed: '{}' ".format(e))
+      self._release_lane(lane, None)
+      send.future.set_exception(e)
+      return
+    if result is SKIPPED:
+      # nothing was sent, so the next send of the lane may start right away
+      self._release_lane(lane, previous_slot)
+      send.future.set_result(None)
+      return
+    self._release_lane(lane, None)
+    send.future.set_result(result)
+
+  def _take_slot(self, lane: typing.Optional[str], started_at: float) -> float:
+    """sets the next slot of the busy lane. Returns the slot it replaced."""
+    try:
+      spacing = self.spacing(lane)
+    except Exception as e:
+      # the scheduler thread must survive, otherwise no queued send would ever complete
+      self.logger.warning("could not determine the spacing of lane '{}': '{}' ".format(lane, e))
+      spacing = 0.0
+    with self._condition:
+      scheduled_lane = self._lanes[lane]
+      previous_slot = scheduled_lane.next_slot
+      scheduled_lane.next_slot = started_at + spacing
+      return previous_slot
+
+  def _release_lane(self, lane: typing.Optional[str], previous_slot: typing.Optional[float]) -> None:
+    """marks the lane idle again after its send returned. A previous_slot gives back the slot taken by a skipped send."""
+    with self._condition:
+      scheduled_lane = self._lanes[lane]
+      scheduled_lane.busy = False
+      if previous_slot is not None:
+        scheduled_lane.next_slot = previous_slot
+        self.skipped += 1
+      self._condition.notify()
+
+  def _record_dispatch(self, priority: SendPriority, scheduling_delay: float) -> None:
+    with self._condition:
+      self.dispatched += 1
+      self.total_scheduling_delay += scheduling_delay
+      self.last_scheduling_delay = scheduling_delay
+      if scheduling_delay > self.max_scheduling_delay:
+        self.max_scheduling_delay = scheduling_delay
+      priority_stats = self._priority_stats[priority]
+      priority_stats.dispatched += 1
+      priority_stats.total_delay += scheduling_delay
+      if scheduling_delay > priority_stats.max_delay:
+        priority_stats.max_delay = scheduling_delay
+
+  def get_stats(self) -> typing.Dict[str, typing.Any]:
+    """returns the counters of this scheduler.
+
+    Returns:
+      dict: depth, depth per lane, max_depth, submitted and dispatched sends, skipped sends (nothing to send), withdrawn sends and the average, maximum and last scheduling delay in seconds
+            (the time a send waited in the queue). "priorities" holds dispatched sends and average and maximum delay per SendPriority name.
+    """
+    with self._condition:
+      return {"depth": self._depth,
+              "lane_depths": {lane: len(scheduled_lane.queue) for lane, scheduled_lane in self._lanes.items()},
+              "max_depth": self.max_depth,
+              "submitted": self.submitted,
+              "dispatched": self.dispatched,
+              "skipped": self.skipped,
+              "withdrawn": self.withdrawn,
+              "avg_scheduling_delay": self.total_scheduling_delay / self.dispatched if self.dispatched else None,
+              "max_scheduling_delay": self.max_scheduling_delay,
+              "last_scheduling_delay": self.last_scheduling_delay,
+              "priorities": {priority.name: {"dispatched": stats.dispatched,
+                                             "avg_scheduling_delay": stats.total_delay / stats.dispatched if stats.dispatched else None,
+                                             "max_scheduling_delay": stats.max_delay}
+                             for priority, stats in self._priority_stats.items()}}
@@ -51,10 +51,19 @@ class CommandType(metaclass=abc.ABCMeta):
   def is_undefined(cls, value: typing.Any) -> bool:
     return value in CommandType.UNDEFINED_STATES
 
+  # maps every supported typename to its CommandType subclass. Filled by __init_subclass__ whenever a new subclass is defined.
+  _TYPE_REGISTRY: typing.Dict[str, typing.Type[CommandType]] = {}
+
+  def __init_subclass__(cls, **kwargs: typing.Any) -> None:
+    super().__init_subclass__(**kwargs)
+    for typename in cls.SUPPORTED_TYPENAMES:
+      # like the former depth first search the first defined class wins
+      CommandType._TYPE_REGISTRY.setdefault(typename, cls)
+
   @classmethod
   def get_type_for(cls, typename: str, parent_cls: typing.Optional[typing.Type[CommandType]] = None) -> typing.Union[typing.Type[CommandType], None]:
-    if parent_cls is None:
-      parent_cls = CommandType
+    if parent_cls is None or parent_cls is CommandType:
+      return CommandType._TYPE_REGISTRY.get(typename)
     for a_type in parent_cls.__subclasses__():
       if typename in a_type.SUPPORTED_TYPENAMES:
         return a_type
@@ -40,12 +40,14 @@ class WidgetFactory:
     self.openHABClient = openhab_client
 
   def get_widget(self, uid:str) -> Widget:
+    self.openHABClient._check_blocking_request("get_widget", "Use await AsyncOpenHAB.req_get() with the widget url.")
     url = "/ui/components/ui%3Awidget/{componentUID}".format(componentUID=uid)
     result_dict = self.openHABClient.req_get(url)
     widget = Widget(self.openHABClient, result_dict)
     return widget
 
   def exists_widget(self, uid:str) -> bool:
+    self.openHABClient._check_blocking_request("exists_widget", "Use await AsyncOpenHAB.req_get() with the widget url.")
     try:
       existing_widget = self.get_widget(uid)
       return True
@@ -64,6 +66,7 @@ class WidgetFactory:
     return result
 
   def delete_widget(self, uid:str) -> None:
+    self.openHABClient._check_blocking_request("delete_widget", "Use await AsyncOpenHAB.req_del() with the widget url.")
     try:
       self.openHABClient.req_del("/ui/components/ui%3Awidget/{componentUID}".format(componentUID=uid))
     except:
@@ -107,9 +110,11 @@ class Widget():
     self.code = code
 
   def delete(self):
+    self.openhab._check_blocking_request("Widget.delete", "Use await AsyncOpenHAB.req_del() with the widget url.")
     self.openhab.req_del("/ui/components/ui%3Awidget/{componentUID}".format(componentUID=self.uid), headers = {'Content-Type': '*/*'})
 
   def save(self):
+    self.openhab._check_blocking_request("Widget.save", "Use await AsyncOpenHAB.req_put() or req_post() with the widget url.")
     code_str = json.dumps(self.code)
     if self._loaded and not self._changed_uid:
       #self.openhab.req_put("/ui/components/ui%3Awidget/{componentUID}".format(componentUID=self.uid), data=str(self.code), headers = {'Content-Type': 'application/json'})
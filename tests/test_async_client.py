@@ -0,0 +1,99 @@
+import asyncio
+import unittest
+
+import openhab
+import openhab.items
+import openhab.ui
+from openhab.async_client import AsyncOpenHAB
+from tests.testutil import item_json
+
+
+class TestAsyncOpenHAB(unittest.TestCase):
+    def setUp(self):
+        self.oh = AsyncOpenHAB("http://localhost:8080/rest", openhab_version=openhab.OpenHAB.Version.OH3)
+        self.requests = []
+
+        async def request(method, uri_path, decode_json=False, **kwargs):
+            self.requests.append((method, uri_path, kwargs.get("data")))
+            if decode_json:
+                return item_json(uri_path.split("/")[-1], state="ON")
+
+        self.oh._request = request
+
+    def test_items_are_fetched_and_changed_with_coroutines(self):
+        async def run():
+            item = await self.oh.get_item("Lamp")
+            await item.async_command("OFF")
+            await item.async_update("ON")
+            return item
+
+        item = asyncio.run(run())
+        self.assertEqual(item.state, "ON")
+        self.assertEqual(self.requests, [("GET", "/items/Lamp", None), ("POST", "/items/Lamp", "OFF"), ("PUT", "/items/Lamp/state", "ON")])
+
+    def test_blocking_client_methods_raise(self):
+        for call in (lambda: self.oh.get_items(["Lamp"]),
+                     lambda: self.oh.send_many({"Lamp": "ON"}),
+                     lambda: self.oh.refresh_items([]),
+                     self.oh.resync_registered_items,
+                     self.oh.get_connection_pool_stats,
+                     self.oh.get_slotted_sending_stats):
+            with self.assertRaises(TypeError):
+                call()
+        self.assertEqual(self.requests, [])
+
+    def test_blocking_item_methods_raise(self):
+        lamp = self.oh.json_to_item(item_json("Lamp", state="ON"))
+        group = self.oh.json_to_item(dict(item_json("Lights", "Group", state="NULL"), members=[]))
+        group.members["Lamp"] = lamp
+        for call in (lambda: lamp.command("OFF"),
+                     lambda: lamp.update("OFF"),
+                     lamp.update_state_null,
+                     lamp.refresh,
+                     lamp.delete,
+                     lambda: group.members_command("OFF"),
+                     lambda: group.members_update("OFF")):
+            with self.assertRaises(TypeError):
+                call()
+        self.assertEqual(lamp.state, "ON")
+        lamp.autoUpdate = False
+        with self.assertRaises(TypeError):
+            lamp.state
+        self.assertEqual(self.requests, [])
+
+    def test_item_factory_raises(self):
+        factory = openhab.items.ItemFactory(self.oh)
+        for call in (lambda: factory.create_or_update_item("Lamp", openhab.items.SwitchItem),
+                     lambda: factory.create_or_update_item_async("Lamp", openhab.items.SwitchItem)):
+            with self.assertRaises(TypeError):
+                call()
+        self.assertEqual(self.requests, [])
+
+    def test_widget_requests_raise(self):
+        factory = openhab.ui.WidgetFactory(self.oh)
+        widget = openhab.ui.Widget(self.oh, {"uid": "lamp_widget", "timestamp": "Jan 01, 2021, 12:00:00 AM"})
+        for call in (lambda: factory.get_widget("lamp_widget"),
+                     lambda: factory.exists_widget("lamp_widget"),
+                     lambda: factory.create_widget("lamp_widget"),
+                     lambda: factory.delete_widget("lamp_widget"),
+                     widget.save,
+                     widget.delete):
+            with self.assertRaises(TypeError):
+                call()
+        self.assertEqual(self.requests, [])
+
+    def test_async_delete(self):
+        lamp = self.oh.json_to_item(item_json("Lamp"))
+        self.oh.all_items["Lamp"] = lamp
+        asyncio.run(lamp.async_delete())
+        self.assertEqual(self.requests, [("DELETE", "/items/Lamp", None)])
+        self.assertNotIn("Lamp", self.oh.all_items)
+        self.assertIsNone(lamp.state)
+
+    def test_no_blocking_connection_pool(self):
+        self.assertIsNone(self.oh.connection_pool)
+        self.assertIsNone(self.oh.slotted_scheduler)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,135 @@
+import itertools
+import threading
+import unittest
+
+import openhab
+
+
+class TestCoalescedSending(unittest.TestCase):
+    def setUp(self):
+        self.oh = openhab.OpenHAB("http://localhost:8080/rest", openhab_version=openhab.OpenHAB.Version.OH3)
+        self.sent = []
+        self.first_request_started = threading.Event()
+        self.release_first_request = threading.Event()
+
+        def req_post(uri_path, data=None, headers=None):
+            self.sent.append(data)
+            if len(self.sent) == 1:
+                self.first_request_started.set()
+                self.release_first_request.wait(5)
+
+        self.oh.req_post = req_post
+        self.dimmer = self.oh.json_to_item({"name": "Slider", "type": "Dimmer", "state": "0", "groupNames": []})
+        self.dimmer.coalesce_sending = True
+
+    def test_latest_value_wins(self):
+        sender = threading.Thread(target=self.dimmer.command, args=(1,))
+        sender.start()
+        self.first_request_started.wait(5)
+        futures = set()
+        for value in range(2, 40):
+            # returns immediately, a sender thread transmits the newest value once the running request completed
+            futures.add(self.dimmer.command(value))
+        self.assertEqual(len(futures), 1)
+        pending = futures.pop()
+        self.release_first_request.set()
+        sender.join(5)
+        self.assertIsNone(pending.result(5))
+        self.assertEqual(self.sent, ["1", "39"])
+        self.assertEqual(self.dimmer.coalesced_sends, 37)
+        self.assertEqual(self.dimmer.state, 39)
+        # dropped values are still recognized as echo
+        self.assertIn(20, self.dimmer.change_sent_history)
+
+    def test_failure_resets_sending(self):
+        def failing_post(uri_path, data=None, headers=None):
+            raise ConnectionError("down")
+
+        self.oh.req_post = failing_post
+        with self.assertRaises(ConnectionError):
+            self.dimmer.command(5)
+        self.oh.req_post = lambda uri_path, data=None, headers=None: self.sent.append(data)
+        self.dimmer.command(6)
+        self.assertEqual(self.sent, ["6"])
+
+    def test_caller_gets_the_outcome_of_its_own_value(self):
+        def req_post(uri_path, data=None, headers=None):
+            self.sent.append(data)
+            if data == "1":
+                self.first_request_started.set()
+                self.release_first_request.wait(5)
+                raise ConnectionError("down")
+
+        self.oh.req_post = req_post
+        failures = []
+
+        def first_command():
+            try:
+                self.dimmer.command(1)
+            except ConnectionError as e:
+                failures.append(e)
+
+        sender = threading.Thread(target=first_command)
+        sender.start()
+        self.first_request_started.wait(5)
+        pending = self.dimmer.command(2)
+        self.release_first_request.set()
+        sender.join(5)
+        # the pending value is still sent and its caller is not affected by the failure of the value before
+        self.assertIsNone(pending.result(5))
+        self.assertEqual(len(failures), 1)
+        self.assertEqual(self.sent, ["1", "2"])
+
+    def test_failure_of_pending_value_is_reported_to_its_callers(self):
+        def req_post(uri_path, data=None, headers=None):
+            self.sent.append(data)
+            if data == "1":
+                self.first_request_started.set()
+                self.release_first_request.wait(5)
+            else:
+                raise ConnectionError("down")
+
+        self.oh.req_post = req_post
+        sender = threading.Thread(target=self.dimmer.command, args=(1,))
+        sender.start()
+        self.first_request_started.wait(5)
+        pending = self.dimmer.command(2)
+        self.release_first_request.set()
+        sender.join(5)
+        self.assertIsInstance(pending.exception(5), ConnectionError)
+        self.assertFalse(sender.is_alive())
+
+    def test_caller_returns_under_steady_updates(self):
+        values = itertools.count(2)
+        stop_updates = threading.Event()
+        updates_lock = threading.Lock()
+
+        def req_post(uri_path, data=None, headers=None):
+            self.sent.append(data)
+            if data == "1":
+                self.first_request_started.set()
+                self.release_first_request.wait(5)
+            else:
+                with updates_lock:
+                    if not stop_updates.is_set():
+                        # a new value arrives while each pending value is being transmitted
+                        self.dimmer.command(next(values))
+
+        self.oh.req_post = req_post
+        sender = threading.Thread(target=self.dimmer.command, args=(1,))
+        sender.start()
+        self.first_request_started.wait(5)
+        self.dimmer.command(next(values))
+        self.release_first_request.set()
+        sender.join(5)
+        self.assertFalse(sender.is_alive())
+        with updates_lock:
+            stop_updates.set()
+        last = self.dimmer.command(0)
+        if last is not None:
+            last.result(5)
+        self.assertEqual(self.sent[-1], "0")
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,59 @@
+import concurrent.futures
+import http.server
+import threading
+import unittest
+
+import openhab
+
+
+class KeepAliveHandler(http.server.BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+
+    def do_GET(self):
+        body = b'{"name": "Lamp", "type": "Switch", "state": "ON"}'
+        self.send_response(200)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, *args):
+        pass
+
+
+class TestConnectionPool(unittest.TestCase):
+    def setUp(self):
+        self.server = http.server.ThreadingHTTPServer(("127.0.0.1", 0), KeepAliveHandler)
+        threading.Thread(target=self.server.serve_forever, daemon=True).start()
+        self.base_url = "http://127.0.0.1:{}/rest".format(self.server.server_address[1])
+
+    def tearDown(self):
+        self.server.shutdown()
+        self.server.server_close()
+
+    def test_connections_are_reused(self):
+        oh = openhab.OpenHAB(self.base_url, response_cache_size=0, coalesce_gets=False, pool_maxsize=4)
+        with concurrent.futures.ThreadPoolExecutor(max_workers=4) as executor:
+            list(executor.map(lambda _: oh.req_get("/items/Lamp"), range(40)))
+        stats = oh.get_connection_pool_stats()
+        self.assertEqual(stats["requests"], 40)
+        self.assertLessEqual(stats["connections_opened"], 4)
+        self.assertGreaterEqual(stats["reuse_ratio"], 0.9)
+        self.assertEqual(stats["active"], 0)
+        self.assertEqual(stats["idle"], stats["connections_opened"])
+
+    def test_warm_up(self):
+        oh = openhab.OpenHAB(self.base_url, pool_maxsize=3)
+        self.assertEqual(oh.get_connection_pool_stats()["reuse_ratio"], None)
+        self.assertEqual(oh.warm_up_connection_pool(10), 3)
+        self.assertGreaterEqual(oh.get_connection_pool_stats()["idle"], 1)
+
+    def test_method_timeouts(self):
+        oh = openhab.OpenHAB(self.base_url, timeout=7, method_timeouts={"get": 2, "POST": (1, 5)})
+        self.assertEqual(oh.timeout_for("GET"), 2)
+        self.assertEqual(oh.timeout_for("POST"), (1, 5))
+        self.assertEqual(oh.timeout_for("DELETE"), 7)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,160 @@
+import asyncio
+import concurrent.futures
+import json
+import threading
+import time
+import unittest
+from unittest import mock
+
+import openhab
+import openhab.events
+from tests.testutil import item_json
+
+
+def state_event(name, value):
+    return {"topic": "openhab/items/{}/state".format(name), "type": "ItemStateEvent", "payload": {"type": "OnOff", "value": value}}
+
+
+def raw_event(topic, event_type, payload):
+    """returns a event as sent by openHAB, with the payload encoded as json string."""
+    return json.dumps({"topic": topic, "payload": json.dumps(payload), "type": event_type})
+
+
+class FakeEventSource:
+    def __init__(self, url, **kwargs):
+        self.events = [mock.Mock(data=data) for data in FakeEventSource.raw_events]
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, *exc_info):
+        return False
+
+    def __aiter__(self):
+        return self
+
+    async def __anext__(self):
+        if not self.events:
+            raise StopAsyncIteration
+        return self.events.pop(0)
+
+
+class TestEventFiltering(unittest.TestCase):
+    def setUp(self):
+        self.oh = openhab.OpenHAB("http://localhost:8080/rest", openhab_version=openhab.OpenHAB.Version.OH3, auto_update=False)
+        self.oh.__keep_event_daemon_running__ = True
+        self.lamp = self.oh.json_to_item(item_json("Lamp"))
+
+    def test_peek_event(self):
+        raw = raw_event("openhab/items/Lamp/state", "ItemStateEvent", {"type": "OnOff", "value": "ON"})
+        self.assertEqual(self.oh._peek_event(raw), ("Lamp", "ItemStateEvent"))
+
+    def test_peek_event_ignores_escaped_payload(self):
+        # the payload comes before the type and contains a escaped "type" of its own
+        raw = raw_event("openhab/items/Text/statechanged", "ItemStateChangedEvent", {"type": "String", "value": '"type":"ItemAddedEvent"', "oldType": "String", "oldValue": ""})
+        self.assertEqual(self.oh._peek_event(raw), ("Text", "ItemStateChangedEvent"))
+
+    def test_peek_event_of_other_topics(self):
+        raw = raw_event("openhab/things/zwave:device:1/status", "ThingStatusInfoEvent", {"status": "ONLINE"})
+        self.assertEqual(self.oh._peek_event(raw), (None, "ThingStatusInfoEvent"))
+
+    def test_peek_malformed_event(self):
+        self.assertEqual(self.oh._peek_event("not a event"), (None, None))
+        self.assertEqual(self.oh._peek_event('{"topic": "openhab/items/Lamp/state", "type": '), ("Lamp", None))
+
+    def test_events_of_unregistered_items_are_not_wanted(self):
+        self.assertTrue(self.oh._is_event_wanted("Lamp", "ItemStateEvent"))
+        self.assertFalse(self.oh._is_event_wanted("Fan", "ItemCommandEvent"))
+        self.assertFalse(self.oh._is_event_wanted(None, "ThingStatusInfoEvent"))
+        self.assertFalse(self.oh._is_event_wanted("Lamp", None))
+
+    def test_listener_wants_all_item_events(self):
+        self.oh.add_event_listener(lambda event: None)
+        self.assertTrue(self.oh._is_event_wanted("Fan", "ItemCommandEvent"))
+        self.assertFalse(self.oh._is_event_wanted(None, "ThingStatusInfoEvent"))
+
+    def test_registry_events_are_wanted_while_maintaining_all_items(self):
+        self.assertFalse(self.oh._is_event_wanted("Fan", "ItemAddedEvent"))
+        self.oh._maintain_all_items = True
+        self.assertTrue(self.oh._is_event_wanted("Fan", "ItemAddedEvent"))
+
+    def test_skipped_events_are_counted(self):
+        FakeEventSource.raw_events = [raw_event("openhab/items/Fan/command", "ItemCommandEvent", {"type": "OnOff", "value": "ON"}),
+                                      raw_event("openhab/items/Lamp/state", "ItemStateEvent", {"type": "OnOff", "value": "ON"}),
+                                      raw_event("openhab/things/zwave:device:1/status", "ThingStatusInfoEvent", {"status": "ONLINE"})]
+        with mock.patch.object(openhab.client.sse_client, "EventSource", FakeEventSource):
+            asyncio.run(self.oh._read_events(None))
+        stats = self.oh.get_event_queue_stats()
+        self.assertEqual(stats["skipped"], 2)
+        self.assertEqual(stats["received"], 1)
+        self.assertEqual(self.oh._peek_event(self.oh.event_shards[0].get(timeout=0)), ("Lamp", "ItemStateEvent"))
+
+
+class TestSharding(unittest.TestCase):
+    def test_items_keep_their_shard(self):
+        oh = openhab.OpenHAB("http://localhost:8080/rest", openhab_version=openhab.OpenHAB.Version.OH3, auto_update=False, event_dispatcher_workers=4)
+        names = ["Item{}".format(i) for i in range(100)]
+        shards = [oh._shard_for(name) for name in names]
+        self.assertEqual(shards, [oh._shard_for(name) for name in names])
+        self.assertEqual(set(shards), {0, 1, 2, 3})
+        self.assertEqual(oh._shard_for(None), 0)
+
+    def test_concurrent_registry_events(self):
+        oh = openhab.OpenHAB("http://localhost:8080/rest", openhab_version=openhab.OpenHAB.Version.OH3, auto_update=False, event_dispatcher_workers=4)
+        oh._maintain_all_items = True
+        oh.all_items = {"Lights": oh.json_to_item(dict(item_json("Lights", "Group", state="NULL"), members=[]))}
+        names = ["Lamp{}".format(i) for i in range(200)]
+        with concurrent.futures.ThreadPoolExecutor(max_workers=8) as executor:
+            list(executor.map(lambda name: oh._apply_item_registry_event("ItemAddedEvent", name, item_json(name, group_names=["Lights"])), names))
+        self.assertEqual(sorted(oh.all_items["Lights"].members), sorted(names))
+        self.assertEqual(len(oh.all_items), len(names) + 1)
+
+
+class TestExecutorDispatch(unittest.TestCase):
+    def setUp(self):
+        self.executor = concurrent.futures.ThreadPoolExecutor(max_workers=2)
+        self.addCleanup(self.executor.shutdown)
+        self.oh = openhab.OpenHAB("http://localhost:8080/rest", openhab_version=openhab.OpenHAB.Version.OH3, auto_update=False,
+                                  event_dispatcher_workers=2, event_dispatcher_executor=self.executor)
+        self.received = []
+        self.lock = threading.Lock()
+        self.items = [self.oh.json_to_item(item_json(name)) for name in ("Lamp", "Fan", "Heater")]
+        for item in self.items:
+            item.add_event_listener(openhab.events.ItemStateEventType, self.record)
+
+    def record(self, item, event):
+        with self.lock:
+            self.received.append((item.name, event.value_raw))
+
+    def wait_until_dispatched(self, count):
+        deadline = time.monotonic() + 5
+        while time.monotonic() < deadline:
+            with self.lock:
+                if len(self.received) >= count and not any(self.oh._shard_scheduled):
+                    return
+            time.sleep(0.01)
+        self.fail("events were not dispatched")
+
+    def test_events_of_an_item_are_dispatched_in_order(self):
+        values = ["ON", "OFF"] * 50
+        for value in values:
+            for item in self.items:
+                self.oh._enqueue_event(state_event(item.name, value), item_name=item.name, event_type="ItemStateEvent")
+        self.wait_until_dispatched(len(values) * len(self.items))
+        for item in self.items:
+            self.assertEqual([value for name, value in self.received if name == item.name], values)
+
+    def test_shut_down_executor_does_not_block_the_shard(self):
+        self.executor.shutdown()
+        with self.assertLogs("openhab", level="WARNING"):
+            self.oh._enqueue_event(state_event("Lamp", "ON"), item_name="Lamp", event_type="ItemStateEvent")
+        self.assertFalse(any(self.oh._shard_scheduled))
+        self.oh.event_dispatcher_executor = concurrent.futures.ThreadPoolExecutor(max_workers=1)
+        self.addCleanup(self.oh.event_dispatcher_executor.shutdown)
+        self.oh._enqueue_event(state_event("Lamp", "OFF"), item_name="Lamp", event_type="ItemStateEvent")
+        self.wait_until_dispatched(2)
+        self.assertEqual(self.received, [("Lamp", "ON"), ("Lamp", "OFF")])
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,71 @@
+import threading
+import unittest
+
+from openhab.event_queue import EventQueue, OverflowPolicy
+
+
+class TestEventQueue(unittest.TestCase):
+    def test_fifo_and_stats(self):
+        q = EventQueue(capacity=10)
+        for i in range(5):
+            q.put(i, item_name="a", event_type="ItemCommandEvent")
+        self.assertEqual([q.get(timeout=0) for _ in range(5)], [0, 1, 2, 3, 4])
+        self.assertIsNone(q.get(timeout=0))
+        stats = q.get_stats()
+        self.assertEqual(stats["depth"], 0)
+        self.assertEqual(stats["high_water_mark"], 5)
+        self.assertEqual(stats["received"], 5)
+
+    def test_drop_oldest(self):
+        q = EventQueue(capacity=2, overflow_policy=OverflowPolicy.DROP_OLDEST)
+        for i in range(4):
+            q.put(i)
+        self.assertEqual([q.get(timeout=0), q.get(timeout=0)], [2, 3])
+        self.assertEqual(q.get_stats()["dropped"], 2)
+
+    def test_block(self):
+        q = EventQueue(capacity=1, overflow_policy=OverflowPolicy.BLOCK)
+        q.put(1)
+        self.assertFalse(q.put(2, timeout=0.05))
+        reader = threading.Timer(0.05, q.get)
+        reader.start()
+        self.assertTrue(q.put(3, timeout=1))
+        self.assertEqual(q.get(timeout=0), 3)
+
+    def test_put_nowait_does_not_wait_for_room(self):
+        q = EventQueue(capacity=1, overflow_policy=OverflowPolicy.BLOCK)
+        self.assertTrue(q.put_nowait(1))
+        self.assertFalse(q.put_nowait(2))
+        self.assertEqual(q.get_stats()["received"], 1)
+        self.assertEqual(q.get_stats()["dropped"], 0)
+        self.assertEqual(q.get(timeout=0), 1)
+        self.assertTrue(q.put_nowait(3))
+
+    def test_compact_keeps_order_of_commands(self):
+        q = EventQueue(capacity=3, overflow_policy=OverflowPolicy.COMPACT)
+        q.put("a1", item_name="a", event_type="ItemStateEvent")
+        q.put("b1", item_name="b", event_type="ItemStateEvent")
+        q.put("acmd", item_name="a", event_type="ItemCommandEvent")
+        # a1 must not be replaced as a command of item a is queued after it. So the oldest event is dropped.
+        q.put("a2", item_name="a", event_type="ItemStateEvent")
+        # b1 is replaced in place
+        q.put("b2", item_name="b", event_type="ItemStateEvent")
+        self.assertEqual([q.get(timeout=0) for _ in range(3)], ["b2", "acmd", "a2"])
+        stats = q.get_stats()
+        self.assertEqual(stats["dropped"], 1)
+        self.assertEqual(stats["compacted"], 1)
+
+    def test_compact_state_events(self):
+        q = EventQueue(capacity=100, compact_state_events=True, merge_compacted=lambda queued, newer: (queued[0], newer[1]))
+        for i in range(50):
+            q.put(("a", i), item_name="a", event_type="ItemStateChangedEvent")
+            q.put(("b", i), item_name="b", event_type="ItemStateChangedEvent")
+        q.put("acmd", item_name="a", event_type="ItemCommandEvent")
+        q.put(("a", 50), item_name="a", event_type="ItemStateChangedEvent")
+        # the merge function keeps the first old value and the newest value
+        self.assertEqual([q.get(timeout=0) for _ in range(4)], [("a", 49), ("b", 49), "acmd", ("a", 50)])
+        self.assertEqual(q.get_stats()["compacted"], 98)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,273 @@
+import asyncio
+import unittest
+
+import openhab
+import openhab.client
+import openhab.events
+from tests.testutil import item_json
+
+
+class TestStateSubscription(unittest.TestCase):
+    def setUp(self):
+        self.oh = openhab.OpenHAB("http://localhost:8080/rest", openhab_version=openhab.OpenHAB.Version.OH3, auto_update=False)
+        self.lamp = self.oh.json_to_item(item_json("Lamp"))
+
+    def test_failed_post_is_retried(self):
+        posts = []
+
+        def post_state_subscription(connection_id, item_names):
+            posts.append(item_names)
+            if len(posts) == 1:
+                raise ConnectionError("openHAB is restarting")
+
+        self.oh._post_state_subscription = post_state_subscription
+
+        async def run():
+            updater = asyncio.ensure_future(self.oh._keep_state_subscription_updated("connection", check_interval_seconds=0.01))
+            for _ in range(100):
+                if len(posts) >= 2:
+                    break
+                await asyncio.sleep(0.01)
+            await asyncio.sleep(0.05)
+            self.assertFalse(updater.done())
+            updater.cancel()
+
+        with self.assertLogs("openhab", level="WARNING"):
+            asyncio.run(run())
+        self.assertEqual(posts, [["Lamp"], ["Lamp"]])
+
+
+class TestServerSideEventFilter(unittest.TestCase):
+    def setUp(self):
+        self.oh = openhab.OpenHAB("http://localhost:8080/rest", openhab_version=openhab.OpenHAB.Version.OH3, auto_update=False,
+                                  server_side_event_filter=True, max_event_topic_filters=3)
+
+    def test_names_are_used_while_they_fit(self):
+        self.assertEqual(openhab.OpenHAB._group_item_name_filters(["Lamp", "Fan", "Lamp"], 3), ["Fan", "Lamp"])
+
+    def test_names_are_grouped_by_the_longest_fitting_prefix(self):
+        names = ["Light_Kitchen", "Light_Bath", "Light_Hall", "Fan_Kitchen", "Fan_Bath", "Door"]
+        self.assertEqual(openhab.OpenHAB._group_item_name_filters(names, 3), ["Door*", "Fan_*", "Ligh*"])
+        self.assertEqual(openhab.OpenHAB._group_item_name_filters(names, 5), ["Door*", "Fan_Ba*", "Fan_Ki*", "Light_*"])
+
+    def test_names_without_fitting_prefixes_give_no_filter(self):
+        self.assertEqual(openhab.OpenHAB._group_item_name_filters(["A1", "B1", "C1", "D1"], 3), [])
+
+    def test_url_subscribes_to_the_registered_items(self):
+        # registered_items holds weak references only
+        items = [self.oh.json_to_item(item_json(name)) for name in ("Lamp", "Fan")]
+        self.assertEqual(self.oh._get_events_url(), "http://localhost:8080/rest/events?topics=openhab/items/Fan/*,openhab/items/Lamp/*")
+        self.assertTrue(self.oh._subscribed_item_filter.match("Lamp"))
+        self.assertFalse(self.oh._subscribed_item_filter.match("Lamp2"))
+
+    def test_url_uses_wildcards_beyond_max_event_topic_filters(self):
+        items = [self.oh.json_to_item(item_json(name)) for name in ("Light_Kitchen", "Light_Bath", "Fan_Kitchen", "Fan_Bath", "Door")]
+        url = self.oh._get_events_url()
+        self.assertEqual(url, "http://localhost:8080/rest/events?topics=openhab/items/Door*/*,openhab/items/Fan_*/*,openhab/items/Ligh*/*")
+        self.assertTrue(self.oh._subscribed_item_filter.match("Light_Hall"))
+        self.assertTrue(self.oh._subscribed_item_filter.match("Door"))
+        self.assertFalse(self.oh._subscribed_item_filter.match("Window"))
+
+    def test_url_subscribes_to_registry_events_when_maintaining_all_items(self):
+        lamp = self.oh.json_to_item(item_json("Lamp"))
+        self.oh._maintain_all_items = True
+        self.assertEqual(self.oh._get_events_url(), "http://localhost:8080/rest/events?topics=openhab/items/Lamp/*,"
+                                                    "openhab/items/*/added,openhab/items/*/removed,openhab/items/*/updated")
+
+    def test_all_events_are_subscribed_with_a_listener(self):
+        lamp = self.oh.json_to_item(item_json("Lamp"))
+        self.oh.add_event_listener(lambda event: None)
+        self.assertEqual(self.oh._get_events_url(), self.oh.events_url)
+        self.assertIsNone(self.oh._subscribed_item_filter)
+
+
+class TestEnqueueOnLoop(unittest.TestCase):
+    def test_full_shard_does_not_block_the_loop(self):
+        oh = openhab.OpenHAB("http://localhost:8080/rest", openhab_version=openhab.OpenHAB.Version.OH3, auto_update=False, event_queue_capacity=1)
+        shard = oh.event_shards[0]
+
+        async def run():
+            await oh._enqueue_event_async("first", item_name="Lamp", event_type="ItemCommandEvent")
+            second = asyncio.ensure_future(oh._enqueue_event_async("second", item_name="Lamp", event_type="ItemCommandEvent"))
+            # the loop keeps running while the reader waits for room
+            await asyncio.sleep(0.05)
+            self.assertFalse(second.done())
+            self.assertEqual(shard.get(timeout=0), "first")
+            await asyncio.wait_for(second, timeout=5)
+
+        asyncio.run(run())
+        self.assertEqual(shard.get(timeout=0), "second")
+
+
+class TestEventStreamReconnects(unittest.TestCase):
+    def setUp(self):
+        self.oh = openhab.OpenHAB("http://localhost:8080/rest", openhab_version=openhab.OpenHAB.Version.OH3, auto_update=False,
+                                  sse_reconnect_min_delay=0.01, sse_reconnect_max_delay=0.02)
+        self.oh.__keep_event_daemon_running__ = True
+
+    def run_connections(self, outcomes):
+        """runs the event stream with one connection per outcome: an exception to raise or the value to return."""
+        outcomes = list(outcomes)
+
+        async def run_event_connection(session):
+            outcome = outcomes.pop(0)
+            if not outcomes:
+                self.oh.__keep_event_daemon_running__ = False
+            if isinstance(outcome, Exception):
+                raise outcome
+            return outcome
+
+        self.oh._run_event_connection = run_event_connection
+        asyncio.run(self.oh.run_event_stream())
+
+    def test_filter_renewal_is_no_reconnect(self):
+        self.run_connections([True, True])
+        self.assertEqual(self.oh.get_event_stream_stats()["reconnects"], 0)
+        # but events sent while renewing are missed, so the next connection resyncs
+        self.assertIsNotNone(self.oh._event_stream_lost_at)
+
+    def test_filter_renewal_resyncs_on_connect(self):
+        resyncs = []
+        self.oh._resync_after_gap = resyncs.append
+
+        async def run_event_connection(session):
+            self.oh._event_stream_connected()
+            if resyncs:
+                self.oh.__keep_event_daemon_running__ = False
+                return False
+            return True
+
+        self.oh._run_event_connection = run_event_connection
+
+        async def run():
+            await self.oh.run_event_stream()
+            # the resync runs on the default executor
+            for _ in range(100):
+                if resyncs:
+                    break
+                await asyncio.sleep(0.01)
+
+        asyncio.run(run())
+        self.assertEqual(len(resyncs), 1)
+        self.assertEqual(self.oh.get_event_stream_stats()["reconnects"], 0)
+
+    def test_lost_connection_is_a_reconnect(self):
+        self.run_connections([openhab.client._EventStreamEndedError("closed"), True])
+        self.assertEqual(self.oh.get_event_stream_stats()["reconnects"], 1)
+        self.assertIsNotNone(self.oh._event_stream_lost_at)
+
+    def test_refused_connection_is_logged_as_such(self):
+        with self.assertLogs("openhab", level="ERROR") as logs:
+            self.run_connections([ConnectionRefusedError("fetch failed: 401"), True])
+        self.assertIn("refused", logs.output[0])
+        self.assertNotIn("closed the Events-Stream", "".join(logs.output))
+
+    def test_failed_connect_does_not_end_the_stream(self):
+        callbacks = openhab.client._event_stream_callbacks()
+        callbacks["on_error"]()
+        callbacks["on_open"]()
+        with self.assertRaises(openhab.client._EventStreamEndedError):
+            callbacks["on_error"]()
+
+    def test_reconnect_delay_grows_up_to_the_maximum(self):
+        self.oh.sse_reconnect_min_delay = 1
+        self.oh.sse_reconnect_max_delay = 8
+        for attempt, upper_bound in ((0, 1), (1, 2), (2, 4), (3, 8), (10, 8)):
+            delay = self.oh._reconnect_delay(attempt)
+            self.assertGreaterEqual(delay, upper_bound / 2)
+            self.assertLessEqual(delay, upper_bound)
+
+
+def state_event(name, value):
+    return {"topic": "openhab/items/{}/state".format(name), "type": "ItemStateEvent", "payload": {"type": "OnOff", "value": value}}
+
+
+class TestResync(unittest.TestCase):
+    def setUp(self):
+        self.oh = openhab.OpenHAB("http://localhost:8080/rest", openhab_version=openhab.OpenHAB.Version.OH3, auto_update=False)
+        self.lamp = self.oh.json_to_item(item_json("Lamp", state="OFF"))
+        self.fan = self.oh.json_to_item(item_json("Fan", state="OFF"))
+        self.listing = [{"name": "Lamp", "type": "Switch", "state": "ON"}, {"name": "Fan", "type": "Switch", "state": "OFF"}]
+        self.during_fetch = lambda: None
+
+        def req_get(uri_path):
+            self.assertEqual(uri_path, "/items?recursive=false&fields=name,state,type")
+            self.during_fetch()
+            return self.listing
+
+        self.oh.req_get = req_get
+
+    def dispatch_all(self):
+        shard = self.oh.event_shards[0]
+        while len(shard):
+            self.oh._dispatch_event_data(shard.get(timeout=0))
+
+    def test_changed_items_are_dispatched(self):
+        changes = []
+        self.lamp.add_event_listener(openhab.events.ItemStateChangedEventType, lambda item, event: changes.append((event.old_value_raw, event.value_raw)))
+        self.assertEqual(self.oh.resync_registered_items(), 1)
+        self.dispatch_all()
+        self.assertEqual(self.lamp.state, "ON")
+        self.assertEqual(changes, [("OFF", "ON")])
+
+    def test_live_event_after_the_fetch_wins(self):
+        # the live event arrives while the states are fetched, so it is queued before the older resync event
+        self.during_fetch = lambda: asyncio.run(self.oh._enqueue_event_async(state_event("Lamp", "OFF"), item_name="Lamp", event_type="ItemStateEvent"))
+        self.assertEqual(self.oh.resync_registered_items(), 1)
+        self.dispatch_all()
+        self.assertEqual(self.lamp.state, "OFF")
+        self.assertEqual(self.oh.get_event_stream_stats()["resync_events_superseded"], 1)
+
+    def test_live_event_before_the_fetch_does_not_suppress_the_resync(self):
+        asyncio.run(self.oh._enqueue_event_async(state_event("Lamp", "OFF"), item_name="Lamp", event_type="ItemStateEvent"))
+        self.dispatch_all()
+        self.oh.resync_registered_items()
+        self.dispatch_all()
+        self.assertEqual(self.lamp.state, "ON")
+        self.assertEqual(self.oh.get_event_stream_stats()["resync_events_superseded"], 0)
+
+
+class IdleEventSource:
+    """a event source delivering the given events after delay seconds each."""
+
+    def __init__(self, events, delay):
+        self.events = list(events)
+        self.delay = delay
+
+    def __aiter__(self):
+        return self
+
+    async def __anext__(self):
+        await asyncio.sleep(self.delay)
+        if not self.events:
+            raise StopAsyncIteration
+        return self.events.pop(0)
+
+
+class TestWatchdog(unittest.TestCase):
+    def setUp(self):
+        self.oh = openhab.OpenHAB("http://localhost:8080/rest", openhab_version=openhab.OpenHAB.Version.OH3, auto_update=False,
+                                  sse_idle_timeout=0.02, sse_liveness_probe=True)
+
+    def watch(self, event_source):
+        async def run():
+            return [event async for event in self.oh._watch_event_stream(event_source)]
+        return asyncio.run(run())
+
+    def test_stall_is_detected_when_changes_were_missed(self):
+        self.oh._count_missed_state_changes = lambda: 2
+        with self.assertRaises(openhab.client._EventStreamStalledError) as context:
+            self.watch(IdleEventSource(["late"], 1))
+        self.assertIn("2 items changed", str(context.exception))
+        self.assertEqual(self.oh.get_event_stream_stats()["stalls_detected"], 1)
+
+    def test_idle_stream_without_missed_changes_is_kept(self):
+        self.oh._count_missed_state_changes = lambda: 0
+        self.assertEqual(self.watch(IdleEventSource(["late"], 0.1)), ["late"])
+        stats = self.oh.get_event_stream_stats()
+        self.assertEqual(stats["stalls_detected"], 0)
+        self.assertGreaterEqual(stats["stall_false_positives"], 1)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,58 @@
+import unittest
+
+import openhab
+from tests.testutil import item_json
+
+
+class TestGetItems(unittest.TestCase):
+    def setUp(self):
+        self.oh = openhab.OpenHAB("http://localhost:8080/rest", openhab_version=openhab.OpenHAB.Version.OH3, bulk_fetch_threshold=3)
+        self.listing = [item_json("Lights", "Group", state="NULL"), item_json("Lamp1", group_names=["Lights"]), item_json("Lamp2", group_names=["Lights"], state="ON"), item_json("Fan")]
+        self.requests = []
+
+        def req_get(uri_path):
+            self.requests.append(uri_path)
+            if uri_path.startswith("/items?"):
+                return self.listing
+            return next(dict(item, members=[]) if item["type"] == "Group" else item for item in self.listing if "/items/" + item["name"] == uri_path)
+
+        self.oh.req_get = req_get
+
+    def test_small_subset_uses_single_requests(self):
+        items = self.oh.get_items(["Fan", "Lamp2"], auto_update=False)
+        self.assertEqual(list(items), ["Fan", "Lamp2"])
+        self.assertEqual(sorted(self.requests), ["/items/Fan", "/items/Lamp2"])
+        self.assertEqual(items["Lamp2"].state, "ON")
+        self.assertIs(self.oh.registered_items["Fan"], items["Fan"])
+
+    def test_large_subset_uses_one_request_and_fills_members(self):
+        items = self.oh.get_items(["Lights", "Lamp1", "Fan"])
+        self.assertEqual(self.requests, ["/items?recursive=false"])
+        self.assertEqual(sorted(items["Lights"].members), ["Lamp1", "Lamp2"])
+        self.assertIs(items["Lights"].members["Lamp1"], items["Lamp1"])
+
+    def test_registered_instances_are_reused(self):
+        fan = self.oh.get_items(["Fan"])["Fan"]
+        self.listing[3] = item_json("Fan", state="ON")
+        self.assertIs(self.oh.get_items(["Fan"])["Fan"], fan)
+        self.assertEqual(fan._state, "ON")
+
+    def test_refresh_below_threshold_uses_single_requests(self):
+        items = self.oh.get_items(["Fan", "Lamp2"], auto_update=False)
+        self.requests.clear()
+        self.listing[3] = item_json("Fan", state="ON")
+        self.oh.refresh_items(items.values())
+        self.assertEqual(sorted(self.requests), ["/items/Fan", "/items/Lamp2"])
+        self.assertEqual(items["Fan"]._state, "ON")
+
+    def test_refresh_at_threshold_uses_one_request(self):
+        items = self.oh.get_items(["Lights", "Lamp1", "Fan"], auto_update=False)
+        self.requests.clear()
+        self.listing[2] = item_json("Lamp2", group_names=["Lights"], state="OFF")
+        self.oh.refresh_items(items.values())
+        self.assertEqual(self.requests, ["/items?recursive=false"])
+        self.assertEqual(items["Lights"].members["Lamp2"]._state, "OFF")
+
+
+if __name__ == '__main__':
+    unittest.main()
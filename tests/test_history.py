@@ -67,6 +67,25 @@ class TestHistory(unittest.TestCase):
         entries = self.item_history.get_entries()
         self.assertEqual(len(entries), 0)
 
+    def test_get_returns_latest(self):
+        self.item_history.add("ON")
+        self.item_history.add("OFF")
+        first_on_time, _ = self.item_history.get("ON")
+        self.item_history.add("ON")
+        latest_on_time, value = self.item_history.get("ON")
+        self.assertEqual(value, "ON")
+        self.assertGreaterEqual(latest_on_time, first_on_time)
+        self.assertEqual(self.item_history.get_entries(), ["ON", "OFF", "ON"])
+        self.assertEqual(self.item_history.get("DIM"), (None, None))
+
+    def test_remove_by_time_and_unhashable(self):
+        self.item_history.add([1, 2])
+        self.assertIn([1, 2], self.item_history)
+        when, _ = self.item_history.get([1, 2])
+        self.item_history.remove(when=when)
+        self.assertNotIn([1, 2], self.item_history)
+        self.assertEqual(len(self.item_history), 0)
+
     def tearDown(self) -> None:
         self.item_history = None
 
@@ -0,0 +1,47 @@
+import unittest
+
+import openhab
+
+
+class TestItemReadTTL(unittest.TestCase):
+    def setUp(self):
+        self.oh = openhab.OpenHAB("http://localhost:8080/rest", openhab_version=openhab.OpenHAB.Version.OH3, item_read_ttl=60)
+        self.server_state = {"name": "Lamp", "type": "Switch", "state": "ON", "groupNames": []}
+        self.fetches = 0
+
+        def get_item_raw(name):
+            self.fetches += 1
+            return dict(self.server_state)
+
+        self.oh.get_item_raw = get_item_raw
+        self.item = self.oh.json_to_item(dict(self.server_state))
+        self.item.autoUpdate = False
+
+    def test_reads_within_ttl_are_served_locally(self):
+        self.server_state["state"] = "OFF"
+        for _ in range(10):
+            self.assertEqual(self.item.state, "ON")
+        self.assertEqual(self.fetches, 0)
+        self.assertEqual(self.item.refresh(), "OFF")
+        self.assertEqual(self.fetches, 1)
+
+    def test_item_ttl_overrides_client_ttl(self):
+        self.item.read_ttl = 0
+        self.server_state["state"] = "OFF"
+        self.assertEqual(self.item.state, "OFF")
+        self.assertEqual(self.item.state, "OFF")
+        self.assertEqual(self.fetches, 2)
+
+    def test_group_refresh_keeps_member_instances(self):
+        member_json = dict(self.server_state)
+        group = self.oh.json_to_item({"name": "Lights", "type": "Group", "state": "NULL", "groupNames": [], "members": [member_json]})
+        member = group.members["Lamp"]
+        group.init_from_json({"name": "Lights", "type": "Group", "state": "NULL", "groupNames": [], "members": [dict(member_json, state="OFF")]})
+        self.assertIs(group.members["Lamp"], member)
+        self.assertEqual(member._state, "OFF")
+        group.init_from_json({"name": "Lights", "type": "Group", "state": "NULL", "groupNames": [], "members": []})
+        self.assertEqual(group.members, {})
+
+
+if __name__ == '__main__':
+    unittest.main()
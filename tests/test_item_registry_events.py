@@ -0,0 +1,71 @@
+import json
+import unittest
+
+import openhab
+import openhab.events
+import openhab.items
+from tests.testutil import item_json
+
+
+def registry_event(event_type, name, payload):
+    action = {"ItemAddedEvent": "added", "ItemRemovedEvent": "removed", "ItemUpdatedEvent": "updated"}[event_type]
+    return {"topic": "openhab/items/{}/{}".format(name, action), "type": event_type, "payload": json.dumps(payload)}
+
+
+class TestItemRegistryEvents(unittest.TestCase):
+    def setUp(self):
+        self.oh = openhab.OpenHAB("http://localhost:8080/rest", openhab_version=openhab.OpenHAB.Version.OH3, auto_update=False)
+        group = self.oh.json_to_item(dict(item_json("Lights", "Group", state="NULL"), members=[]))
+        lamp = self.oh.json_to_item(item_json("Lamp", group_names=["Lights"], state="ON"))
+        group.members[lamp.name] = lamp
+        self.oh.all_items = {"Lights": group, "Lamp": lamp}
+        self.oh._maintain_all_items = True
+
+    def test_added_item_joins_group(self):
+        self.oh._parse_event(registry_event("ItemAddedEvent", "Fan", item_json("Fan", group_names=["Lights"], state=None)))
+        fan = self.oh.all_items["Fan"]
+        self.assertIsInstance(fan, openhab.items.SwitchItem)
+        self.assertIsNone(fan.state)
+        self.assertIs(self.oh.all_items["Lights"].members["Fan"], fan)
+        self.assertIn("Fan", self.oh.registered_items)
+
+    def test_updated_item_keeps_instance_and_state(self):
+        lamp = self.oh.all_items["Lamp"]
+        self.oh._parse_event(registry_event("ItemUpdatedEvent", "Lamp", [item_json("Lamp", group_names=[], state=None), item_json("Lamp", group_names=["Lights"], state=None)]))
+        self.assertIs(self.oh.all_items["Lamp"], lamp)
+        self.assertEqual(lamp.state, "ON")
+        self.assertNotIn("Lamp", self.oh.all_items["Lights"].members)
+
+    def test_changed_type_replaces_instance(self):
+        self.oh._parse_event(registry_event("ItemUpdatedEvent", "Lamp", [item_json("Lamp", "Number", ["Lights"], state=None), item_json("Lamp", group_names=["Lights"], state=None)]))
+        lamp = self.oh.all_items["Lamp"]
+        self.assertIsInstance(lamp, openhab.items.NumberItem)
+        self.assertIs(self.oh.registered_items["Lamp"], lamp)
+        self.assertIs(self.oh.all_items["Lights"].members["Lamp"], lamp)
+
+    def test_changed_type_keeps_listeners_and_settings(self):
+        old_lamp = self.oh.all_items["Lamp"]
+        changes = []
+        old_lamp.add_event_listener(openhab.events.ItemStateChangedEventType, lambda item, event: changes.append((item, event.value)))
+        old_lamp.coalesce_sending = True
+        self.oh._parse_event(registry_event("ItemUpdatedEvent", "Lamp", [item_json("Lamp", "Number", ["Lights"], state=None), item_json("Lamp", group_names=["Lights"], state=None)]))
+        lamp = self.oh.all_items["Lamp"]
+        self.assertIsNot(lamp, old_lamp)
+        self.assertTrue(lamp.coalesce_sending)
+        self.oh._parse_event({"topic": "openhab/items/Lamp/statechanged", "type": "ItemStateChangedEvent",
+                              "payload": json.dumps({"type": "Decimal", "value": "5", "oldType": "UnDef", "oldValue": "NULL"})})
+        self.assertEqual(changes, [(lamp, 5)])
+
+    def test_removed_item_leaves_group(self):
+        self.oh._parse_event(registry_event("ItemRemovedEvent", "Lamp", item_json("Lamp", group_names=["Lights"], state=None)))
+        self.assertNotIn("Lamp", self.oh.all_items)
+        self.assertNotIn("Lamp", self.oh.all_items["Lights"].members)
+
+    def test_added_group_collects_members(self):
+        self.oh._parse_event(registry_event("ItemUpdatedEvent", "Lamp", [item_json("Lamp", group_names=["Lights", "Kitchen"], state=None), item_json("Lamp", group_names=["Lights"], state=None)]))
+        self.oh._parse_event(registry_event("ItemAddedEvent", "Kitchen", item_json("Kitchen", "Group", state=None)))
+        self.assertIs(self.oh.all_items["Kitchen"].members["Lamp"], self.oh.all_items["Lamp"])
+
+
+if __name__ == '__main__':
+    unittest.main()
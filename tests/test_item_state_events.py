@@ -0,0 +1,47 @@
+import json
+import unittest
+
+import openhab
+
+
+def state_changed_event(name, type_, value, old_type, old_value):
+    payload = {"type": type_, "value": value, "oldType": old_type, "oldValue": old_value}
+    return {"topic": "openhab/items/{}/statechanged".format(name), "type": "ItemStateChangedEvent", "payload": json.dumps(payload)}
+
+
+def state_event(name, type_, value):
+    return {"topic": "openhab/items/{}/state".format(name), "type": "ItemStateEvent", "payload": json.dumps({"type": type_, "value": value})}
+
+
+class TestItemStateEvents(unittest.TestCase):
+    def setUp(self):
+        self.oh = openhab.OpenHAB("http://localhost:8080/rest", openhab_version=openhab.OpenHAB.Version.OH3)
+        self.color = self.oh.json_to_item({"name": "Col", "type": "Color", "state": "10,20,30", "groupNames": []})
+        self.number = self.oh.json_to_item({"name": "Temp", "type": "Number:Temperature", "state": "20 °C", "groupNames": []})
+        self.switch = self.oh.json_to_item({"name": "Lamp", "type": "Switch", "state": "OFF", "groupNames": []})
+
+    def test_state_events_update_the_cached_state(self):
+        self.oh._parse_event(state_event("Lamp", "OnOff", "ON"))
+        self.assertEqual(self.switch.state, "ON")
+        self.oh._parse_event(state_changed_event("Lamp", "OnOff", "OFF", "OnOff", "ON"))
+        self.assertEqual(self.switch.state, "OFF")
+
+    def test_hsb_state_stays_a_tuple(self):
+        self.oh._parse_event(state_changed_event("Col", "HSB", "40,50,60", "HSB", "10,20,30"))
+        self.assertEqual(self.color.state, (40, 50, 60.0))
+        self.oh._parse_event(state_event("Col", "HSB", "41,50,60"))
+        self.assertEqual(self.color.state, (41, 50, 60.0))
+
+    def test_quantity_state_is_split_into_value_and_unit(self):
+        self.oh._parse_event(state_event("Temp", "Quantity", "21.5 °C"))
+        self.assertEqual(self.number.state, 21.5)
+        self.assertEqual(self.number._unitOfMeasure, "°C")
+
+    def test_resync_after_hsb_event_finds_no_change(self):
+        self.oh._parse_event(state_changed_event("Col", "HSB", "40,50,60", "HSB", "10,20,30"))
+        self.oh.req_get = lambda uri_path: [{"name": "Col", "state": "40,50,60", "type": "Color"}]
+        self.assertEqual(list(self.oh._changed_registered_item_states()), [])
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,153 @@
+import os
+import tempfile
+import threading
+import time
+import unittest
+
+import requests
+
+import openhab
+from openhab.offline_queue import OfflineCommandQueue
+
+
+class TestOfflineCommandQueue(unittest.TestCase):
+    def setUp(self):
+        self.directory = tempfile.TemporaryDirectory()
+        self.path = os.path.join(self.directory.name, "queue.jsonl")
+
+    def tearDown(self):
+        self.directory.cleanup()
+
+    def replay(self, queue):
+        sent = []
+        queue.replay(lambda request: sent.append((request.uri_path, request.data)) or True)
+        return sent
+
+    def test_replay_in_order(self):
+        queue = OfflineCommandQueue()
+        for value in ("1", "2", "3"):
+            queue.put("POST", "/items/Dimmer", value)
+        self.assertEqual(self.replay(queue), [("/items/Dimmer", "1"), ("/items/Dimmer", "2"), ("/items/Dimmer", "3")])
+        self.assertEqual(len(queue), 0)
+
+    def test_latest_wins(self):
+        queue = OfflineCommandQueue(compact=True)
+        queue.put("POST", "/items/Dimmer", "1")
+        queue.put("POST", "/items/Lamp", "ON")
+        queue.put("POST", "/items/Dimmer", "2")
+        self.assertEqual(self.replay(queue), [("/items/Lamp", "ON"), ("/items/Dimmer", "2")])
+        self.assertEqual(queue.get_stats()["compacted"], 1)
+
+    def test_expired_requests_are_dropped(self):
+        queue = OfflineCommandQueue(max_age=0.05)
+        queue.put("POST", "/items/Dimmer", "1")
+        time.sleep(0.1)
+        queue.put("POST", "/items/Lamp", "ON")
+        self.assertEqual(self.replay(queue), [("/items/Lamp", "ON")])
+        self.assertEqual(queue.get_stats()["expired"], 1)
+
+    def test_failed_send_keeps_remaining_requests(self):
+        queue = OfflineCommandQueue(path=self.path)
+        queue.put("POST", "/items/Dimmer", "1")
+        queue.put("POST", "/items/Lamp", "ON")
+
+        def send(request):
+            if request.uri_path == "/items/Lamp":
+                raise requests.exceptions.ConnectionError("down")
+            return True
+
+        with self.assertRaises(requests.exceptions.ConnectionError):
+            queue.replay(send)
+        self.assertEqual(len(queue), 1)
+        self.assertEqual(self.replay(OfflineCommandQueue(path=self.path)), [("/items/Lamp", "ON")])
+
+    def test_persisted_queue_survives_restart(self):
+        queue = OfflineCommandQueue(path=self.path)
+        queue.put("POST", "/items/Dimmer", "1")
+        queue.put("PUT", "/items/Raw/state", b"\x00\x01")
+        with open(self.path, "a") as queue_file:
+            queue_file.write('{"method": "POST", "uri_pa')  # cut off by a crash
+        reloaded = OfflineCommandQueue(path=self.path)
+        self.assertEqual(self.replay(reloaded), [("/items/Dimmer", "1"), ("/items/Raw/state", b"\x00\x01")])
+        self.assertEqual(os.path.getsize(self.path), 0)
+
+
+class FakeResponse:
+    def __init__(self, status_code):
+        self.status_code = status_code
+        self.url = ""
+        self.content = b""
+
+    def raise_for_status(self):
+        if self.status_code >= 400:
+            raise requests.exceptions.HTTPError(str(self.status_code))
+
+
+class TestOfflineQueueInClient(unittest.TestCase):
+    def setUp(self):
+        self.oh = openhab.OpenHAB("http://localhost:8080/rest", openhab_version=openhab.OpenHAB.Version.OH3,
+                                  offline_queue=True, offline_queue_retry_interval=0.05,
+                                  max_retries=0, circuit_breaker_threshold=0)
+        self.online = False
+        self.sent = []
+        self.lock = threading.Lock()
+
+        def request(method, url, data=None, headers=None, timeout=None):
+            if not self.online:
+                raise requests.exceptions.ConnectionError("connection refused")
+            with self.lock:
+                self.sent.append((method, url.replace("http://localhost:8080/rest", ""), data))
+            return FakeResponse(404 if "Missing" in url else 200)
+
+        self.oh.session.request = request
+        self.dimmer = self.oh.json_to_item({"name": "Dimmer", "type": "Dimmer", "state": "0", "groupNames": []})
+
+    def wait_for_empty_queue(self):
+        deadline = time.monotonic() + 5
+        while len(self.oh.offline_queue) and time.monotonic() < deadline:
+            time.sleep(0.01)
+
+    def test_commands_are_queued_and_replayed(self):
+        self.dimmer.command(10)
+        self.dimmer.command("INCREASE")
+        self.dimmer.update(20)
+        self.assertEqual(self.oh.get_offline_queue_stats()["depth"], 3)
+        self.online = True
+        self.wait_for_empty_queue()
+        self.assertEqual(self.sent, [("POST", "/items/Dimmer", "10"), ("POST", "/items/Dimmer", "INCREASE"), ("PUT", "/items/Dimmer/state", "20")])
+
+    def test_compaction_keeps_latest_command_and_update(self):
+        self.oh.offline_queue.compact = True
+        self.dimmer.command(10)
+        self.dimmer.update(20)
+        self.dimmer.command(30)
+        self.assertEqual(self.oh.get_offline_queue_stats()["depth"], 2)
+        self.online = True
+        self.wait_for_empty_queue()
+        self.assertEqual(self.sent, [("PUT", "/items/Dimmer/state", "20"), ("POST", "/items/Dimmer", "30")])
+
+    def test_new_commands_do_not_overtake_queued_ones(self):
+        self.oh.req_post("/items/Dimmer", data="1")
+        self.online = True
+        self.oh.req_post("/items/Lamp", data="ON")
+        self.assertEqual(self.sent, [])
+        self.wait_for_empty_queue()
+        self.assertEqual([data for _, _, data in self.sent], ["1", "ON"])
+
+    def test_rejected_commands_are_dropped(self):
+        self.oh.req_post("/items/Missing", data="ON")
+        self.oh.req_post("/items/Dimmer", data="1")
+        self.online = True
+        self.wait_for_empty_queue()
+        self.assertEqual(self.sent, [("POST", "/items/Missing", "ON"), ("POST", "/items/Dimmer", "1")])
+        self.assertEqual(self.oh.get_offline_queue_stats()["rejected"], 1)
+        self.assertEqual(self.oh.get_offline_queue_stats()["replayed"], 1)
+
+    def test_other_requests_are_not_queued(self):
+        with self.assertRaises(requests.exceptions.ConnectionError):
+            self.oh.req_post("/ui/components/ui%3Awidget", data="{}")
+        self.assertEqual(len(self.oh.offline_queue), 0)
+
+
+if __name__ == "__main__":
+    unittest.main()
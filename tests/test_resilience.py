@@ -0,0 +1,119 @@
+import time
+import unittest
+
+import requests
+
+import openhab
+from openhab.resilience import CircuitBreaker, CircuitOpenError, CircuitState, RetryPolicy
+
+
+class FakeResponse:
+    def __init__(self, status_code, headers=None):
+        self.status_code = status_code
+        self.headers = headers or {}
+        self.url = ""
+        self.content = b""
+
+    text = '{"state": "ON"}'
+
+    def json(self):
+        return {"state": "ON"}
+
+    def raise_for_status(self):
+        if self.status_code >= 400:
+            raise requests.exceptions.HTTPError(str(self.status_code))
+
+
+class TestCircuitBreaker(unittest.TestCase):
+    def test_opens_after_threshold_and_probes(self):
+        breaker = CircuitBreaker(failure_threshold=2, reset_timeout=0.05)
+        for _ in range(2):
+            breaker.before_call()
+            breaker.record_failure()
+        self.assertEqual(breaker.state, CircuitState.OPEN)
+        with self.assertRaises(CircuitOpenError):
+            breaker.before_call()
+        time.sleep(0.06)
+        breaker.before_call()  # the probe
+        self.assertEqual(breaker.state, CircuitState.HALF_OPEN)
+        with self.assertRaises(CircuitOpenError):
+            breaker.before_call()  # only one probe at a time
+        breaker.record_success()
+        self.assertEqual(breaker.state, CircuitState.CLOSED)
+        self.assertEqual(breaker.get_stats(), {"state": "closed", "consecutive_failures": 0, "times_opened": 1, "rejected_calls": 2, "probes": 1})
+
+    def test_failed_probe_opens_again(self):
+        breaker = CircuitBreaker(failure_threshold=1, reset_timeout=0.05)
+        breaker.record_failure()
+        time.sleep(0.06)
+        breaker.before_call()
+        breaker.record_failure()
+        self.assertEqual(breaker.state, CircuitState.OPEN)
+        with self.assertRaises(CircuitOpenError):
+            breaker.before_call()
+
+    def test_disabled(self):
+        breaker = CircuitBreaker(failure_threshold=0)
+        for _ in range(10):
+            breaker.record_failure()
+            breaker.before_call()
+        self.assertEqual(breaker.state, CircuitState.CLOSED)
+
+    def test_retry_delay(self):
+        policy = RetryPolicy(backoff=0.1, max_backoff=1)
+        self.assertTrue(0.05 <= policy.delay(0) <= 0.1)
+        self.assertTrue(0.5 <= policy.delay(10) <= 1)
+        self.assertEqual(policy.delay(0, retry_after="30"), 1)
+
+
+class TestClientResilience(unittest.TestCase):
+    def setUp(self):
+        self.oh = openhab.OpenHAB("http://localhost:8080/rest", openhab_version=openhab.OpenHAB.Version.OH3, response_cache_size=0,
+                                  retry_backoff=0.001, circuit_breaker_threshold=3, circuit_breaker_reset_timeout=0.05)
+        self.answers = []
+        self.requests = []
+
+        def request(method, url, **kwargs):
+            self.requests.append(method)
+            answer = self.answers.pop(0) if self.answers else 200
+            if isinstance(answer, Exception):
+                raise answer
+            return FakeResponse(answer)
+
+        self.oh.session.request = request
+
+    def test_idempotent_request_is_retried(self):
+        self.answers = [503, requests.exceptions.ConnectionError("refused"), 200]
+        self.assertEqual(self.oh.req_get("/items/Lamp"), {"state": "ON"})
+        self.assertEqual(self.requests, ["GET"] * 3)
+        self.assertEqual(self.oh.get_resilience_stats()["retries"], 2)
+        self.assertEqual(self.oh.get_resilience_stats()["circuit_breaker"]["state"], "closed")
+
+    def test_command_is_not_retried(self):
+        self.answers = [503]
+        with self.assertRaises(requests.exceptions.HTTPError):
+            self.oh.req_post("/items/Lamp", data="ON")
+        self.assertEqual(self.requests, ["POST"])
+
+    def test_client_errors_are_not_retried(self):
+        self.answers = [404]
+        with self.assertRaises(requests.exceptions.HTTPError):
+            self.oh.req_put("/items/Missing/state", data="ON")
+        self.assertEqual(len(self.requests), 1)
+
+    def test_circuit_breaker_fails_fast(self):
+        self.answers = [requests.exceptions.ConnectionError("refused")] * 3
+        with self.assertRaises(requests.exceptions.ConnectionError):
+            self.oh.req_get("/items/Lamp")
+        with self.assertRaises(CircuitOpenError):
+            self.oh.req_get("/items/Lamp")
+        self.assertEqual(len(self.requests), 3)
+        time.sleep(0.06)
+        self.assertEqual(self.oh.req_get("/items/Lamp"), {"state": "ON"})
+        stats = self.oh.get_resilience_stats()
+        self.assertEqual(stats["failed_after_retries"], 1)
+        self.assertEqual(stats["circuit_breaker"]["times_opened"], 1)
+
+
+if __name__ == "__main__":
+    unittest.main()
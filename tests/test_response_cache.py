@@ -0,0 +1,137 @@
+import json
+import threading
+import time
+import unittest
+
+import openhab
+from openhab.response_cache import ResponseCache, SingleFlight
+
+
+class TestResponseCache(unittest.TestCase):
+    def test_store_needs_validator_or_ttl(self):
+        cache = ResponseCache()
+        cache.store("/items", [1])
+        self.assertIsNone(cache.lookup("/items"))
+        cache.store("/items", [1], etag='"abc"')
+        entry = cache.lookup("/items")
+        self.assertEqual(entry.conditional_headers(), {"If-None-Match": '"abc"'})
+        self.assertFalse(entry.is_fresh())
+        self.assertIs(cache.revalidated("/items", entry), entry.data)
+        self.assertEqual(cache.get_stats(), {"size": 1, "hits": 0, "revalidations": 1, "misses": 2, "evictions": 0})
+
+    def test_endpoint_ttl_longest_prefix(self):
+        cache = ResponseCache(default_ttl=0, endpoint_ttls={"/audio/": 300, "/audio/defaultsink": 1})
+        self.assertEqual(cache.ttl_for("/audio/sinks"), 300)
+        self.assertEqual(cache.ttl_for("/audio/defaultsink"), 1)
+        self.assertEqual(cache.ttl_for("/items"), 0)
+        cache.store("/audio/sinks", ["sink"])
+        self.assertTrue(cache.lookup("/audio/sinks").is_fresh())
+
+    def test_lru_eviction(self):
+        cache = ResponseCache(max_entries=2, default_ttl=60)
+        cache.store("/a", 1)
+        cache.store("/b", 2)
+        cache.lookup("/a")
+        cache.store("/c", 3)
+        self.assertIsNone(cache.lookup("/b"))
+        self.assertIsNotNone(cache.lookup("/a"))
+        self.assertEqual(cache.evictions, 1)
+
+    def test_invalidate_endpoint(self):
+        cache = ResponseCache(default_ttl=60)
+        cache.store("/items/Lamp", 1)
+        cache.store("/items?recursive=false", 2)
+        cache.store("/itemsx", 3)
+        cache.store("/audio/sinks", 4)
+        cache.invalidate("/items/Lamp/state")
+        self.assertIsNone(cache.lookup("/items/Lamp"))
+        self.assertIsNone(cache.lookup("/items?recursive=false"))
+        self.assertIsNotNone(cache.lookup("/itemsx"))
+        self.assertIsNotNone(cache.lookup("/audio/sinks"))
+
+
+class TestSingleFlight(unittest.TestCase):
+    def test_concurrent_calls_share_one_execution(self):
+        single_flight = SingleFlight()
+        release = threading.Event()
+        calls = []
+
+        def fetch():
+            calls.append(1)
+            release.wait(5)
+            return {"state": "ON"}
+
+        results = []
+        threads = [threading.Thread(target=lambda: results.append(single_flight.do("/items/Lamp", fetch))) for _ in range(5)]
+        for thread in threads:
+            thread.start()
+        while single_flight.get_stats()["executed"] + single_flight.get_stats()["shared"] < 5:
+            time.sleep(0.01)
+        release.set()
+        for thread in threads:
+            thread.join()
+        self.assertEqual(len(calls), 1)
+        self.assertEqual(len(results), 5)
+        self.assertTrue(all(result is results[0] for result in results))
+        self.assertEqual(single_flight.get_stats(), {"executed": 1, "shared": 4, "in_flight": 0})
+        single_flight.do("/items/Lamp", fetch)
+        self.assertEqual(len(calls), 2)
+
+    def test_window_and_errors(self):
+        single_flight = SingleFlight(window=60)
+        self.assertEqual(single_flight.do("a", lambda: 1), 1)
+        self.assertEqual(single_flight.do("a", lambda: 2), 1)
+        single_flight.forget()
+        self.assertEqual(single_flight.do("a", lambda: 3), 3)
+        with self.assertRaises(ValueError):
+            single_flight.do("b", lambda: int("x"))
+        self.assertEqual(single_flight.do("b", lambda: 4), 4)
+
+
+class FakeResponse:
+    def __init__(self, status_code, body=""):
+        self.status_code = status_code
+        self.headers = {"ETag": '"1"'}
+        self.url = ""
+        self.text = body
+        self.content = body.encode()
+
+    def raise_for_status(self):
+        pass
+
+
+class TestCachedRequests(unittest.TestCase):
+    def client(self, **kwargs):
+        oh = openhab.OpenHAB("http://localhost:8080/rest", openhab_version=openhab.OpenHAB.Version.OH3, **kwargs)
+        widget = {"uid": "clock", "props": {"parameters": []}}
+
+        def request(method, url, data=None, headers=None, timeout=None):
+            if headers and headers.get("If-None-Match") == '"1"':
+                return FakeResponse(304)
+            return FakeResponse(200, json.dumps(widget))
+
+        oh.session.request = request
+        return oh
+
+    def assert_copies(self, oh):
+        widget = oh.req_get("/ui/components/ui%3Awidget/clock")
+        widget["uid"] = "renamed"
+        widget["props"]["parameters"].append("changed")
+        self.assertEqual(oh.req_get("/ui/components/ui%3Awidget/clock"), {"uid": "clock", "props": {"parameters": []}})
+
+    def test_revalidated_data_is_not_shared(self):
+        oh = self.client()
+        self.assert_copies(oh)
+        self.assertEqual(oh.get_response_cache_stats()["revalidations"], 1)
+
+    def test_fresh_data_is_not_shared(self):
+        oh = self.client(response_cache_ttl=60)
+        self.assert_copies(oh)
+        self.assertEqual(oh.get_response_cache_stats()["hits"], 1)
+
+    def test_coalesced_data_is_not_shared(self):
+        self.assert_copies(self.client(response_cache_size=0, get_coalescing_window=60))
+
+
+if __name__ == '__main__':
+    unittest.main()
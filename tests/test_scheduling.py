@@ -0,0 +1,229 @@
+import concurrent.futures
+import threading
+import time
+import unittest
+
+import openhab
+import openhab.events
+from openhab.scheduling import SKIPPED, AdaptiveSpacing, PacingLanes, SendPriority, SlottedScheduler
+
+
+class TestSlottedScheduler(unittest.TestCase):
+    def test_spacing_and_futures(self):
+        scheduler = SlottedScheduler(lambda lane: 0.05)
+        started = []
+        submitted_at = time.monotonic()
+        futures = [scheduler.submit(lambda i=i: started.append((i, time.monotonic())) or i) for i in range(4)]
+        # submitting does not wait for the slots
+        self.assertLess(time.monotonic() - submitted_at, 0.05)
+        self.assertEqual([future.result(5) for future in futures], [0, 1, 2, 3])
+        self.assertEqual([i for i, _ in started], [0, 1, 2, 3])
+        for (_, earlier), (_, later) in zip(started, started[1:]):
+            self.assertGreaterEqual(later - earlier, 0.045)
+        stats = scheduler.get_stats()
+        self.assertEqual(stats["dispatched"], 4)
+        self.assertEqual(stats["depth"], 0)
+        self.assertGreaterEqual(stats["max_scheduling_delay"], 0.1)
+
+    def test_exception_is_set_on_future(self):
+        scheduler = SlottedScheduler(lambda lane: 0)
+        future = scheduler.submit(lambda: int("x"))
+        with self.assertRaises(ValueError):
+            future.result(5)
+        self.assertEqual(scheduler.submit(lambda: 1).result(5), 1)
+
+    def test_lanes_do_not_wait_for_each_other(self):
+        scheduler = SlottedScheduler(lambda lane: 10 if lane == "slow" else 0)
+        scheduler.submit(lambda: None, lane="slow").result(5)
+        blocked = scheduler.submit(lambda: None, lane="slow")
+        self.assertEqual(scheduler.submit(lambda: 1, lane="fast").result(5), 1)
+        self.assertFalse(blocked.done())
+        self.assertEqual(scheduler.get_stats()["lane_depths"], {"slow": 1, "fast": 0})
+
+    def test_slow_send_only_delays_its_lane(self):
+        scheduler = SlottedScheduler(lambda lane: 0)
+        release = threading.Event()
+        hung = scheduler.submit(lambda: release.wait(5), lane="a")
+        queued = scheduler.submit(lambda: 1, lane="a")
+        self.assertEqual(scheduler.submit(lambda: 2, lane="b").result(1), 2)
+        # sends of a lane still run one after another
+        self.assertFalse(queued.done())
+        release.set()
+        self.assertTrue(hung.result(5))
+        self.assertEqual(queued.result(5), 1)
+
+    def test_open_slot_of_other_lane_is_not_delayed_by_a_busy_lane(self):
+        scheduler = SlottedScheduler(lambda lane: 0.05)
+        release = threading.Event()
+        busy = scheduler.submit(lambda: release.wait(5), lane="a")
+        submitted_at = time.monotonic()
+        started_at = scheduler.submit(time.monotonic, lane="b").result(5)
+        self.assertLess(started_at - submitted_at, 0.1)
+        release.set()
+        busy.result(5)
+
+    def test_slot_is_taken_when_the_send_starts(self):
+        scheduler = SlottedScheduler(lambda lane: 0.2)
+        started = []
+
+        def slow_send():
+            started.append(time.monotonic())
+            time.sleep(0.15)
+
+        futures = [scheduler.submit(slow_send) for _ in range(2)]
+        for future in futures:
+            future.result(5)
+        # the second send starts one spacing after the first started, not one spacing after it returned
+        self.assertLess(started[1] - started[0], 0.3)
+        self.assertGreaterEqual(started[1] - started[0], 0.19)
+
+    def test_skipped_send_does_not_take_the_slot(self):
+        scheduler = SlottedScheduler(lambda lane: 10)
+        self.assertIsNone(scheduler.submit(lambda: SKIPPED).result(5))
+        self.assertEqual(scheduler.submit(lambda: 1).result(5), 1)
+        self.assertEqual(scheduler.get_stats()["skipped"], 1)
+
+    def test_withdraw(self):
+        scheduler = SlottedScheduler(lambda lane: 0)
+        release = threading.Event()
+        running = scheduler.submit(lambda: release.wait(5))
+        queued = scheduler.submit(lambda: 1)
+        self.assertTrue(scheduler.withdraw(queued))
+        self.assertFalse(scheduler.withdraw(queued))
+        release.set()
+        running.result(5)
+        self.assertEqual(scheduler.submit(lambda: 2).result(5), 2)
+        self.assertFalse(queued.done())
+        self.assertEqual(scheduler.get_stats()["withdrawn"], 1)
+        self.assertEqual(len(scheduler), 0)
+
+    def test_higher_priority_goes_first(self):
+        scheduler = SlottedScheduler(lambda lane: 0.02)
+        order = []
+        release = threading.Event()
+        scheduler.submit(lambda: release.wait(5))
+        futures = [scheduler.submit(lambda i=i: order.append(i), priority=SendPriority.LOW) for i in range(3)]
+        futures.append(scheduler.submit(lambda: order.append("valve"), priority=SendPriority.CRITICAL))
+        release.set()
+        for future in futures:
+            future.result(5)
+        self.assertEqual(order, ["valve", 0, 1, 2])
+        priorities = scheduler.get_stats()["priorities"]
+        self.assertEqual(priorities["LOW"]["dispatched"], 3)
+        self.assertEqual(priorities["CRITICAL"]["dispatched"], 1)
+        self.assertLess(priorities["CRITICAL"]["max_scheduling_delay"], priorities["LOW"]["max_scheduling_delay"])
+
+    def test_critical_send_is_not_held_up_by_a_low_send_of_another_lane(self):
+        scheduler = SlottedScheduler(lambda lane: 0.05)
+        release = threading.Event()
+        low = scheduler.submit(lambda: release.wait(5), lane="lights", priority=SendPriority.LOW)
+        queued_low = scheduler.submit(lambda: None, lane="lights", priority=SendPriority.LOW)
+        submitted_at = time.monotonic()
+        critical = scheduler.submit(time.monotonic, lane="valves", priority=SendPriority.CRITICAL)
+        self.assertLess(critical.result(1) - submitted_at, 0.1)
+        self.assertFalse(low.done())
+        self.assertFalse(queued_low.done())
+        release.set()
+        queued_low.result(5)
+
+
+class TestAdaptiveSpacing(unittest.TestCase):
+    def test_aimd(self):
+        spacing = AdaptiveSpacing(min_spacing=0.0, max_spacing=1.0, target_rtt=0.2, decrease_step=0.05)
+        spacing.on_echo(0.5)
+        self.assertAlmostEqual(spacing.spacing, 0.05)
+        spacing.on_echo(None)
+        self.assertAlmostEqual(spacing.spacing, 0.1)
+        for _ in range(10):
+            spacing.on_echo(0.5)
+        self.assertEqual(spacing.spacing, 1.0)
+        spacing.on_echo(0.1)
+        self.assertAlmostEqual(spacing.spacing, 0.95)
+        for _ in range(100):
+            spacing.on_echo(0.1)
+        self.assertEqual(spacing.spacing, 0.0)
+
+
+class TestSlottedItems(unittest.TestCase):
+    def setUp(self):
+        self.oh = openhab.OpenHAB("http://localhost:8080/rest", openhab_version=openhab.OpenHAB.Version.OH3, min_time_between_slotted_changes_ms=50)
+        self.sent = []
+        self.oh.req_post = lambda uri_path, data=None, headers=None: self.sent.append(data)
+        self.dimmer = self.oh.json_to_item({"name": "Slider", "type": "Dimmer", "state": "0", "groupNames": []})
+        self.dimmer.use_slotted_sending = True
+
+    def test_command_returns_future(self):
+        futures = [self.dimmer.command(value) for value in (1, 2, 3)]
+        for future in futures:
+            future.result(5)
+        self.assertEqual(self.sent, ["1", "2", "3"])
+
+    def test_coalesced_slotted_sending(self):
+        release = threading.Event()
+        blocker = self.oh.slotted_scheduler.submit(lambda: release.wait(5))
+        self.dimmer.coalesce_sending = True
+        futures = [self.dimmer.command(value) for value in range(1, 20)]
+        self.assertTrue(all(future is futures[0] for future in futures))
+        release.set()
+        futures[0].result(5)
+        blocker.result(5)
+        self.assertEqual(self.sent, ["19"])
+        self.assertEqual(self.dimmer.coalesced_sends, 18)
+        self.dimmer.command(20).result(5)
+        self.assertEqual(self.sent, ["19", "20"])
+
+    def test_coalesced_priority_upgrade_replaces_queued_send(self):
+        release = threading.Event()
+        self.oh.slotted_scheduler.submit(lambda: release.wait(5))
+        self.dimmer.coalesce_sending = True
+        low = self.dimmer.command(1, priority=SendPriority.LOW)
+        high = self.dimmer.command(2, priority=SendPriority.CRITICAL)
+        self.assertIsNot(low, high)
+        release.set()
+        high.result(5)
+        low.result(5)
+        self.assertEqual(self.sent, ["2"])
+        self.assertEqual(self.oh.slotted_scheduler.get_stats()["withdrawn"], 1)
+        self.assertIsNone(self.dimmer._scheduled_send)
+        self.dimmer.command(3).result(5)
+        self.assertEqual(self.sent, ["2", "3"])
+
+    def test_stale_coalesced_send_keeps_newer_send_and_skips(self):
+        newer = concurrent.futures.Future()
+        self.dimmer._scheduled_send = newer
+        self.assertIs(self.dimmer._transmit_pending(concurrent.futures.Future()), SKIPPED)
+        self.assertIs(self.dimmer._scheduled_send, newer)
+        self.assertEqual(self.sent, [])
+
+    def test_priority_per_item_and_call(self):
+        release = threading.Event()
+        blocker = self.oh.slotted_scheduler.submit(lambda: release.wait(5))
+        valve = self.oh.json_to_item({"name": "Valve", "type": "Switch", "state": "ON", "groupNames": []})
+        valve.use_slotted_sending = True
+        valve.send_priority = SendPriority.HIGH
+        futures = [self.dimmer.command(value) for value in (1, 2)]
+        futures.append(valve.command("OFF"))
+        futures.append(self.dimmer.command(3, priority=SendPriority.CRITICAL))
+        release.set()
+        for future in futures:
+            future.result(5)
+        blocker.result(5)
+        self.assertEqual(self.sent, ["3", "OFF", "1", "2"])
+
+    def test_adaptive_spacing_from_echo(self):
+        self.oh.adaptive_slotted_sending = True
+        self.oh.echo_rtt_target_ms = 1
+        self.oh.pacing_lanes = PacingLanes.TAG
+        self.dimmer.tags = ["zwave"]
+        self.dimmer.command(30).result(5)
+        time.sleep(0.01)
+        echo = openhab.events.RawItemEvent(item_name="Slider", event_type="ItemCommandEvent", content={"type": "Percent", "value": "30"})
+        self.dimmer._process_external_event(echo)
+        lane_spacing = self.oh.get_slotted_sending_stats()["lane_spacings"]["tag:zwave"]
+        self.assertEqual(lane_spacing["increases"], 1)
+        self.assertEqual(lane_spacing["spacing_ms"], 100)
+        self.assertGreaterEqual(lane_spacing["last_rtt_ms"], 10)
+
+
+if __name__ == '__main__':
+    unittest.main()
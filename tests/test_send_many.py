@@ -0,0 +1,52 @@
+import threading
+import unittest
+
+import openhab
+from tests.testutil import item_json
+
+
+class TestSendMany(unittest.TestCase):
+    def setUp(self):
+        self.oh = openhab.OpenHAB("http://localhost:8080/rest", openhab_version=openhab.OpenHAB.Version.OH3)
+        self.sent = []
+        self.lock = threading.Lock()
+
+        def req_post(uri_path, data=None, headers=None):
+            if uri_path == "/items/Broken":
+                raise ConnectionError("down")
+            with self.lock:
+                self.sent.append(("command", uri_path, data))
+
+        def req_put(uri_path, data=None, headers=None):
+            with self.lock:
+                self.sent.append(("update", uri_path, data))
+
+        self.oh.req_post = req_post
+        self.oh.req_put = req_put
+        self.group = self.oh.json_to_item(dict(item_json("Lights", "Group", state="NULL"), members=[item_json("Lamp{}".format(i), group_names=["Lights"]) for i in range(20)]))
+
+    def test_members_command(self):
+        results = self.group.members_command("ON")
+        self.assertEqual(results, {"Lamp{}".format(i): None for i in range(20)})
+        self.assertEqual(sorted(uri for _, uri, _ in self.sent), sorted("/items/Lamp{}".format(i) for i in range(20)))
+        self.assertTrue(all(member.state == "ON" for member in self.group.members.values()))
+
+    def test_members_update(self):
+        self.group.members_update("ON")
+        self.assertEqual(len(self.sent), 20)
+        self.assertTrue(all(kind == "update" for kind, _, _ in self.sent))
+
+    def test_send_many_reports_failures(self):
+        broken = self.oh.json_to_item(item_json("Broken"))
+        self.oh.get_items = lambda names: {}
+        results = self.oh.send_many({"Lamp1": "ON", "Broken": "ON", "Unknown": "ON", "Lamp2": "invalid"})
+        self.assertIsNone(results["Lamp1"])
+        self.assertIsInstance(results["Broken"], ConnectionError)
+        self.assertIsInstance(results["Unknown"], KeyError)
+        self.assertIsInstance(results["Lamp2"], ValueError)
+        self.assertEqual(self.sent, [("command", "/items/Lamp1", "ON")])
+        self.assertIsNotNone(broken)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,44 @@
+import unittest
+
+import openhab.types
+import openhab.items
+
+
+class TestTypeRegistry(unittest.TestCase):
+    def setUp(self):
+        registry = openhab.types.CommandType._TYPE_REGISTRY
+        snapshot = dict(registry)
+
+        def restore():
+            registry.clear()
+            registry.update(snapshot)
+
+        self.addCleanup(restore)
+
+    def test_get_type_for(self):
+        self.assertIs(openhab.types.CommandType.get_type_for("Decimal"), openhab.types.DecimalType)
+        self.assertIs(openhab.types.CommandType.get_type_for("Quantity"), openhab.types.DecimalType)
+        self.assertIs(openhab.types.CommandType.get_type_for("Percent"), openhab.types.PercentType)
+        self.assertIs(openhab.types.CommandType.get_type_for("OnOff"), openhab.types.OnOffType)
+        self.assertIsNone(openhab.types.CommandType.get_type_for("DoesNotExist"))
+        self.assertIs(openhab.types.CommandType.get_type_for("Percent", openhab.types.DecimalType), openhab.types.PercentType)
+
+    def test_new_subclass_is_registered(self):
+        class PointType(openhab.types.StringType):
+            TYPENAME = "TestPoint"
+            SUPPORTED_TYPENAMES = [TYPENAME]
+
+        self.assertIs(openhab.types.CommandType.get_type_for("TestPoint"), PointType)
+
+    def test_registry_is_restored(self):
+        self.assertIsNone(openhab.types.CommandType.get_type_for("TestPoint"))
+
+    def test_item_type_sets(self):
+        self.assertEqual(openhab.items.DimmerItem._state_type_set, frozenset([openhab.types.PercentType]))
+        self.assertIn(openhab.types.UndefType, openhab.items.DimmerItem._state_event_type_set)
+        self.assertIn(openhab.types.OnOffType, openhab.items.DimmerItem._value_event_type_set)
+        self.assertNotIn(openhab.types.IncreaseDecreaseType, openhab.items.DimmerItem._value_event_type_set)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -26,3 +26,11 @@ log = logging.getLogger()
 
 def doassert(expect: Any, actual: Any, label: Optional[str] = ""):
     assert actual == expect, "expected {label}:'{expect}', but it actually has '{actual}'".format(label=label, actual=actual, expect=expect)
+
+
+def item_json(name: str, type_: str = "Switch", group_names: Tuple[str, ...] = (), state: Optional[str] = "OFF") -> Dict[str, Any]:
+    """returns the json of a item as returned by the REST API. state None leaves the state out, like the payload of item registry events."""
+    data = {"name": name, "type": type_, "label": name, "category": "", "tags": [], "groupNames": list(group_names), "editable": True}
+    if state is not None:
+        data["state"] = state
+    return data